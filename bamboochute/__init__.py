@@ -12,5 +12,6 @@ from .categorical import *
 from .validation import *
 from .dates import *
 from .profiling import *
+from .lazy import *
 
 __all__ = ['Bamboo']
\ No newline at end of file
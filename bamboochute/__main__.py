@@ -0,0 +1,4 @@
+# bamboochute/__main__.py
+from bamboochute.cli import main
+
+raise SystemExit(main())
@@ -0,0 +1,486 @@
+# bamboochute/aggregates.py
+import numpy as np
+import pandas as pd
+from bamboochute.imputation import _imputation_columns, _apply_imputation
+from bamboochute.outliers import _flag_zscore_outliers, _flag_iqr_outliers, _remove_flagged
+from bamboochute.categorical import (_check_categorical, _convert_categorical, _label_encode, _apply_frequency,
+                                     _rare_categories, _replace_rare)
+
+# Steps that need statistics over all rows, split into three phases so they can run on row partitions:
+# - 'partial': computes a mergeable summary of one partition, e.g. the sum and count of each column.
+# - 'merge': combines the summaries of every partition into the statistics of the whole dataset.
+# - 'apply': updates one partition with the combined statistics.
+# - 'fold': combines summaries into one summary of the same kind, kept to update the statistics later.
+# Each phase takes the step's arguments, so invalid arguments fail the same way as the method itself.
+# Medians and quartiles cannot be merged from fixed-size summaries, so their 'merge' may return a
+# `Refinement`: another round in which every partition answers a small request with 'refine', until
+# the exact order statistics are found (see `_order_statistics`).
+
+# The number of histogram bins each refinement round splits the remaining value range into, the number
+# of remaining values below which partitions send the values themselves, and the rounds before they do.
+QUANTILE_BINS = 1024
+QUANTILE_FETCH_LIMIT = 4096
+QUANTILE_MAX_ROUNDS = 8
+
+class Refinement:
+    """
+    Returned by a 'merge' that needs another round over the data: each partition computes
+    `refine(data, request, **arguments)` and `resume` merges the results into the statistics,
+    or into the next `Refinement`.
+    """
+
+    def __init__(self, request, resume):
+        self.request = request
+        self.resume = resume
+
+def _numeric_columns(data, columns):
+    if columns is None:
+        return data.select_dtypes(include=[np.number]).columns
+    return columns
+
+def _value_counts(series):
+    return series.value_counts(dropna=True)
+
+def _merge_counts(counts):
+    """
+    Sum the value counts of several partitions, keeping the order in which values first appear.
+    """
+    return pd.concat(counts).groupby(level=0, sort=False, observed=True).sum()
+
+def _mode(counts):
+    """
+    Return the mode of a column from its value counts per partition, the smallest value on ties like `Series.mode`.
+    """
+    merged = _merge_counts(counts)
+    merged = merged[merged > 0]
+    candidates = merged.index[merged == merged.max()]
+    return pd.Series(candidates, dtype=counts[0].index.dtype).mode()[0]
+
+def _column_values(series):
+    return series.dropna().to_numpy(dtype='float64')
+
+def _quantile_summary(data):
+    """
+    Round 0 of an order statistic search: the number of values, the minimum and the maximum of each column.
+    """
+    summary = {}
+    for col in data.columns:
+        values = _column_values(data[col])
+        summary[col] = (len(values), values.min(initial=np.inf), values.max(initial=-np.inf))
+    return summary
+
+def _fold_quantile_summaries(summaries):
+    return {col: (sum(summary[col][0] for summary in summaries), min(summary[col][1] for summary in summaries),
+                  max(summary[col][2] for summary in summaries)) for col in summaries[0]}
+
+def _refine_quantiles(data, request, **arguments):
+    """
+    Answer a refinement request: for each (column, rank), either the sorted values in the requested
+    interval, or a histogram of them over `QUANTILE_BINS` bins with their minimum and maximum.
+    """
+    arrays = {}
+    answer = {}
+    for key, (low, high, closed, fetch) in request.items():
+        col = key[0]
+        if col not in arrays:
+            arrays[col] = _column_values(data[col])
+        values = arrays[col]
+        values = values[(values >= low) & ((values <= high) if closed else (values < high))]
+        if fetch:
+            answer[key] = np.sort(values)
+        else:
+            counts = np.histogram(values, bins=QUANTILE_BINS, range=(low, high))[0]
+            answer[key] = (counts, values.min(initial=np.inf), values.max(initial=-np.inf))
+    return answer
+
+def _order_statistics(summaries, ranks):
+    """
+    Find the values at given ranks (0-based positions in sorted order) of each column, exactly, over data
+    split into partitions. A generator: it yields refinement requests and receives the answer of every
+    partition (see `_refine_quantiles`), and returns {column: {rank: value}}.
+
+    Each (column, rank) keeps an interval known to hold its value and the number of values below it.
+    Every round, the partitions count their values in the interval per histogram bin; the bin holding
+    the rank becomes the next interval. Once few values remain, the partitions send them and the value
+    is picked directly, so only histograms and a bounded number of values are ever sent.
+    """
+    found = {col: {} for col in ranks}
+    search = {}
+    for col, col_ranks in ranks.items():
+        low = min(summary[col][1] for summary in summaries)
+        high = max(summary[col][2] for summary in summaries)
+        for rank in set(col_ranks):
+            if low == high:
+                found[col][rank] = low
+            else:
+                # [low, high, closed, values below low, fetch, rounds]
+                search[(col, rank)] = [low, high, True, 0, False, 0]
+
+    while search:
+        answers = yield {key: (low, high, closed, fetch) for key, (low, high, closed, _, fetch, _) in search.items()}
+        for key, (low, high, closed, below, fetch, rounds) in list(search.items()):
+            col, rank = key
+            if fetch:
+                found[col][rank] = np.sort(np.concatenate([answer[key] for answer in answers]))[rank - below]
+                del search[key]
+                continue
+            counts = sum(answer[key][0] for answer in answers)
+            minimum = min(answer[key][1] for answer in answers)
+            maximum = max(answer[key][2] for answer in answers)
+            if minimum == maximum:
+                found[col][rank] = minimum
+                del search[key]
+                continue
+            if counts.sum() <= QUANTILE_FETCH_LIMIT or rounds >= QUANTILE_MAX_ROUNDS:
+                search[key][4] = True
+                continue
+            # The same bin edges as `np.histogram` uses
+            edges = np.linspace(low, high, QUANTILE_BINS + 1)
+            cumulative = np.cumsum(counts)
+            j = int(np.searchsorted(cumulative, rank - below, side='right'))
+            if not edges[j] < edges[j + 1]:
+                # The bins cannot get narrower in floating point
+                search[key][4] = True
+                continue
+            search[key] = [edges[j], edges[j + 1], closed and j == QUANTILE_BINS - 1,
+                           below + (int(cumulative[j - 1]) if j else 0), False, rounds + 1]
+    return found
+
+def _refined(rounds, finish):
+    """
+    Drive an `_order_statistics` generator: return `finish(result)` once it is done, or a `Refinement`
+    that resumes it with the answers of the next round.
+    """
+    def resume(answers):
+        try:
+            request = rounds.send(answers)
+        except StopIteration as stop:
+            return finish(stop.value)
+        return Refinement(request, resume)
+    return resume(None)
+
+def _quantile_ranks(count, q):
+    """
+    Return the two ranks around the `q` quantile of `count` values and the weight of the upper one,
+    computed like NumPy's default 'linear' method, or like `np.median` for the quantile 'median'.
+    """
+    if q == 'median':
+        return (count - 1) // 2, count // 2, None
+    position = count * q + (1 + q * -1) - 1
+    below = int(np.floor(position))
+    return below, min(below + 1, count - 1), position - below
+
+def _interpolate(low, high, weight):
+    if weight is None:
+        return (low + high) / 2
+    # NumPy's `_lerp`, so merged quantiles equal those computed on the whole column
+    difference = high - low
+    return high - difference * (1 - weight) if weight >= 0.5 else low + difference * weight
+
+def _merge_quantiles(summaries, quantiles, finish):
+    """
+    Merge the quantile summaries of every partition into the `quantiles` of each column, equal to
+    `Series.quantile` (or `Series.median` for the quantile 'median'), and return `finish` of
+    {column: [value of each quantile]}, or the `Refinement` needed to compute them.
+    """
+    counts = {col: sum(summary[col][0] for summary in summaries) for col in summaries[0]}
+    positions = {col: [_quantile_ranks(count, q) for q in quantiles] for col, count in counts.items() if count}
+    ranks = {col: [rank for low, high, _ in col_positions for rank in (low, high)]
+             for col, col_positions in positions.items()}
+
+    def values(found):
+        return finish({col: [_interpolate(found[col][low], found[col][high], weight) for low, high, weight in positions[col]]
+                       if col in positions else [np.nan] * len(quantiles) for col in counts})
+    return _refined(_order_statistics(summaries, ranks), values)
+
+def _impute_partial(data, strategy='mean', columns=None):
+    numeric_columns, non_numeric_columns = _imputation_columns(data, columns)
+    if strategy == 'mean':
+        numeric = (data[numeric_columns].sum(), data[numeric_columns].count())
+    elif strategy == 'median':
+        numeric = _quantile_summary(data[numeric_columns])
+    elif strategy == 'mode':
+        numeric = {col: _value_counts(data[col]) for col in numeric_columns}
+    else:
+        raise ValueError("Unsupported strategy! Use 'mean', 'median', or 'mode'.")
+    non_numeric = {}
+    if non_numeric_columns.any():
+        non_numeric = {col: _value_counts(data[col]) for col in non_numeric_columns}
+    return numeric, non_numeric
+
+def _impute_merge(partials, strategy='mean', columns=None):
+    non_numeric_values = {col: _mode([partial[1][col] for partial in partials]) for col in partials[0][1]}
+    if strategy == 'median':
+        return _merge_quantiles([partial[0] for partial in partials], ['median'], lambda medians: (
+            pd.Series({col: values[0] for col, values in medians.items()}, dtype='float64'), non_numeric_values))
+    if strategy == 'mean':
+        numeric_values = sum(partial[0][0] for partial in partials) / sum(partial[0][1] for partial in partials)
+    else:
+        numeric_values = {col: _mode([partial[0][col] for partial in partials]) for col in partials[0][0]}
+    return numeric_values, non_numeric_values
+
+def _impute_fold(partials, strategy='mean', columns=None):
+    if strategy == 'mean':
+        numeric = (sum(partial[0][0] for partial in partials), sum(partial[0][1] for partial in partials))
+    elif strategy == 'median':
+        numeric = _fold_quantile_summaries([partial[0] for partial in partials])
+    else:
+        numeric = {col: _merge_counts([partial[0][col] for partial in partials]) for col in partials[0][0]}
+    return numeric, {col: _merge_counts([partial[1][col] for partial in partials]) for col in partials[0][1]}
+
+def _impute_direct(data, strategy='median', columns=None):
+    numeric_columns, non_numeric_columns = _imputation_columns(data, columns)
+    return (data[numeric_columns].median().astype('float64'),
+            {col: _mode([_value_counts(data[col])]) for col in non_numeric_columns})
+
+def _impute_values(data, strategy='mean', columns=None):
+    if strategy != 'median':
+        return None
+    numeric_columns, non_numeric_columns = _imputation_columns(data, columns)
+    return data[[*numeric_columns, *non_numeric_columns]]
+
+def _impute_apply(bamboo, values, strategy='mean', columns=None):
+    numeric_columns, non_numeric_columns = _imputation_columns(bamboo.data, columns)
+    _apply_imputation(bamboo, strategy, numeric_columns, non_numeric_columns, values)
+
+def _zscore_partial(data, columns=None, threshold=3):
+    data = data[_numeric_columns(data, columns)]
+    count = data.count()
+    return count, data.mean(), data.var(ddof=0) * count
+
+def _zscore_fold(partials, columns=None, threshold=3):
+    """
+    Combine the count, mean and sum of squared deviations of each partition (Chan et al.) into those
+    of all of them.
+    """
+    count, mean, m2 = partials[0]
+    for other_count, other_mean, other_m2 in partials[1:]:
+        total = count + other_count
+        delta = other_mean - mean
+        merged_mean = mean + delta * other_count / total
+        merged_m2 = m2 + other_m2 + delta ** 2 * count * other_count / total
+        # Empty partitions have no mean; the statistics of the other side are kept as they are
+        mean = merged_mean.where(other_count > 0, mean).where(count > 0, other_mean)
+        m2 = merged_m2.where(other_count > 0, m2).where(count > 0, other_m2)
+        count = total
+    return count, mean, m2
+
+def _zscore_merge(partials, columns=None, threshold=3):
+    """
+    Combine the partial aggregates of every partition into the mean and sample standard deviation of each column.
+    """
+    count, mean, m2 = _zscore_fold(partials)
+    return mean, np.sqrt(m2 / (count - 1))
+
+def _zscore_apply(bamboo, statistics, columns=None, threshold=3):
+    return _flag_zscore_outliers(bamboo, _numeric_columns(bamboo.data, columns), threshold, *statistics)
+
+def _iqr_partial(data, columns=None, multiplier=1.5):
+    return _quantile_summary(data[_numeric_columns(data, columns)])
+
+def _iqr_merge(partials, columns=None, multiplier=1.5):
+    return _merge_quantiles(partials, [0.25, 0.75], lambda quartiles: tuple(
+        pd.Series({col: values[i] for col, values in quartiles.items()}, dtype='float64') for i in range(2)))
+
+def _iqr_fold(partials, columns=None, multiplier=1.5):
+    return _fold_quantile_summaries(partials)
+
+def _iqr_direct(data, columns=None, multiplier=1.5):
+    data = data[_numeric_columns(data, columns)]
+    return data.quantile(0.25).astype('float64'), data.quantile(0.75).astype('float64')
+
+def _iqr_values(data, columns=None, multiplier=1.5):
+    return data[_numeric_columns(data, columns)]
+
+def _iqr_apply(bamboo, quartiles, columns=None, multiplier=1.5):
+    return _flag_iqr_outliers(bamboo, _numeric_columns(bamboo.data, columns), multiplier, *quartiles)
+
+_OUTLIER_METHODS = {
+    'zscore': (_zscore_partial, _zscore_merge, _zscore_apply, _zscore_fold, None, None),
+    'iqr': (_iqr_partial, _iqr_merge, _iqr_apply, _iqr_fold, _iqr_values, _iqr_direct),
+}
+
+def _remove_outliers_partial(data, method='zscore', columns=None, **kwargs):
+    return _OUTLIER_METHODS[method][0](data, columns=_numeric_columns(data, columns), **kwargs)
+
+def _remove_outliers_merge(partials, method='zscore', columns=None, **kwargs):
+    return _OUTLIER_METHODS[method][1](partials, **kwargs)
+
+def _remove_outliers_fold(partials, method='zscore', columns=None, **kwargs):
+    return _OUTLIER_METHODS[method][3](partials, **kwargs)
+
+def _remove_outliers_values(data, method='zscore', columns=None, **kwargs):
+    values = _OUTLIER_METHODS[method][4]
+    return None if values is None else values(data, columns=columns, **kwargs)
+
+def _remove_outliers_direct(data, method='zscore', columns=None, **kwargs):
+    return _OUTLIER_METHODS[method][5](data, columns=columns, **kwargs)
+
+def _remove_outliers_apply(bamboo, statistics, method='zscore', columns=None, **kwargs):
+    columns = _numeric_columns(bamboo.data, columns)
+    outliers = _OUTLIER_METHODS[method][2](bamboo, statistics, columns=columns, **kwargs)
+    _remove_flagged(bamboo, outliers, columns, method)
+
+def _category_columns(data, columns):
+    if columns is None:
+        return data.select_dtypes(include=['category']).columns
+    return columns
+
+def _frequency_partial(data, columns=None):
+    return {col: data[col].value_counts() for col in _category_columns(data, columns)}
+
+def _frequency_merge(partials, columns=None):
+    frequencies = {}
+    for col in partials[0]:
+        counts = _merge_counts([partial[col] for partial in partials])
+        frequencies[col] = counts / counts.sum()
+    return frequencies
+
+def _frequency_fold(partials, columns=None):
+    return {col: _merge_counts([partial[col] for partial in partials]) for col in partials[0]}
+
+def _frequency_apply(bamboo, frequencies, columns=None):
+    for col in _category_columns(bamboo.data, columns):
+        _apply_frequency(bamboo, col, frequencies[col])
+
+def _rare_partial(data, column, threshold=0.01):
+    _check_categorical(data, column)
+    return _value_counts(data[column])
+
+def _rare_merge(partials, column, threshold=0.01):
+    counts = _merge_counts(partials)
+    return _rare_categories(counts / counts.sum(), threshold)
+
+def _rare_fold(partials, column, threshold=0.01, replacement='Other'):
+    return _merge_counts(partials)
+
+def _rare_apply(bamboo, rare_categories, column, threshold=0.01):
+    _check_categorical(bamboo.data, column)
+    bamboo.log_changes(f"Detected rare categories in column '{column}': {rare_categories}")
+    return rare_categories
+
+def _replace_rare_partial(data, column, threshold=0.01, replacement='Other'):
+    return _rare_partial(data, column, threshold)
+
+def _replace_rare_merge(partials, column, threshold=0.01, replacement='Other'):
+    """
+    Return the rare categories and the categories still used once they are replaced, so every
+    partition keeps the same categories instead of dropping those it happens not to use.
+    """
+    counts = _merge_counts(partials)
+    rare_categories = _rare_categories(counts / counts.sum(), threshold)
+    if len(partials) == 1:
+        # A single partition holds all rows, so the categories it leaves unused can simply be removed
+        return rare_categories, None
+    used = set(counts.index[(counts > 0) & ~counts.index.isin(rare_categories)])
+    if (counts[counts.index.isin(rare_categories)] > 0).any():
+        used.add(replacement)
+    return rare_categories, used
+
+def _replace_rare_apply(bamboo, state, column, threshold=0.01, replacement='Other'):
+    rare_categories, used = state
+    _rare_apply(bamboo, rare_categories, column, threshold)
+    _replace_rare(bamboo, column, replacement, rare_categories, used)
+
+def _object_columns(data, columns):
+    if columns is None:
+        return data.select_dtypes(include=['object']).columns
+    return columns
+
+def _categorical_partial(data, columns=None):
+    return {col: pd.Series(data[col].unique()) for col in _object_columns(data, columns)}
+
+def _categorical_merge(partials, columns=None):
+    # Categories are derived from the unique values of every partition, in order of appearance,
+    # the same way `astype('category')` derives them from the whole column
+    return {col: pd.concat([partial[col] for partial in partials], ignore_index=True).astype('category').dtype
+            for col in partials[0]}
+
+def _unique_fold(partials, columns=None, method='label'):
+    return {col: pd.Series(pd.concat([partial[col] for partial in partials], ignore_index=True).unique())
+            for col in partials[0]}
+
+def _categorical_apply(bamboo, dtypes, columns=None):
+    columns = _object_columns(bamboo.data, columns)
+    # Columns that already are categorical keep their categories, as `astype('category')` leaves them unchanged
+    dtypes = {col: dtype for col, dtype in dtypes.items() if not isinstance(bamboo.data[col].dtype, pd.CategoricalDtype)}
+    _convert_categorical(bamboo, columns, dtypes)
+
+def _label_partial(data, columns=None, method='label'):
+    return {col: pd.Series(data[col].unique()) for col in _category_columns(data, columns)}
+
+def _label_merge(partials, columns=None, method='label'):
+    from sklearn.preprocessing import LabelEncoder
+    return {col: LabelEncoder().fit(pd.concat([partial[col] for partial in partials], ignore_index=True))
+            for col in partials[0]}
+
+def _label_apply(bamboo, encoders, columns=None, method='label'):
+    _label_encode(bamboo, _category_columns(bamboo.data, columns), encoders)
+
+def _aggregate(partial, merge, apply, fold, values=None, direct=None):
+    """
+    Register the phases of a mergeable step. Steps whose merge may return a `Refinement` also give
+    `values`, which returns the columns their statistics are computed from, or None if the arguments
+    need no refinement, e.g. `impute_missing` with the 'mean' strategy, and `direct`, which computes
+    the statistics from those columns in one pass when they are all in memory.
+    """
+    entry = {'partial': partial, 'merge': merge, 'apply': apply, 'fold': fold}
+    if values is not None:
+        entry.update(values=values, direct=direct, refine=_refine_quantiles)
+    return entry
+
+AGGREGATES = {
+    'impute_missing': _aggregate(_impute_partial, _impute_merge, _impute_apply, _impute_fold, _impute_values,
+                                 _impute_direct),
+    'detect_outliers_zscore': _aggregate(_zscore_partial, _zscore_merge, _zscore_apply, _zscore_fold),
+    'detect_outliers_iqr': _aggregate(_iqr_partial, _iqr_merge, _iqr_apply, _iqr_fold, _iqr_values, _iqr_direct),
+    'remove_outliers': _aggregate(_remove_outliers_partial, _remove_outliers_merge, _remove_outliers_apply,
+                                  _remove_outliers_fold, _remove_outliers_values, _remove_outliers_direct),
+    'encode_frequency': _aggregate(_frequency_partial, _frequency_merge, _frequency_apply, _frequency_fold),
+    'detect_rare_categories': _aggregate(_rare_partial, _rare_merge, _rare_apply, _rare_fold),
+    'replace_rare_categories': _aggregate(_replace_rare_partial, _replace_rare_merge, _replace_rare_apply, _rare_fold),
+    'convert_to_categorical': _aggregate(_categorical_partial, _categorical_merge, _categorical_apply, _unique_fold),
+    'encode_categorical': _aggregate(_label_partial, _label_merge, _label_apply, _unique_fold),
+}
+
+def fit_step(bamboo, step, partial=None):
+    """
+    Compute the statistics of a mergeable step on the data of `bamboo`, combined with the running
+    partial aggregate of data seen earlier, and apply them. Returns the running partial aggregate
+    updated with this data and the statistics, so they can be updated or applied to other data later,
+    see `BambooPipeline.fit`.
+
+    Medians and quartiles need every value, so their running partial holds the values of the columns
+    they read, and each call copies them: its time and memory grow with all the rows seen so far.
+    """
+    entry = AGGREGATES[step['method_name']]
+    arguments = step['arguments']
+    values = entry['values'](bamboo.data, **arguments) if 'values' in entry else None
+    if values is None:
+        new_partial = entry['partial'](bamboo.data, **arguments)
+        partials = [new_partial] if partial is None else [partial, new_partial]
+        state = entry['merge'](partials, **arguments)
+        partial = entry['fold'](partials, **arguments)
+    else:
+        partial = values if partial is None else pd.concat([partial, values], ignore_index=True)
+        state = entry['direct'](partial, **arguments)
+    entry['apply'](bamboo, state, **arguments)
+    return partial, state
+
+def apply_step(bamboo, step, state):
+    """
+    Apply statistics returned by `fit_step` to the data of `bamboo`.
+    """
+    AGGREGATES[step['method_name']]['apply'](bamboo, state, **step['arguments'])
+
+def is_mergeable(step):
+    """
+    Return whether a pipeline step can run as partial aggregates over row partitions, see `AGGREGATES`.
+    """
+    arguments = step.get('arguments', {})
+    if step['method_name'] == 'remove_outliers':
+        return arguments.get('method', 'zscore') in _OUTLIER_METHODS
+    if step['method_name'] == 'encode_categorical':
+        # One-hot encoding creates columns from the data, so it runs on the whole dataset
+        return arguments.get('method', 'onehot') == 'label'
+    return step['method_name'] in AGGREGATES
@@ -1,37 +1,166 @@
 # bamboochute/bamboo.py
+import asyncio
+import contextvars
+import functools
+import os
+import numpy as np
 import pandas as pd
-from bamboochute.utils import log
-from bamboochute.settings.log import set_logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from bamboochute.utils import eager, log
+from bamboochute.settings.parallel import get_workers
+from bamboochute.fileio import iter_chunks, iter_json_lines, is_json_lines, is_multi_source, expand_paths, columnar_format, read_columnar, read_memory_mapped, write_columnar, write_text, iter_sqlite, write_sqlite
+from bamboochute.cache import SourceCache, CACHEABLE_EXTENSIONS
+from bamboochute.history import SnapshotHistory
+from bamboochute.operations import OperationLog, DEFAULT_MAX_OPERATIONS
+from bamboochute.schema import (apply_schema, compact_dtypes, concat_frames, infer_csv_dtypes, infer_parse_dtypes,
+                                load_schema, parse_dtypes, save_schema)
+
+def _load_source_file(path, options, source_column=None):
+    """
+    Load a single file of a multi-file source. Defined at module level so it can run in a worker process.
+    """
+    try:
+        data = Bamboo(path, sys_log=False, **options).data
+    except ValueError as e:
+        raise ValueError(f"Failed to load '{path}': {str(e)}")
+    if source_column is not None:
+        data[source_column] = pd.Categorical.from_codes(np.zeros(len(data), dtype=np.int8), categories=[path])
+    return data
 
 class Bamboo:
     """
-    A class for handling and cleaning datasets in various formats (Pandas DataFrame, CSV, Excel, JSON).
+    A class for handling and cleaning datasets in various formats (Pandas DataFrame, CSV, Excel, JSON,
+    JSON Lines, Parquet, Feather, Arrow IPC).
     Provides pipelines for cleaning operations and data transformations.
     """
 
     @log
-    def __init__(self, data, sys_log=True):
+    def __init__(self, data, sys_log=None, columns=None, filters=None, memory_map=False, infer_schema=False, schema=None,
+                 workers=None, source_column=None, cache=None):
         """
         Initialize the Bamboo class with a dataset.
+
+        Parameters:
+        - data: pd.DataFrame or str or list
+            A DataFrame, the path to a supported file, a glob pattern such as 'shards/*.csv',
+            or a list of paths. Multiple files are loaded concurrently and concatenated.
+        - sys_log: bool or None, default=None
+            Whether to enable logging for this instance only. If None, the setting of the current
+            context (see `bamboochute.settings.log.logging_context`) or the global default is used.
+        - columns: list or None, default=None
+            Only load these columns. If None, all columns are loaded.
+        - filters: list of tuples or None, default=None
+            Row filter predicates applied while reading columnar files, e.g. [('age', '>', 30)].
+        - memory_map: bool, default=False
+            Open Arrow IPC, Feather or `.npy` files through a memory map instead of reading them
+            into memory. The loaded data is read-only, which suits profiling and validation methods.
+        - infer_schema: bool, default=False
+            Store every column in the narrowest dtype that holds its values: downcast integers and
+            floats, categories for low-cardinality strings and nullable booleans. For CSV files a
+            sample is inspected first so categories are built while parsing.
+        - schema: dict or str or None, default=None
+            A mapping of column names to dtypes, or the path to a schema saved with `save_schema`,
+            applied while loading.
+        - workers: int or None, default=None
+            The number of worker processes used to load multiple files. If None, the workers of the
+            current context (see `bamboochute.settings.parallel`) are used, by default one per CPU.
+        - source_column: str or None, default=None
+            When loading multiple files, the name of a column recording the file each row came from.
+        - cache: bool or SourceCache or None, default=None
+            Keep an on-disk Arrow copy of parsed CSV and Excel files, so reopening an unchanged file
+            skips parsing. Pass True for the default cache or a `SourceCache` to configure its location and size.
         """
-        set_logging(sys_log)
-        self.data = self._load_data(data)
+        self._sys_log = sys_log
+        self.data = self._load_data(data, columns=columns, filters=filters, memory_map=memory_map,
+                                    infer_schema=infer_schema, schema=schema, workers=workers,
+                                    source_column=source_column, cache=cache)
+        # Operations are only recorded once `configure_operation_log` is called, so methods pay nothing for it by default
+        self._operations = None
 
     @log
-    def _load_data(self, data):
+    def _load_data(self, data, columns=None, filters=None, memory_map=False, infer_schema=False, schema=None,
+                   workers=None, source_column=None, cache=None):
         """
         Private method to load data based on the input type.
         """
+        if isinstance(schema, str):
+            schema = load_schema(schema)
+
+        if is_multi_source(data):
+            options = {'columns': columns, 'filters': filters, 'memory_map': memory_map,
+                       'infer_schema': infer_schema, 'schema': schema, 'cache': cache}
+            return self._read_many(expand_paths(data), options, workers=workers, source_column=source_column)
+
+        # Row filters and memory mapping are not supported for cacheable formats; without the cache,
+        # reading the source below rejects them
+        if (cache and filters is None and not memory_map and isinstance(data, str) and data.endswith(CACHEABLE_EXTENSIONS)
+                and os.path.exists(data)):
+            cache = SourceCache() if cache is True else cache
+            key = cache.key(data, {'columns': columns, 'infer_schema': infer_schema, 'schema': schema})
+            loaded = cache.get(key)
+            if loaded is None:
+                loaded = self._load_data(data, columns=columns, infer_schema=infer_schema, schema=schema)
+                cache.put(key, loaded)
+            return loaded
+
+        loaded = self._read_source(data, columns=columns, filters=filters, memory_map=memory_map,
+                                   infer_schema=infer_schema, schema=schema)
+        if schema is not None:
+            loaded = apply_schema(loaded, schema)
+        if infer_schema:
+            loaded = compact_dtypes(loaded)
+        return loaded
+
+    def _read_many(self, paths, options, workers=None, source_column=None):
+        """
+        Private method to load several files in a process pool and concatenate them in order.
+        """
+        if workers is None:
+            workers = get_workers()
+        if len(paths) == 1 or workers == 1:
+            frames = [_load_source_file(path, options, source_column) for path in paths]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                frames = list(executor.map(_load_source_file, paths, [options] * len(paths), [source_column] * len(paths)))
+        return concat_frames(frames)
+
+    def _read_source(self, data, columns=None, filters=None, memory_map=False, infer_schema=False, schema=None):
+        """
+        Private method to read the raw data from a DataFrame or a file.
+        """
+        if memory_map:
+            if not isinstance(data, str) or filters is not None:
+                raise ValueError("Memory mapping requires a file path and does not support row filters.")
+            try:
+                return read_memory_mapped(data, columns=columns)
+            except Exception as e:
+                raise ValueError(f"Failed to memory-map file: {str(e)}")
+
         if isinstance(data, pd.DataFrame):
-            return data
+            if filters is not None:
+                raise ValueError("Row filters are only supported for Parquet, Feather and Arrow IPC files.")
+            return data if columns is None else data.loc[:, columns]
         elif isinstance(data, str):
+            if filters is not None and columnar_format(data) is None:
+                raise ValueError("Row filters are only supported for Parquet, Feather and Arrow IPC files.")
             try:
                 if data.endswith('.csv'):
-                    return pd.read_csv(data)
+                    if schema is not None:
+                        dtype = parse_dtypes(schema)
+                    elif infer_schema:
+                        dtype = infer_csv_dtypes(data, usecols=columns)
+                    else:
+                        dtype = None
+                    return pd.read_csv(data, usecols=columns, dtype=dtype)
                 elif data.endswith(('.xls', '.xlsx')):
-                    return pd.read_excel(data)
+                    return pd.read_excel(data, usecols=columns, dtype=parse_dtypes(schema) if schema is not None else None)
+                elif is_json_lines(data):
+                    return self._read_json_lines(data, columns=columns, infer_schema=infer_schema, schema=schema)
                 elif data.endswith('.json'):
-                    return pd.read_json(data)
+                    loaded = pd.read_json(data)
+                    return loaded if columns is None else loaded[columns]
+                elif columnar_format(data) is not None:
+                    return read_columnar(data, columns=columns, filters=filters)
                 else:
                     raise ValueError("Unsupported file format!")
             except Exception as e:
@@ -39,6 +168,118 @@ class Bamboo:
         else:
             raise ValueError("Unsupported data type! Must be a Pandas DataFrame or a valid file path.")
 
+    def _read_json_lines(self, path, columns=None, infer_schema=False, schema=None):
+        """
+        Private method to parse a JSON Lines file in bounded batches. With schema inference, the first
+        batch decides which fields become categories, so later batches are compacted as they are parsed.
+        """
+        dtype = parse_dtypes(schema) if schema is not None else None
+        frames = []
+        for chunk in iter_json_lines(path, columns=columns, dtype=dtype):
+            if infer_schema:
+                if dtype is None:
+                    dtype = infer_parse_dtypes(chunk)
+                chunk = compact_dtypes(apply_schema(chunk, dtype))
+            frames.append(chunk)
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return concat_frames(frames)
+
+    @classmethod
+    async def aload(cls, data, executor=None, **kwargs):
+        """
+        Load a dataset without blocking the event loop, by running the constructor on a thread pool.
+
+        Parameters:
+        - data: pd.DataFrame or str or list
+            Any source accepted by the Bamboo constructor.
+        - executor: concurrent.futures.Executor or None, default=None
+            The executor to load on. If None, the event loop's default thread pool is used.
+        - kwargs: dict
+            Additional keyword arguments passed to the Bamboo constructor.
+
+        Returns:
+        - Bamboo: The loaded Bamboo instance.
+        """
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the caller's context, so logging and parallelism settings carry over to the thread
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(executor, functools.partial(context.run, cls, data, **kwargs))
+
+    @classmethod
+    async def aload_many(cls, sources, max_workers=None, **kwargs):
+        """
+        Load several datasets concurrently on a thread pool without blocking the event loop.
+
+        Parameters:
+        - sources: list
+            The sources to load; each is passed to the Bamboo constructor.
+        - max_workers: int or None, default=None
+            The number of threads to load with. If None, the workers of the current context are used,
+            or the ThreadPoolExecutor default if none are set.
+        - kwargs: dict
+            Additional keyword arguments passed to the Bamboo constructor.
+
+        Returns:
+        - list: The loaded Bamboo instances, in the order of `sources`.
+        """
+        executor = ThreadPoolExecutor(max_workers=max_workers or get_workers())
+        try:
+            return await asyncio.gather(*(cls.aload(source, executor=executor, **kwargs) for source in sources))
+        finally:
+            executor.shutdown(wait=False)
+
+    @classmethod
+    @log
+    def from_sqlite(cls, database, query, params=None, chunksize=100_000, sys_log=None, **kwargs):
+        """
+        Load the result of a query against a SQLite database, fetching rows through the cursor in batches.
+
+        Parameters:
+        - database: str
+            The path to the SQLite database.
+        - query: str
+            The SQL query to run, e.g. 'SELECT * FROM orders WHERE day = ?'.
+        - params: sequence or dict or None, default=None
+            Parameters bound to the placeholders of the query.
+        - chunksize: int, default=100000
+            The number of rows fetched per batch.
+        - sys_log: bool or None, default=None
+            Whether to enable logging for the created instances. If None, the context or global setting is used.
+        - kwargs: dict
+            Additional keyword arguments passed to the Bamboo constructor, e.g. `infer_schema=True`.
+
+        Returns:
+        - Bamboo: A Bamboo instance wrapping the query result.
+        """
+        frames = list(iter_sqlite(database, query, params=params, chunksize=chunksize))
+        return cls(concat_frames(frames), sys_log=sys_log, **kwargs)
+
+    @classmethod
+    @log
+    def stream(cls, data, chunksize=100_000, sys_log=None, **kwargs):
+        """
+        Load a dataset in chunks of bounded size, yielding one Bamboo instance per chunk.
+        Use this for files that do not fit in memory; every cleaning method can be applied
+        to each chunk independently.
+
+        Parameters:
+        - data: pd.DataFrame or str
+            A DataFrame or the path to a CSV, JSON Lines, Parquet, Feather or Arrow IPC file.
+        - chunksize: int, default=100000
+            The number of rows in each chunk.
+        - sys_log: bool or None, default=None
+            Whether to enable logging for the yielded instances.
+        - kwargs: dict
+            Additional keyword arguments passed to the underlying Pandas reader.
+
+        Yields:
+        - Bamboo: A Bamboo instance wrapping the next chunk of rows.
+        """
+        for chunk in iter_chunks(data, chunksize=chunksize, **kwargs):
+            yield cls(chunk, sys_log=sys_log)
+
+    @eager
     @log
     def preview_data(self, rows=5):
         """
@@ -46,6 +287,7 @@ class Bamboo:
         """
         return self.data.head(rows)
 
+    @eager
     @log
     def get_data(self):
         """
@@ -66,6 +308,24 @@ class Bamboo:
             raise ValueError("Data must be a Pandas DataFrame.")
         return self
 
+    @log
+    def drop_columns(self, columns):
+        """
+        Drop columns from the dataset.
+
+        Parameters:
+        - columns: str or list
+            The column or columns to drop.
+
+        Returns:
+        - Bamboo: The Bamboo instance without the dropped columns.
+        """
+        if isinstance(columns, str):
+            columns = [columns]
+        self.data = self.data.drop(columns=columns)
+        self.log_changes(f"Dropped columns: {columns}.")
+        return self
+
     @log
     def reset_data(self):
         """
@@ -73,38 +333,99 @@ class Bamboo:
         """
         if hasattr(self, '_history') and self._history:
             self.data = self._history[0]
-            self._history = []
+            self._history.clear()
             self.log_changes("Reset data to its original state.")
         else:
             raise ValueError("No original state to reset to!")
         return self
 
+    @eager
     @log
-    def export_data(self, output_path, format='csv'):
+    def export_data(self, output_path, format='csv', compression='infer', chunksize=100_000, mode='w',
+                    table='data', if_exists='replace'):
         """
-        Export the cleaned data to a specified format (CSV, Excel, JSON).
+        Export the cleaned data to a specified format (CSV, Excel, JSON, JSON Lines, Parquet, Feather, Arrow IPC, SQLite).
+        Rows are written in batches so exporting a large dataset does not duplicate it in memory.
+
+        Parameters:
+        - output_path: str
+            The path of the output file.
+        - format: str, default='csv'
+            One of 'csv', 'excel', 'json', 'jsonl', 'parquet', 'feather', 'arrow' or 'sqlite'.
+        - compression: str or None, default='infer'
+            For text formats, one of 'gzip', 'bz2', 'xz' or 'zstd'; 'infer' derives it from the extension
+            (e.g. '.csv.gz'). For columnar formats, the codec to use, e.g. 'snappy' or 'zstd'.
+        - chunksize: int, default=100000
+            The number of rows written per batch. Arrow and Feather files meant to be opened with
+            `memory_map=True` should be written in one batch, with `chunksize` of at least `len(data)`.
+        - mode: str, default='w'
+            'w' to overwrite the file or 'a' to append to it (CSV and JSON Lines only), e.g. when
+            exporting the chunks produced by `Bamboo.stream` one after another.
+        - table: str, default='data'
+            For SQLite exports, the name of the table to write to.
+        - if_exists: str, default='replace'
+            For SQLite exports, what to do if the table exists: 'fail', 'replace' or 'append'.
+            All rows are inserted with batched `executemany` calls inside a single transaction.
+
+        Returns:
+        - Bamboo: The Bamboo instance.
         """
         if self.data.empty:
             raise ValueError("Cannot export an empty dataset.")
+        if mode != 'w' and format not in ('csv', 'jsonl'):
+            raise ValueError("Appending is only supported for 'csv' and 'jsonl' exports.")
 
-        if format == 'csv':
-            self.data.to_csv(output_path, index=False)
+        if format in ('csv', 'json', 'jsonl'):
+            write_text(self.data, output_path, format, compression=compression, chunksize=chunksize, mode=mode)
         elif format == 'excel':
             self.data.to_excel(output_path, index=False)
-        elif format == 'json':
-            self.data.to_json(output_path, orient='records')
+        elif format in ('parquet', 'feather', 'arrow'):
+            write_columnar(self.data, output_path, format, compression=compression, chunksize=chunksize)
+        elif format == 'sqlite':
+            write_sqlite(self.data, output_path, table=table, if_exists=if_exists, chunksize=chunksize)
         else:
-            raise ValueError("Unsupported export format! Choose from 'csv', 'excel', or 'json'.")
+            raise ValueError("Unsupported export format! Choose from 'csv', 'excel', 'json', 'jsonl', 'parquet', 'feather', 'arrow', or 'sqlite'.")
+        return self
+
+    @log
+    def save_schema(self, filepath):
+        """
+        Save the column dtypes of the current data to a JSON file, so later loads can reuse them with `schema=`.
+        """
+        save_schema({col: str(dtype) for col, dtype in self.data.dtypes.items()}, filepath)
         return self
 
     @log
     def save_state(self):
         """
         Save the current state of the dataset to enable undo functionality.
+        Only the columns and rows that changed since the previous saved state are copied.
+        """
+        if not hasattr(self, '_history'):
+            self._history = SnapshotHistory()
+        self._history.append(self.data)
+        return self
+
+    @log
+    def configure_history(self, max_bytes=None, max_snapshots=None, spill_dir=None):
+        """
+        Bound the memory used by the undo history.
+
+        Parameters:
+        - max_bytes: int or None, default=None
+            The memory budget of the history. Once exceeded, the columns of older snapshots are spilled
+            to compressed files on disk and read back when `undo` or `reset_data` needs them.
+        - max_snapshots: int or None, default=None
+            Keep the original state plus this many of the most recent snapshots, discarding the others.
+        - spill_dir: str or None, default=None
+            The directory to spill snapshots to. If None, a temporary directory is used.
+
+        Returns:
+        - Bamboo: The Bamboo instance.
         """
         if not hasattr(self, '_history'):
-            self._history = []
-        self._history.append(self.data.copy())
+            self._history = SnapshotHistory()
+        self._history.configure(max_bytes=max_bytes, max_snapshots=max_snapshots, spill_dir=spill_dir)
         return self
 
     @log
@@ -113,8 +434,8 @@ class Bamboo:
         Undo the last 'n' cleaning steps and revert to the previous state of the data.
         """
         if hasattr(self, '_history') and len(self._history) >= steps:
-            for _ in range(steps):
-                self.data = self._history.pop()
+            if steps > 0:
+                self.data = self._history.pop(steps)
             self.log_changes(f"Reverted {steps} step(s) to previous state of data.")
         else:
             raise ValueError(f"Cannot undo {steps} step(s). Not enough history.")
@@ -130,6 +451,69 @@ class Bamboo:
         if not self._change_log or self._change_log[-1] != message:
             self._change_log.append(message)
 
+    # The operation log methods are not decorated with `log`, so that inspecting the log does not add to it
+    def configure_operation_log(self, maxlen=DEFAULT_MAX_OPERATIONS):
+        """
+        Start recording operations, or change how many records are kept, see `get_operation_log`.
+        Recording is off by default, as measuring the data before and after every method adds to its cost.
+
+        Parameters:
+        - maxlen: int, default=1000
+            The number of most recent operations to keep. 0 disables recording.
+
+        Returns:
+        - Bamboo: The Bamboo instance.
+        """
+        if maxlen < 0:
+            raise ValueError("maxlen must be non-negative.")
+        previous = list(self._operations.records) if getattr(self, '_operations', None) is not None else []
+        self._operations = None
+        if maxlen > 0:
+            operations = OperationLog(maxlen=maxlen)
+            operations.records.extend(previous)
+            self._operations = operations
+        return self
+
+    @eager
+    def get_operation_log(self, format='dataframe'):
+        """
+        Return a structured record of the most recent operations on the dataset: method, arguments,
+        wall and CPU time, and the rows, columns and shallow memory size of the data before and after.
+        Operations are only recorded after `configure_operation_log` is called.
+
+        Parameters:
+        - format: str, default='dataframe'
+            'dataframe' for a DataFrame with one row per operation, 'records' for a list of dicts
+            or 'json' for a JSON string.
+
+        Returns:
+        - pd.DataFrame or list or str: The operation records.
+        """
+        operations = getattr(self, '_operations', None) or OperationLog()
+        if format == 'dataframe':
+            return operations.to_frame()
+        if format == 'records':
+            return list(operations.records)
+        if format == 'json':
+            return operations.to_json()
+        raise ValueError(f"Unsupported format: {format}")
+
+    @eager
+    def export_operation_log(self, filepath):
+        """
+        Write the operation records to a JSON file.
+
+        Parameters:
+        - filepath: str
+            The path of the JSON file.
+
+        Returns:
+        - Bamboo: The Bamboo instance.
+        """
+        (getattr(self, '_operations', None) or OperationLog()).to_json(filepath)
+        return self
+
+    @eager
     @log
     def show_change_log(self):
         """
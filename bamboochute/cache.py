@@ -0,0 +1,268 @@
+# bamboochute/cache.py
+import hashlib
+import json
+import os
+import pickle
+import uuid
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from bamboochute.fileio import read_columnar, write_columnar
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'bamboochute')
+
+# Extensions of the sources that are worth caching, since parsing them is much slower than reading Arrow.
+CACHEABLE_EXTENSIONS = ('.csv', '.xls', '.xlsx')
+
+def _evict_directory(directory, max_bytes, suffixes):
+    """
+    Remove the least recently used files with the given suffixes until the directory holds at most `max_bytes`.
+    """
+    if not os.path.isdir(directory):
+        return
+    entries = []
+    for name in os.listdir(directory):
+        if name.endswith(suffixes):
+            stat = os.stat(os.path.join(directory, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+        total -= size
+
+class SourceCache:
+    """
+    An on-disk cache of parsed source files, stored as Arrow IPC files.
+
+    Entries are keyed by the absolute path, size, modification time and content hash of the source,
+    plus the loading options, so a changed file is never served from the cache. The total size of the
+    cache is bounded, and the least recently used entries are evicted first.
+    """
+
+    def __init__(self, directory=None, max_bytes=2 * 1024 ** 3):
+        """
+        Initialize the cache.
+
+        Parameters:
+        - directory: str or None, default=None
+            The directory to store cached files in. If None, '~/.cache/bamboochute' is used.
+        - max_bytes: int, default=2 GiB
+            The maximum total size of the cache on disk.
+        """
+        self.directory = directory or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+
+    def key(self, path, options=None):
+        """
+        Compute the cache key of a source file and the options used to load it.
+        """
+        stat = os.stat(path)
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(json.dumps([os.path.abspath(path), stat.st_size, stat.st_mtime_ns, options],
+                                 sort_keys=True, default=str).encode())
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _entry_paths(self, key):
+        return [os.path.join(self.directory, f"{key}{suffix}") for suffix in ('.arrow', '.pkl')]
+
+    def get(self, key):
+        """
+        Return the cached DataFrame for a key, or None on a cache miss.
+        """
+        for entry in self._entry_paths(key):
+            if os.path.exists(entry):
+                try:
+                    data = self._read_arrow(entry) if entry.endswith('.arrow') else pd.read_pickle(entry)
+                except (OSError, ValueError):
+                    return None
+                os.utime(entry)  # Mark the entry as recently used
+                return data
+        return None
+
+    def _read_arrow(self, entry):
+        data = read_columnar(entry)
+        # Arrow restores missing strings as None, while the Pandas CSV and Excel readers produce NaN
+        for col in data.select_dtypes(include=['object']).columns:
+            data[col] = data[col].where(data[col].notna(), np.nan)
+        return data
+
+    def put(self, key, data):
+        """
+        Store a DataFrame under a key and evict old entries if the cache grew too large.
+        Data that Arrow cannot represent, such as columns mixing strings and numbers, is pickled instead.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        arrow_path, pickle_path = self._entry_paths(key)
+        tmp_path = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            try:
+                write_columnar(data.reset_index(drop=True), tmp_path, 'arrow')
+                target = arrow_path
+            except (ImportError, TypeError, ValueError, NotImplementedError):
+                data.to_pickle(tmp_path)
+                target = pickle_path
+            os.replace(tmp_path, target)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits in `max_bytes`.
+        """
+        _evict_directory(self.directory, self.max_bytes, ('.arrow', '.pkl'))
+
+    def clear(self):
+        """
+        Remove every entry from the cache.
+        """
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(('.arrow', '.pkl')):
+                    os.remove(os.path.join(self.directory, name))
+
+# Methods whose effect is not limited to the data, such as the undo history or exported files
+UNCACHEABLE_STEPS = ('save_state', 'undo', 'reset_data', 'export_data', 'configure_history', 'configure_operation_log')
+
+def frame_fingerprint(data):
+    """
+    Return a hash of a DataFrame's values, index, column names and dtypes, or None if its values
+    cannot be hashed, e.g. columns holding lists.
+    """
+    try:
+        hashes = pd.util.hash_pandas_object(data, index=True).to_numpy()
+    except TypeError:
+        return None
+    digest = hashlib.blake2b(hashes.tobytes(), digest_size=20)
+    digest.update(json.dumps([[str(col) for col in data.columns], [repr(dtype) for dtype in data.dtypes],
+                              repr(data.index.dtype), len(data)]).encode())
+    return digest.hexdigest()
+
+class StepCache:
+    """
+    A content-addressed cache of pipeline step results, kept in memory and optionally on disk.
+
+    The key of a step's result chains the key of its input with the method name and arguments, and the
+    key of the pipeline's input data is a hash of its values, index, column names and dtypes, so editing
+    a step only recomputes that step and the ones after it. Both tiers are bounded in size and evict
+    the least recently used results first.
+    """
+
+    def __init__(self, directory=None, max_bytes=512 * 1024 ** 2, max_disk_bytes=2 * 1024 ** 3):
+        """
+        Initialize the cache.
+
+        Parameters:
+        - directory: str or None, default=None
+            A directory to also store results in, so they outlive the process. If None, results are only kept in memory.
+        - max_bytes: int, default=512 MiB
+            The maximum size of the results kept in memory.
+        - max_disk_bytes: int, default=2 GiB
+            The maximum total size of the results stored in `directory`.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._nbytes = 0
+
+    def fingerprint(self, data):
+        """
+        Return a hash of a DataFrame's values, index, column names and dtypes, see `frame_fingerprint`.
+        """
+        return frame_fingerprint(data)
+
+    def step_key(self, input_key, step):
+        """
+        Return the key of a step's result given the key of its input, or None if the step cannot be cached,
+        e.g. because its arguments are not JSON-serializable.
+        """
+        if input_key is None or step['method_name'] in UNCACHEABLE_STEPS:
+            return None
+        try:
+            arguments = json.dumps(step, sort_keys=True)
+        except (TypeError, ValueError):
+            return None
+        return hashlib.blake2b(f"{input_key}:{arguments}".encode(), digest_size=20).hexdigest()
+
+    def get(self, key):
+        """
+        Return a copy of the data and change-log messages cached under a key, or None on a cache miss.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        elif self.directory is not None:
+            path = os.path.join(self.directory, f"{key}.pkl")
+            try:
+                data, messages = pd.read_pickle(path)
+            except FileNotFoundError:
+                data = None
+            except (pickle.UnpicklingError, EOFError, OSError, ValueError, TypeError):
+                # A corrupt or partly written entry is a miss, removed so the recomputed result replaces it
+                data = None
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            if data is not None:
+                os.utime(path)  # Mark the entry as recently used
+                entry = self._remember(key, data, messages)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        data, messages, _ = entry
+        return data.copy(), list(messages)
+
+    def put(self, key, data, messages):
+        """
+        Store a copy of a step's resulting data and the change-log messages it added.
+        """
+        data = data.copy()
+        self._remember(key, data, list(messages))
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex}.tmp")
+            try:
+                pd.to_pickle((data, list(messages)), tmp_path)
+                os.replace(tmp_path, os.path.join(self.directory, f"{key}.pkl"))
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            _evict_directory(self.directory, self.max_disk_bytes, ('.pkl',))
+
+    def _remember(self, key, data, messages):
+        nbytes = int(data.memory_usage(index=True, deep=True).sum())
+        if key in self._entries:
+            self._nbytes -= self._entries.pop(key)[2]
+        entry = (data, messages, nbytes)
+        if nbytes <= self.max_bytes:
+            self._entries[key] = entry
+            self._nbytes += nbytes
+            while self._nbytes > self.max_bytes:
+                self._nbytes -= self._entries.popitem(last=False)[1][2]
+        return entry
+
+    def clear(self):
+        """
+        Remove every result from memory and from the cache directory.
+        """
+        self._entries.clear()
+        self._nbytes = 0
+        if self.directory is not None and os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith('.pkl'):
+                    os.remove(os.path.join(self.directory, name))
@@ -1,8 +1,57 @@
 # bamboochute/categorical.py
 import pandas as pd
-from bamboochute.utils import log
+from bamboochute.utils import eager, log
 from bamboochute.bamboo import Bamboo
 
+def _check_categorical(data, column):
+    if column not in data.select_dtypes(include=['category']).columns:
+        raise ValueError(f"Column '{column}' is not a categorical column.")
+
+def _convert_categorical(self, columns, dtypes=None):
+    """
+    Convert columns to categorical, with the categories in `dtypes` where given, see `convert_to_categorical`.
+    """
+    dtypes = dtypes or {}
+    for col in columns:
+        self.data[col] = self.data[col].astype(dtypes.get(col) or 'category')
+        self.log_changes(f"Converted column '{col}' to categorical.")
+
+def _label_encode(self, columns, encoders):
+    """
+    Label-encode columns with fitted `LabelEncoder`s, see `encode_categorical`.
+    """
+    for col in columns:
+        self.data[col] = encoders[col].transform(self.data[col])
+    self.log_changes(f"Applied label encoding to columns: {columns}")
+
+def _apply_frequency(self, column, freq_map):
+    self.data[column] = self.data[column].map(freq_map)
+    self.log_changes(f"Encoded column '{column}' based on frequency.")
+
+def _rare_categories(frequencies, threshold):
+    """
+    Return the categories whose relative frequency is below `threshold`.
+    """
+    return frequencies[frequencies < threshold].index.tolist()
+
+def _replace_rare(self, column, replacement, rare_categories, used=None):
+    """
+    Replace rare categories, see `replace_rare_categories`. The categories left unused afterwards are
+    removed, or, if `used` is given, every category not in `used`.
+    """
+    if replacement not in self.data[column].cat.categories:
+        self.data[column] = self.data[column].cat.add_categories([replacement])
+        
+    mask = self.data[column].isin(rare_categories)
+    self.data.loc[mask, column] = replacement    
+    if used is None:
+        self.data[column] = self.data[column].cat.remove_unused_categories()
+    else:
+        categories = self.data[column].cat.categories
+        self.data[column] = self.data[column].cat.set_categories(categories[categories.isin(used)])
+    
+    self.log_changes(f"Replaced rare categories in column '{column}' with '{replacement}'.")
+
 @log
 def convert_to_categorical(self, columns=None):
     """
@@ -18,11 +67,10 @@ def convert_to_categorical(self, columns=None):
     if columns is None:
         columns = self.data.select_dtypes(include=['object']).columns
 
-    for col in columns:
-        self.data[col] = self.data[col].astype('category')
-        self.log_changes(f"Converted column '{col}' to categorical.")
+    _convert_categorical(self, columns)
     return self
 
+@eager
 @log
 def get_unique_categories(self, column):
     """
@@ -64,10 +112,7 @@ def encode_categorical(self, columns=None, method='onehot'):
         self.log_changes(f"Applied one-hot encoding to columns: {columns}")
     elif method == 'label':
         from sklearn.preprocessing import LabelEncoder
-        le = LabelEncoder()
-        for col in columns:
-            self.data[col] = le.fit_transform(self.data[col])
-        self.log_changes(f"Applied label encoding to columns: {columns}")
+        _label_encode(self, columns, {col: LabelEncoder().fit(self.data[col]) for col in columns})
     else:
         raise ValueError("Unsupported encoding method. Use 'onehot' or 'label'.")
     
@@ -110,9 +155,7 @@ def encode_frequency(self, columns=None):
         columns = self.data.select_dtypes(include=['category']).columns
 
     for col in columns:
-        freq_map = self.data[col].value_counts(normalize=True)
-        self.data[col] = self.data[col].map(freq_map)
-        self.log_changes(f"Encoded column '{col}' based on frequency.")
+        _apply_frequency(self, col, self.data[col].value_counts(normalize=True))
     return self
 
 @log
@@ -136,6 +179,7 @@ def map_categories(self, column, mapping_dict):
     self.log_changes(f"Mapped categories in column '{column}' with {mapping_dict}.")
     return self
 
+@eager
 @log
 def detect_rare_categories(self, column, threshold=0.01):
     """
@@ -150,11 +194,8 @@ def detect_rare_categories(self, column, threshold=0.01):
     Returns:
     - list: A list of rare categories.
     """
-    if column not in self.data.select_dtypes(include=['category']).columns:
-        raise ValueError(f"Column '{column}' is not a categorical column.")
-
-    value_counts = self.data[column].value_counts(normalize=True, dropna=True)
-    rare_categories = value_counts[value_counts < threshold].index.tolist()
+    _check_categorical(self.data, column)
+    rare_categories = _rare_categories(self.data[column].value_counts(normalize=True, dropna=True), threshold)
     self.log_changes(f"Detected rare categories in column '{column}': {rare_categories}")
     return rare_categories
 
@@ -175,16 +216,7 @@ def replace_rare_categories(self, column, threshold=0.01, replacement='Other'):
     - Bamboo: The Bamboo instance with rare categories replaced.
     """
     rare_categories = self.detect_rare_categories(column, threshold)
-
-    if replacement not in self.data[column].cat.categories:
-        self.data[column] = self.data[column].cat.add_categories([replacement])
-        
-    mask = self.data[column].isin(rare_categories)
-    self.data.loc[mask, column] = replacement    
-    self.data[column] = self.data[column].cat.remove_unused_categories()
-    
-    self.log_changes(f"Replaced rare categories in column '{column}' with '{replacement}'.")
-
+    _replace_rare(self, column, replacement, rare_categories)
     return self
 
 Bamboo.convert_to_categorical = convert_to_categorical
@@ -0,0 +1,200 @@
+# bamboochute/cli.py
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from bamboochute.bamboo import Bamboo
+from bamboochute.fileio import (COLUMNAR_EXTENSIONS, COMPRESSION_EXTENSIONS, SQLITE_EXTENSIONS, expand_paths,
+                                infer_compression, is_json_lines)
+from bamboochute.pipelines import BambooPipeline
+from bamboochute.settings.parallel import get_workers
+
+# Maps export formats to the extension given to output files converted to them.
+FORMAT_EXTENSIONS = {
+    'csv': '.csv',
+    'json': '.json',
+    'jsonl': '.jsonl',
+    'excel': '.xlsx',
+    'parquet': '.parquet',
+    'feather': '.feather',
+    'arrow': '.arrow',
+    'sqlite': '.sqlite',
+}
+
+def export_format(path):
+    """
+    Return the `export_data` format for an output path from its extension, e.g. 'parquet' for 'out/a.parquet'.
+    """
+    if is_json_lines(path):
+        return 'jsonl'
+    compression = infer_compression(path)
+    if compression is not None:
+        path = path[:path.rindex('.')]
+    fmt = next((fmt for extension, fmt in COLUMNAR_EXTENSIONS.items() if path.endswith(extension)), None)
+    if fmt is not None:
+        return 'arrow' if fmt == 'ipc' else fmt
+    if path.endswith(SQLITE_EXTENSIONS):
+        return 'sqlite'
+    if path.endswith(('.xls', '.xlsx')):
+        return 'excel'
+    for fmt in ('csv', 'json'):
+        if path.endswith(f".{fmt}"):
+            return fmt
+    raise ValueError(f"Cannot infer the output format of '{path}'. Use --format.")
+
+# The extensions of data files, removed from input names when the outputs are converted to another format
+DATA_EXTENSIONS = {*FORMAT_EXTENSIONS.values(), *COLUMNAR_EXTENSIONS, *SQLITE_EXTENSIONS, '.xls', '.ndjson'}
+
+def _stem(name):
+    """
+    Return a file name without its data and compression extensions, e.g. 'sales.2023' for 'sales.2023.csv.gz'.
+    """
+    stem, extension = os.path.splitext(name)
+    if extension.lower() in COMPRESSION_EXTENSIONS:
+        name = stem
+        stem, extension = os.path.splitext(name)
+    return stem if extension.lower() in DATA_EXTENSIONS else name
+
+def output_paths(inputs, out_dir, format=None):
+    """
+    Return the output path of each input file: its name in `out_dir`, with the extension of `format` if given.
+    """
+    outputs = []
+    for path in inputs:
+        name = os.path.basename(path)
+        if format is not None:
+            name = _stem(name) + FORMAT_EXTENSIONS[format]
+        outputs.append(os.path.join(out_dir, name))
+    duplicates = {path for path in outputs if outputs.count(path) > 1}
+    if duplicates:
+        raise ValueError(f"Several inputs would be written to {sorted(duplicates)}.")
+    overwritten = [path for path, output in zip(inputs, outputs) if os.path.abspath(path) == os.path.abspath(output)]
+    if overwritten:
+        raise ValueError(f"Outputs would overwrite their inputs {overwritten}. Use another --out directory.")
+    return outputs
+
+def clean_file(steps, input_path, output_path, format=None, optimize=False):
+    """
+    Run pipeline steps on one file and write the result, through a temporary file renamed into
+    place so a killed run never leaves a partial output.
+
+    Returns:
+    - dict: The input and output paths, rows in and out, input bytes and seconds taken.
+    """
+    started_at = time.perf_counter()
+    pipeline = BambooPipeline()
+    pipeline.pipeline_steps = steps
+    bamboo = Bamboo(input_path, sys_log=False)
+    rows_in = len(bamboo.data)
+    pipeline.execute_pipeline(bamboo, optimize=optimize)
+    directory, name = os.path.split(output_path)
+    tmp_path = os.path.join(directory, f".tmp-{os.getpid()}-{name}")
+    try:
+        bamboo.export_data(tmp_path, format=format or export_format(output_path))
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return {'input': input_path, 'output': output_path, 'rows_in': rows_in, 'rows_out': len(bamboo.data),
+            'bytes': os.path.getsize(input_path), 'seconds': time.perf_counter() - started_at}
+
+def _throughput(rows, size, seconds):
+    seconds = max(seconds, 1e-9)
+    return f"{rows / seconds:,.0f} rows/s, {size / seconds / 1024 ** 2:,.2f} MB/s"
+
+def _report(result, stream):
+    print(f"{result['input']} -> {result['output']}: {result['rows_in']:,} rows in, {result['rows_out']:,} rows out "
+          f"in {result['seconds']:.2f}s ({_throughput(result['rows_in'], result['bytes'], result['seconds'])})",
+          file=stream, flush=True)
+
+def run(pipeline_path, inputs, out_dir, workers=None, format=None, optimize=False, stream=None):
+    """
+    Apply a saved pipeline to many files, one file per worker process. Each output is written as
+    soon as its file is cleaned, and a line with its throughput is printed as it completes.
+
+    Parameters:
+    - pipeline_path: str
+        The pipeline JSON file, as written by `BambooPipeline.save_pipeline`.
+    - inputs: list of str
+        The input files or glob patterns.
+    - out_dir: str
+        The directory the cleaned files are written to, under the names of their inputs.
+    - workers: int or None, default=None
+        The number of worker processes. If None, the workers of the current context
+        (see `bamboochute.settings.parallel`) are used, by default one per CPU.
+    - format: str or None, default=None
+        The output format, one of the `export_data` formats. If None, each file keeps its input format.
+    - optimize: bool, default=False
+        Whether to run the optimized plan of the pipeline, see `BambooPipeline.explain`.
+    - stream: file or None, default=None
+        Where progress is printed. If None, standard output.
+
+    Returns:
+    - tuple: The results of the cleaned files, see `clean_file`, and a dict mapping failed inputs to their errors.
+    """
+    stream = sys.stdout if stream is None else stream
+    steps = BambooPipeline.load_pipeline(pipeline_path).pipeline_steps
+    inputs = expand_paths(inputs)
+    outputs = output_paths(inputs, out_dir, format)
+    os.makedirs(out_dir, exist_ok=True)
+    if workers is None:
+        workers = get_workers()
+
+    results, failures = [], {}
+    started_at = time.perf_counter()
+    if len(inputs) == 1 or workers == 1:
+        for path, output in zip(inputs, outputs):
+            try:
+                results.append(clean_file(steps, path, output, format, optimize))
+                _report(results[-1], stream)
+            except Exception as e:
+                failures[path] = e
+                print(f"{path}: failed with {e}", file=sys.stderr, flush=True)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(clean_file, steps, path, output, format, optimize): path
+                       for path, output in zip(inputs, outputs)}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                    _report(results[-1], stream)
+                except Exception as e:
+                    failures[futures[future]] = e
+                    print(f"{futures[future]}: failed with {e}", file=sys.stderr, flush=True)
+
+    elapsed = time.perf_counter() - started_at
+    rows = sum(result['rows_in'] for result in results)
+    size = sum(result['bytes'] for result in results)
+    print(f"Cleaned {len(results)} of {len(inputs)} file(s), {rows:,} rows in {elapsed:.2f}s "
+          f"({_throughput(rows, size, elapsed)})", file=stream, flush=True)
+    return results, failures
+
+def main(argv=None):
+    """
+    Entry point of the `bamboochute` command, e.g. `bamboochute run pipeline.json inputs/*.csv --out cleaned`.
+
+    Returns:
+    - int: The exit status, 1 if any file failed.
+    """
+    parser = argparse.ArgumentParser(prog='bamboochute', description="Clean data files with BambooChute pipelines.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help="Apply a saved pipeline to many files in parallel.")
+    run_parser.add_argument('pipeline', help="The pipeline JSON file, as written by BambooPipeline.save_pipeline.")
+    run_parser.add_argument('inputs', nargs='+', help="The input files or glob patterns.")
+    run_parser.add_argument('--out', required=True, help="The directory the cleaned files are written to.")
+    run_parser.add_argument('--workers', type=int, default=None, help="The number of worker processes (default: one per CPU).")
+    run_parser.add_argument('--format', choices=sorted(FORMAT_EXTENSIONS), default=None,
+                            help="The output format (default: the format of each input).")
+    run_parser.add_argument('--optimize', action='store_true', help="Run the optimized plan of the pipeline.")
+    args = parser.parse_args(argv)
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be a positive integer.")
+    try:
+        _, failures = run(args.pipeline, args.inputs, args.out, workers=args.workers, format=args.format,
+                          optimize=args.optimize)
+    except (OSError, ValueError) as e:
+        print(f"bamboochute: {e}", file=sys.stderr)
+        return 2
+    return 1 if failures else 0
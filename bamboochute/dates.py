@@ -1,6 +1,6 @@
 # bamboochute/dates.py
 import pandas as pd
-from bamboochute.utils import log
+from bamboochute.utils import eager, log
 from bamboochute.bamboo import Bamboo
 
 @log
@@ -175,6 +175,7 @@ def round_dates(self, columns=None, freq='D'):
         self.log_changes(f"Rounded dates in column '{col}' to '{freq}'.")
     return self
 
+@eager
 @log
 def detect_time_gaps(self, column, freq='D'):
     """
@@ -1,9 +1,10 @@
 # bamboochute/dtype_validation.py
 import pandas as pd
 import numpy as np
-from bamboochute.utils import log
+from bamboochute.utils import eager, log
 from bamboochute.bamboo import Bamboo
 
+@eager
 @log
 def check_dtype_consistency(self, columns=None):
     """
@@ -40,6 +41,7 @@ def convert_column_types(self, column_type_dict):
         self.log_changes(f"Converted column '{column}' to {dtype}")
     return self
 
+@eager
 @log
 def identify_invalid_types(self, columns=None, expected_dtype=None):
     """
@@ -107,6 +109,7 @@ def coerce_data_types(self, column_type_dict):
         self.log_changes(f"Coerced column '{column}' to {dtype} with error handling")
     return self
 
+@eager
 @log
 def detect_categorical_columns(self):
     """
@@ -119,6 +122,7 @@ def detect_categorical_columns(self):
     self.log_changes("Detected categorical columns")
     return categorical_cols
 
+@eager
 @log
 def detect_numeric_columns(self):
     """
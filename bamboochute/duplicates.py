@@ -1,10 +1,12 @@
 # bamboochute/duplicates.py
+import numpy as np
 import pandas as pd
-from bamboochute.utils import log
+from bamboochute.utils import eager, log
 from bamboochute.bamboo import Bamboo
 from fuzzywuzzy import fuzz
 from fuzzywuzzy import process
 
+@eager
 @log
 def identify_duplicates(self, subset=None):
     """
@@ -39,6 +41,56 @@ def drop_duplicates(self, subset=None, keep='first'):
     self.log_changes(f"Dropped duplicates in columns: {subset if subset else 'all columns'}, keeping {keep}.")
     return self
 
+def _key_columns(data, subset):
+    if subset is None:
+        return list(data.columns)
+    return [subset] if isinstance(subset, str) else list(subset)
+
+def _conform(series, dtype):
+    """
+    Cast a column to the dtype it had when its keys were first computed, if no value changes, since equal
+    values of different dtypes, such as 1 and 1.0, hash differently.
+    """
+    if series.dtype == dtype:
+        return series
+    try:
+        converted = series.astype(dtype)
+    except (TypeError, ValueError):
+        return series
+    unchanged = (converted == series) | (converted.isna() & series.isna())
+    return converted if unchanged.all() else series
+
+def _row_keys(data, subset=None, dtypes=None):
+    """
+    Return a 64-bit hash of the values of each row in `subset`, a compact index of the rows kept by
+    `drop_duplicates` that later batches can be checked against. Columns are first cast to `dtypes`,
+    the dtypes of the data the index was built from, see `_conform`.
+    """
+    columns = _key_columns(data, subset)
+    if dtypes is None:
+        return pd.util.hash_pandas_object(data[columns], index=False).to_numpy()
+    conformed = pd.DataFrame({col: _conform(data[col], dtypes[col]) if col in dtypes else data[col] for col in columns},
+                             index=data.index, columns=columns)
+    return pd.util.hash_pandas_object(conformed, index=False).to_numpy()
+
+def _duplicate_index(data, subset=None):
+    """
+    Return the index of the rows of `data`: the dtypes of the key columns and the sorted keys, see `_row_keys`.
+    """
+    return data[_key_columns(data, subset)].dtypes.to_dict(), np.unique(_row_keys(data, subset))
+
+def _drop_known_duplicates(self, index, subset=None, keep='first'):
+    """
+    Drop duplicate rows, including rows whose keys are in `index`, the index of rows kept earlier built
+    by `_duplicate_index`. Returns the index extended with the rows kept now.
+    """
+    dtypes, keys = index
+    row_keys = _row_keys(self.data, subset, dtypes)
+    kept = ~np.isin(row_keys, keys) & ~self.data.duplicated(subset=subset, keep='first').to_numpy()
+    self.data = self.data[kept].copy()
+    self.log_changes(f"Dropped duplicates in columns: {subset if subset else 'all columns'}, keeping {keep}.")
+    return dtypes, np.union1d(keys, row_keys[kept])
+
 @log
 def mark_duplicates(self, subset=None, keep='first', marker_column='is_duplicate'):
     """
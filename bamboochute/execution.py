@@ -0,0 +1,259 @@
+# bamboochute/execution.py
+import contextvars
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from bamboochute.bamboo import Bamboo
+from bamboochute.aggregates import AGGREGATES, Refinement, apply_step, is_mergeable
+from bamboochute.schema import concat_frames
+from bamboochute.planning import independent_groups, is_column_local, step_spec
+from bamboochute.settings.log import is_logging_enabled
+from bamboochute.settings.parallel import get_workers
+
+def column_stages(steps):
+    """
+    Split pipeline steps into stages: runs of consecutive column-local steps that can be split into
+    independent groups, and single steps that must run on the whole dataset.
+
+    Returns:
+    - list of tuple: (start, end, groups) per stage, where `groups` lists the step indices of each
+      independent group relative to `start`, or is None for a single step run as is.
+    """
+    stages = []
+    i = 0
+    while i < len(steps):
+        end = i
+        while end < len(steps) and is_column_local(step_spec(steps[end])):
+            end += 1
+        groups = independent_groups(steps[i:end]) if end - i > 1 else []
+        if len(groups) > 1:
+            stages.append((i, end, groups))
+            i = end
+        else:
+            stages.append((i, i + 1, None))
+            i += 1
+    return stages
+
+def _extend_change_log(bamboo, messages):
+    # Messages are appended directly, like `log_changes` does, so that merging is not recorded as operations
+    change_log = bamboo.__dict__.setdefault('_change_log', [])
+    for message in messages:
+        if not change_log or change_log[-1] != message:
+            change_log.append(message)
+
+def _run_group(data, steps, sys_log, record_operations=False):
+    """
+    Run steps on a Bamboo holding a subset of the columns. Returns the resulting data, the change-log
+    messages of every step and the operation records, if `record_operations` is set.
+    """
+    bamboo = Bamboo(data, sys_log=sys_log)
+    if record_operations:
+        bamboo.configure_operation_log()
+    messages = []
+    for step in steps:
+        before = len(getattr(bamboo, '_change_log', []))
+        getattr(bamboo, step['method_name'])(**step['arguments'])
+        messages.append(getattr(bamboo, '_change_log', [])[before:])
+    records = list(bamboo._operations.records) if bamboo._operations is not None else []
+    return bamboo.data, messages, records
+
+def run_stage(bamboo, steps, groups, executor='thread', workers=None):
+    """
+    Run independent groups of column-local steps concurrently and merge the results into `bamboo`.
+
+    Each group runs on a copy of only the columns it reads or writes. Written columns are assigned back,
+    new columns are appended in the order the steps created them, and the change log and operation
+    records are merged in step order, so the result matches running the steps one after the other.
+
+    Parameters:
+    - bamboo: Bamboo
+        The Bamboo instance to update.
+    - steps: list of dict
+        The steps of the stage.
+    - groups: list of list
+        The step indices of each independent group, see `planning.independent_groups`.
+    - executor: str, default='thread'
+        'thread' or 'process'. Processes avoid the GIL for Python-level string work but copy the columns.
+    - workers: int or None, default=None
+        The number of workers. If None, the workers of the current context are used.
+    """
+    if executor not in ('thread', 'process'):
+        raise ValueError("executor must be 'thread' or 'process'.")
+    if not bamboo.data.columns.is_unique:
+        # Groups are split and merged by column name, which needs unique names
+        for step in steps:
+            getattr(bamboo, step['method_name'])(**step['arguments'])
+        return bamboo
+
+    specs = [step_spec(step) for step in steps]
+    sys_log = bamboo._sys_log if getattr(bamboo, '_sys_log', None) is not None else is_logging_enabled()
+    record_operations = getattr(bamboo, '_operations', None) is not None
+    workers = min(workers or get_workers() or len(groups), len(groups))
+
+    tasks = []
+    for group in groups:
+        touched = set().union(*(specs[i]['reads'] | specs[i]['writes'] for i in group))
+        columns = [col for col in bamboo.data.columns if col in touched]
+        # A new frame rather than a slice, so the group's assignments do not warn about chained assignment
+        data = pd.DataFrame({col: bamboo.data[col] for col in columns}, index=bamboo.data.index, columns=columns)
+        tasks.append((data, [steps[i] for i in group]))
+
+    pool = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    with pool(max_workers=workers) as pool_executor:
+        if executor == 'thread':
+            # Threads do not inherit context variables, so each task runs in a copy of the caller's context
+            futures = [pool_executor.submit(contextvars.copy_context().run, _run_group, data, group_steps, sys_log,
+                                            record_operations) for data, group_steps in tasks]
+        else:
+            futures = [pool_executor.submit(_run_group, data, group_steps, sys_log, record_operations)
+                       for data, group_steps in tasks]
+        results = [future.result() for future in futures]
+
+    existing = set(bamboo.data.columns)
+    new_columns = []
+    messages = [None] * len(steps)
+    records = []
+    for group, (data, group_messages, group_records) in zip(groups, results):
+        for col in data.columns:
+            if col in existing:
+                if any(col in specs[i]['writes'] for i in group):
+                    bamboo.data[col] = data[col]
+            else:
+                first = min((i for i in group if col in specs[i]['writes']), default=group[-1])
+                new_columns.append((first, col, data[col]))
+        for i, step_messages in zip(group, group_messages):
+            messages[i] = step_messages
+        records.extend(group_records)
+
+    for _, col, values in sorted(new_columns, key=lambda item: item[0]):
+        bamboo.data[col] = values
+    for step_messages in messages:
+        _extend_change_log(bamboo, step_messages)
+    if getattr(bamboo, '_operations', None) is not None:
+        bamboo._operations.records.extend(sorted(records, key=lambda record: record['started_at']))
+    return bamboo
+
+# Steps that remove rows by looking at each row on its own; every other row filter needs all rows
+ROW_LOCAL_FILTERS = ('drop_missing', 'handle_invalid_dates')
+
+def is_row_local(step):
+    """
+    Return whether a step computes each output row from the same input row only, so running it on
+    row partitions and concatenating the results equals running it on the whole dataset.
+    """
+    spec = step_spec(step)
+    if spec['kind'] in ('row_wise', 'drop'):
+        return True
+    return spec['kind'] == 'row_filter' and step['method_name'] in ROW_LOCAL_FILTERS
+
+def _split_rows(data, partitions, copy):
+    # Empty partitions would change the dtypes of the concatenated results, e.g. integer codes to floats
+    partitions = max(1, min(partitions, len(data)))
+    bounds = np.linspace(0, len(data), partitions + 1).astype(int)
+    return [data.iloc[start:stop].copy() if copy else data.iloc[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+def _run_partition(data, operations, aggregate, sys_log):
+    """
+    Run operations on one row partition, then compute the partial aggregate of the next mergeable step.
+    Operations are ('run', step, None) to call the step's method, or ('apply', step, state) to apply
+    the merged statistics of a mergeable step. Returns the data, the partial and the change-log messages.
+    """
+    bamboo = Bamboo(data, sys_log=sys_log)
+    for kind, step, state in operations:
+        if kind == 'apply':
+            apply_step(bamboo, step, state)
+        else:
+            getattr(bamboo, step['method_name'])(**step['arguments'])
+    partial = None
+    if aggregate is not None:
+        partial = AGGREGATES[aggregate['method_name']]['partial'](bamboo.data, **aggregate['arguments'])
+    return bamboo.data, partial, getattr(bamboo, '_change_log', [])
+
+def _refine_partition(data, aggregate, request):
+    """
+    Answer a refinement request of a mergeable step on one row partition, see `aggregates.Refinement`.
+    """
+    return AGGREGATES[aggregate['method_name']]['refine'](data, request, **aggregate['arguments'])
+
+def run_partitioned(bamboo, steps, partitions, executor='process', workers=None):
+    """
+    Run pipeline steps on row partitions of the data in a pool of workers and concatenate the results.
+
+    Row-local steps run on each partition as they are. Steps that need statistics over all rows, such as
+    `impute_missing` or `remove_outliers`, run in two phases: every partition computes a partial aggregate
+    (e.g. sums and counts, value counts), the partials are merged into the statistics of the whole dataset,
+    and the partitions are then updated with those statistics. Any other step gathers the partitions and
+    runs on the whole dataset before the data is partitioned again. The change log matches a sequential run;
+    operation records are kept for the steps run on the whole dataset.
+
+    Parameters:
+    - bamboo: Bamboo
+        The Bamboo instance to update.
+    - steps: list of dict
+        The pipeline steps.
+    - partitions: int
+        The number of row partitions.
+    - executor: str, default='process'
+        'process' or 'thread'. Processes run the partitions in parallel but copy the data to the workers.
+    - workers: int or None, default=None
+        The number of workers. If None, the workers of the current context are used.
+    """
+    if executor not in ('thread', 'process'):
+        raise ValueError("executor must be 'thread' or 'process'.")
+    if not isinstance(partitions, int) or partitions < 1:
+        raise ValueError("partitions must be a positive integer.")
+
+    sys_log = bamboo._sys_log if getattr(bamboo, '_sys_log', None) is not None else is_logging_enabled()
+    workers = min(workers or get_workers() or partitions, partitions)
+    # Threads share the data, so each partition gets its own copy to modify
+    copy = executor == 'thread'
+    pool = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    with pool(max_workers=workers) as pool_executor:
+        # The partitions are split lazily and set to None while the data is gathered in `bamboo`
+        frames = None
+        pending = []
+
+        def run_round(aggregate=None):
+            nonlocal frames, pending
+            if frames is None:
+                frames = _split_rows(bamboo.data, partitions, copy)
+            if executor == 'thread':
+                futures = [pool_executor.submit(contextvars.copy_context().run, _run_partition, frame, pending,
+                                                aggregate, sys_log) for frame in frames]
+            else:
+                futures = [pool_executor.submit(_run_partition, frame, pending, aggregate, sys_log) for frame in frames]
+            results = [future.result() for future in futures]
+            frames = [data for data, _, _ in results]
+            pending = []
+            # Every partition logs the same messages
+            _extend_change_log(bamboo, results[0][2])
+            return [partial for _, partial, _ in results]
+
+        def refine_round(aggregate, request):
+            # Only the columns searched are sent, as the partitions stay unchanged between rounds
+            columns = list(dict.fromkeys(col for col, _ in request))
+            futures = [pool_executor.submit(_refine_partition, frame if copy else frame[columns], aggregate, request)
+                       for frame in frames]
+            return [future.result() for future in futures]
+
+        for step in steps:
+            if is_row_local(step):
+                pending.append(('run', step, None))
+            elif is_mergeable(step):
+                partials = run_round(step)
+                state = AGGREGATES[step['method_name']]['merge'](partials, **step['arguments'])
+                while isinstance(state, Refinement):
+                    state = state.resume(refine_round(step, state.request))
+                pending = [('apply', step, state)]
+            else:
+                if pending:
+                    run_round()
+                if frames is not None:
+                    bamboo.data = concat_frames(frames, ignore_index=False)
+                    frames = None
+                getattr(bamboo, step['method_name'])(**step['arguments'])
+        if pending:
+            run_round()
+    if frames is not None:
+        bamboo.data = concat_frames(frames, ignore_index=False)
+    return bamboo
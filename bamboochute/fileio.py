@@ -0,0 +1,487 @@
+# bamboochute/fileio.py
+import bz2
+import glob
+import gzip
+import io
+import lzma
+import os
+import sqlite3
+import warnings
+import numpy as np
+import pandas as pd
+
+# Maps columnar file extensions to the corresponding pyarrow dataset format.
+COLUMNAR_EXTENSIONS = {
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'ipc',
+    '.ipc': 'ipc',
+}
+
+def _is_pattern(path):
+    # Existing files whose names contain glob characters, such as 'data[2024].csv', are read as they are
+    return any(char in path for char in '*?[') and not os.path.exists(path)
+
+def is_multi_source(data):
+    """
+    Return True if `data` refers to several files: a list or tuple of paths, or a glob pattern
+    that is not the path of an existing file.
+    """
+    if isinstance(data, (list, tuple)):
+        return True
+    return isinstance(data, str) and _is_pattern(data)
+
+def expand_paths(data):
+    """
+    Expand a glob pattern or a list of paths/patterns into a list of file paths.
+    """
+    patterns = [data] if isinstance(data, str) else list(data)
+    paths = []
+    for pattern in patterns:
+        if not isinstance(pattern, str):
+            raise ValueError("Every source must be a file path!")
+        if _is_pattern(pattern):
+            matches = sorted(glob.glob(pattern))
+            if not matches:
+                raise ValueError(f"No files matched the pattern '{pattern}'.")
+            paths.extend(matches)
+        else:
+            paths.append(pattern)
+    if not paths:
+        raise ValueError("No files to load!")
+    return paths
+
+# Maps file extensions to the compression inferred for text exports.
+COMPRESSION_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+    '.zst': 'zstd',
+}
+
+def infer_compression(path, compression='infer'):
+    """
+    Resolve the compression to use for `path`. With 'infer', it is derived from the file extension.
+    """
+    if compression != 'infer':
+        return compression
+    for extension, inferred in COMPRESSION_EXTENSIONS.items():
+        if path.endswith(extension):
+            return inferred
+    return None
+
+def is_json_lines(path):
+    """
+    Return True if `path` is a JSON Lines file, optionally compressed (e.g. 'events.jsonl.gz').
+    """
+    compression = infer_compression(path)
+    if compression is not None:
+        path = path[:path.rindex('.')]
+    return path.endswith(('.jsonl', '.ndjson'))
+
+def iter_json_lines(path, chunksize=100_000, columns=None, dtype=None):
+    """
+    Parse a JSON Lines file in batches of at most `chunksize` records.
+
+    Parameters:
+    - path: str
+        The path to a `.jsonl` or `.ndjson` file, optionally compressed.
+    - chunksize: int, default=100000
+        The number of records parsed per batch.
+    - columns: list or None, default=None
+        Only keep these fields. If None, all fields are kept.
+    - dtype: dict or None, default=None
+        A mapping of field names to dtypes applied while parsing each batch.
+
+    Yields:
+    - pd.DataFrame: The next batch of records.
+    """
+    with pd.read_json(path, lines=True, chunksize=chunksize, dtype=dtype if dtype else True) as reader:
+        for chunk in reader:
+            yield chunk if columns is None else chunk[columns]
+
+def open_text_output(path, compression='infer', mode='w'):
+    """
+    Open a text handle for writing, transparently compressing with gzip, bz2, xz or zstd.
+
+    Parameters:
+    - path: str
+        The output path.
+    - compression: str or None, default='infer'
+        One of 'gzip', 'bz2', 'xz', 'zstd', None, or 'infer' to derive it from the extension.
+    - mode: str, default='w'
+        'w' to overwrite or 'a' to append.
+
+    Returns:
+    - A writable text file object.
+    """
+    if mode not in ('w', 'a'):
+        raise ValueError("mode must be 'w' or 'a'.")
+    compression = infer_compression(path, compression)
+    text_mode = mode + 't'
+
+    if compression is None:
+        return open(path, mode, newline='', encoding='utf-8')
+    elif compression == 'gzip':
+        return gzip.open(path, text_mode, newline='', encoding='utf-8')
+    elif compression == 'bz2':
+        return bz2.open(path, text_mode, newline='', encoding='utf-8')
+    elif compression == 'xz':
+        return lzma.open(path, text_mode, newline='', encoding='utf-8')
+    elif compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstandard is required for zstd compression. Install it with 'pip install zstandard'.")
+        raw = open(path, mode + 'b')
+        return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(raw), newline='', encoding='utf-8')
+    else:
+        raise ValueError("Unsupported compression! Choose from 'gzip', 'bz2', 'xz', or 'zstd'.")
+
+def write_text(data, path, format, compression='infer', chunksize=100_000, mode='w'):
+    """
+    Write a DataFrame as CSV, JSON or JSON Lines in row batches, so only one batch is formatted
+    in memory at a time.
+
+    Parameters:
+    - data: pd.DataFrame
+        The data to write.
+    - path: str
+        The output path.
+    - format: str
+        One of 'csv', 'json' or 'jsonl'.
+    - compression: str or None, default='infer'
+        The compression to apply, see `open_text_output`.
+    - chunksize: int, default=100000
+        The number of rows formatted per batch.
+    - mode: str, default='w'
+        'w' to overwrite or 'a' to append. Appending is only supported for CSV and JSON Lines.
+    """
+    if format not in ('csv', 'json', 'jsonl'):
+        raise ValueError(f"Unsupported text format: {format}")
+    if format == 'json' and mode == 'a':
+        raise ValueError("Appending is only supported for 'csv' and 'jsonl' exports.")
+    if not isinstance(chunksize, int) or chunksize <= 0:
+        raise ValueError("chunksize must be a positive integer.")
+
+    # Only write the CSV header when starting a new file
+    header = mode == 'w' or not os.path.exists(path) or os.path.getsize(path) == 0
+
+    with open_text_output(path, compression=compression, mode=mode) as handle:
+        if format == 'json':
+            handle.write('[')
+        for start in range(0, len(data), chunksize):
+            batch = data.iloc[start:start + chunksize]
+            if format == 'csv':
+                batch.to_csv(handle, index=False, header=header and start == 0)
+            elif format == 'jsonl':
+                text = batch.to_json(orient='records', lines=True)
+                handle.write(text if text.endswith('\n') else text + '\n')
+            else:
+                text = batch.to_json(orient='records')
+                handle.write((',' if start else '') + text[1:-1])
+        if format == 'json':
+            handle.write(']')
+
+# Extensions recognized as SQLite databases.
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+def iter_sqlite(database, query, params=None, chunksize=100_000):
+    """
+    Run a query against a SQLite database and fetch the result through the cursor in batches.
+
+    Parameters:
+    - database: str
+        The path to the SQLite database.
+    - query: str
+        The SQL query to run.
+    - params: sequence or dict or None, default=None
+        Parameters bound to the placeholders of the query.
+    - chunksize: int, default=100000
+        The number of rows fetched per batch.
+
+    Yields:
+    - pd.DataFrame: The next batch of rows, or a single empty DataFrame with the result columns.
+    """
+    if not isinstance(chunksize, int) or chunksize <= 0:
+        raise ValueError("chunksize must be a positive integer.")
+    connection = sqlite3.connect(database)
+    try:
+        cursor = connection.execute(query, params or ())
+        columns = [description[0] for description in cursor.description or []]
+        fetched = False
+        while True:
+            rows = cursor.fetchmany(chunksize)
+            if not rows:
+                break
+            fetched = True
+            yield pd.DataFrame.from_records(rows, columns=columns)
+        if not fetched:
+            yield pd.DataFrame(columns=columns)
+    finally:
+        connection.close()
+
+def _quote_identifier(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _sqlite_type(dtype):
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'TIMESTAMP'
+    return 'TEXT'
+
+def _sqlite_rows(batch):
+    """
+    Convert a batch of rows to tuples of Python values that sqlite3 can bind, with missing values as None.
+    """
+    batch = batch.copy()
+    for col in batch.columns:
+        if pd.api.types.is_datetime64_any_dtype(batch[col]):
+            batch[col] = batch[col].dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+        elif pd.api.types.is_timedelta64_dtype(batch[col]) or isinstance(batch[col].dtype, pd.PeriodDtype):
+            batch[col] = batch[col].astype(str)
+    values = batch.astype(object)
+    values = values.where(batch.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+def write_sqlite(data, database, table='data', if_exists='replace', chunksize=100_000):
+    """
+    Write a DataFrame to a SQLite table with batched `executemany` inserts inside a single transaction.
+
+    Parameters:
+    - data: pd.DataFrame
+        The data to write.
+    - database: str
+        The path to the SQLite database. It is created if it does not exist.
+    - table: str, default='data'
+        The name of the table to write to.
+    - if_exists: str, default='replace'
+        What to do if the table exists: 'fail', 'replace' or 'append'.
+    - chunksize: int, default=100000
+        The number of rows inserted per `executemany` call.
+    """
+    if if_exists not in ('fail', 'replace', 'append'):
+        raise ValueError("if_exists must be 'fail', 'replace' or 'append'.")
+    if not isinstance(chunksize, int) or chunksize <= 0:
+        raise ValueError("chunksize must be a positive integer.")
+
+    name = _quote_identifier(table)
+    definitions = ', '.join(f"{_quote_identifier(col)} {_sqlite_type(dtype)}" for col, dtype in data.dtypes.items())
+    insert = f"INSERT INTO {name} VALUES ({', '.join('?' * len(data.columns))})"
+
+    connection = sqlite3.connect(database, isolation_level=None)
+    try:
+        exists = connection.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (str(table),)).fetchone()
+        if exists and if_exists == 'fail':
+            raise ValueError(f"Table '{table}' already exists.")
+
+        connection.execute('BEGIN')
+        try:
+            if exists and if_exists == 'replace':
+                connection.execute(f"DROP TABLE {name}")
+            connection.execute(f"CREATE TABLE IF NOT EXISTS {name} ({definitions})")
+            for start in range(0, len(data), chunksize):
+                connection.executemany(insert, _sqlite_rows(data.iloc[start:start + chunksize]))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+    finally:
+        connection.close()
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("pyarrow is required for Parquet, Feather and Arrow IPC support. Install it with 'pip install pyarrow'.")
+    return pyarrow
+
+def columnar_format(path):
+    """
+    Return the pyarrow format name for a columnar file path, or None if the path is not columnar.
+    """
+    for extension, fmt in COLUMNAR_EXTENSIONS.items():
+        if path.endswith(extension):
+            return fmt
+    return None
+
+def source_columns(data):
+    """
+    Return the column names of a DataFrame, CSV file or columnar file without reading its rows,
+    or None if they cannot be read cheaply, e.g. for JSON, Excel or multi-file sources.
+    """
+    if isinstance(data, pd.DataFrame):
+        return list(data.columns)
+    if not isinstance(data, str) or is_multi_source(data) or not os.path.exists(data):
+        return None
+    if data.endswith('.csv'):
+        return list(pd.read_csv(data, nrows=0).columns)
+    fmt = columnar_format(data)
+    if fmt is None:
+        return None
+    pa = _import_pyarrow()
+    # Parquet files written by Pandas may store the index as extra columns
+    return [name for name in pa.dataset.dataset(data, format=fmt).schema.names if not name.startswith('__index_level_')]
+
+def read_columnar(path, columns=None, filters=None):
+    """
+    Read a Parquet, Feather or Arrow IPC file, only materializing the requested columns and rows.
+
+    Parameters:
+    - path: str
+        The path to the columnar file.
+    - columns: list or None, default=None
+        The columns to read. If None, all columns are read.
+    - filters: list of tuples or None, default=None
+        Row filter predicates such as [('age', '>', 30), ('city', 'in', ['NY', 'LA'])].
+        A list of lists of tuples is interpreted as a disjunction of conjunctions.
+
+    Returns:
+    - pd.DataFrame: The loaded data.
+    """
+    pa = _import_pyarrow()
+    fmt = columnar_format(path)
+    if fmt is None:
+        raise ValueError(f"Unsupported columnar file format: {path}")
+
+    expression = pa.parquet.filters_to_expression(filters) if filters else None
+    dataset = pa.dataset.dataset(path, format=fmt)
+    table = dataset.to_table(columns=columns, filter=expression)
+    return table.to_pandas()
+
+def iter_columnar(path, chunksize, columns=None, filters=None):
+    """
+    Iterate over a Parquet, Feather or Arrow IPC file in record batches of at most `chunksize` rows.
+    """
+    pa = _import_pyarrow()
+    expression = pa.parquet.filters_to_expression(filters) if filters else None
+    dataset = pa.dataset.dataset(path, format=columnar_format(path))
+    for batch in dataset.to_batches(columns=columns, filter=expression, batch_size=chunksize):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+def read_memory_mapped(path, columns=None):
+    """
+    Open an Arrow IPC or NumPy `.npy` file through a memory map without copying it into process memory.
+    Primitive columns without missing values are backed directly by the mapped file, so the
+    resulting DataFrame is read-only. Arrow files written in several record batches cannot be
+    mapped column by column and are copied, with a warning.
+
+    Parameters:
+    - path: str
+        The path to an uncompressed Arrow IPC/Feather file or a `.npy` file.
+    - columns: list or None, default=None
+        For Arrow files, the columns to select. For 2-D `.npy` arrays, the names to give the columns.
+
+    Returns:
+    - pd.DataFrame: A DataFrame backed by the memory-mapped file.
+    """
+    if path.endswith('.npy'):
+        array = np.load(path, mmap_mode='r')
+        if array.dtype.names:
+            names = array.dtype.names if columns is None else columns
+            return pd.DataFrame({name: array[name] for name in names}, copy=False)
+        if array.ndim == 1:
+            array = array.reshape(-1, 1)
+        if array.ndim != 2:
+            raise ValueError("Only 1-D, 2-D and structured .npy arrays can be loaded as a dataset.")
+        return pd.DataFrame(array, columns=columns, copy=False)
+
+    if columnar_format(path) not in ('ipc', 'feather'):
+        raise ValueError("Memory mapping is only supported for Arrow IPC, Feather and .npy files!")
+
+    pa = _import_pyarrow()
+    source = pa.memory_map(path, 'r')
+    table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    if any(column.num_chunks > 1 for column in table.columns):
+        # Pandas needs each column in one contiguous array, so columns split over batches are copied
+        warnings.warn(f"'{path}' holds {table.column(0).num_chunks} record batches, so its columns are copied into "
+                      "memory instead of memory-mapped. Export it with `chunksize` of at least its number of rows "
+                      "to write a single batch.", UserWarning, stacklevel=2)
+    return table.to_pandas(split_blocks=True)
+
+def write_columnar(data, path, format, compression='infer', chunksize=100_000):
+    """
+    Write a DataFrame to a Parquet, Feather or Arrow IPC file in row batches, so only one batch
+    is converted to Arrow memory at a time.
+
+    Parameters:
+    - data: pd.DataFrame
+        The data to write.
+    - path: str
+        The output path.
+    - format: str
+        One of 'parquet', 'feather' or 'arrow'.
+    - compression: str or None, default='infer'
+        The codec to use, e.g. 'snappy' or 'zstd'. With 'infer', Parquet uses snappy and
+        Feather/Arrow files are left uncompressed so they can be memory-mapped.
+    - chunksize: int, default=100000
+        The number of rows converted per batch.
+    """
+    pa = _import_pyarrow()
+    if format not in ('parquet', 'feather', 'arrow'):
+        raise ValueError(f"Unsupported columnar format: {format}")
+    if not isinstance(chunksize, int) or chunksize <= 0:
+        raise ValueError("chunksize must be a positive integer.")
+
+    schema = pa.Schema.from_pandas(data, preserve_index=False)
+
+    def write_batches(writer):
+        for start in range(0, len(data), chunksize):
+            batch = data.iloc[start:start + chunksize]
+            writer.write_table(pa.Table.from_pandas(batch, schema=schema, preserve_index=False))
+
+    if format == 'parquet':
+        codec = 'snappy' if compression == 'infer' else compression
+        with pa.parquet.ParquetWriter(path, schema, compression=codec) as writer:
+            write_batches(writer)
+    else:
+        options = pa.ipc.IpcWriteOptions(compression=None if compression == 'infer' else compression)
+        with pa.OSFile(path, 'wb') as sink:
+            with pa.ipc.new_file(sink, schema, options=options) as writer:
+                write_batches(writer)
+
+def iter_chunks(data, chunksize=100_000, **kwargs):
+    """
+    Iterate over a dataset in bounded chunks without materializing it in memory.
+
+    Parameters:
+    - data: pd.DataFrame or str
+        A DataFrame or the path to a CSV, JSON Lines, Parquet, Feather or Arrow IPC file, or to a
+        SQLite database, in which case a `query` keyword argument is required.
+    - chunksize: int, default=100000
+        The maximum number of rows in each chunk.
+    - kwargs: dict
+        Additional keyword arguments passed to the underlying Pandas reader.
+
+    Yields:
+    - pd.DataFrame: The next chunk of rows.
+    """
+    if not isinstance(chunksize, int) or chunksize <= 0:
+        raise ValueError("chunksize must be a positive integer.")
+
+    if isinstance(data, pd.DataFrame):
+        for start in range(0, len(data), chunksize):
+            yield data.iloc[start:start + chunksize]
+    elif isinstance(data, str):
+        if data.endswith('.csv'):
+            with pd.read_csv(data, chunksize=chunksize, **kwargs) as reader:
+                yield from reader
+        elif is_json_lines(data):
+            yield from iter_json_lines(data, chunksize, **kwargs)
+        elif data.endswith(SQLITE_EXTENSIONS):
+            yield from iter_sqlite(data, chunksize=chunksize, **kwargs)
+        elif columnar_format(data) is not None:
+            yield from iter_columnar(data, chunksize, **kwargs)
+        else:
+            raise ValueError("Chunked loading is only supported for CSV, JSON Lines, SQLite, Parquet, Feather and Arrow IPC files!")
+    else:
+        raise ValueError("Unsupported data type! Must be a Pandas DataFrame or a valid file path.")
@@ -1,9 +1,69 @@
 # bamboochute/formatting.py
 import pandas as pd
+import numpy as np
 import re
 from bamboochute.utils import log
 from bamboochute.bamboo import Bamboo
 
+# Inferred dtypes of object columns on which the `.str` accessor applies string methods element by element
+_STRING_INFERRED_TYPES = ('string', 'empty', 'mixed', 'mixed-integer')
+
+def _trim_series(series):
+    return series.str.strip().str.replace(r'\s+', ' ', regex=True)
+
+def _case_series(series, case):
+    if case == 'lower':
+        return series.str.lower()
+    elif case == 'upper':
+        return series.str.upper()
+    elif case == 'title':
+        return series.str.title()
+    return series
+
+def _remove_characters_series(series, chars_to_remove):
+    return series.str.replace(chars_to_remove, '', regex=True)
+
+def _string_operation(method_name, arguments):
+    """
+    Return the columns argument, the Series function, the element functions and the change-log message
+    of a string formatting step. The element functions match what the `.str` accessor calls on each value.
+    """
+    columns = arguments.get('columns')
+    if method_name == 'trim_whitespace':
+        whitespace = re.compile(r'\s+')
+        return (columns, _trim_series, [lambda x: x.strip(), lambda x: whitespace.sub(' ', x)],
+                lambda col: f"Trimmed whitespace in column '{col}'")
+    if method_name == 'standardize_case':
+        case = arguments.get('case', 'lower')
+        functions = {'lower': [lambda x: x.lower()], 'upper': [lambda x: x.upper()], 'title': [lambda x: x.title()]}
+        return (columns, lambda series: _case_series(series, case), functions.get(case, []),
+                lambda col: f"Standardized case to {case} in column '{col}'")
+    if method_name == 'remove_special_characters':
+        chars_to_remove = arguments.get('chars_to_remove')
+        pattern = re.compile(r'[^\w\s]' if chars_to_remove is None else chars_to_remove)
+        return (columns, lambda series: _remove_characters_series(series, pattern.pattern), [lambda x: pattern.sub('', x)],
+                lambda col: f"Removed special characters in column '{col}'")
+    raise ValueError(f"Unsupported string step: {method_name}")
+
+def _apply_fused(series, functions):
+    """
+    Apply element functions in one pass over an object column. Missing values are kept, and values the
+    functions cannot handle become NaN, like the `.str` accessor does.
+    """
+    def apply(value):
+        for function in functions:
+            try:
+                value = function(value)
+            except (TypeError, AttributeError):
+                value = np.nan
+        return value
+
+    values = series.to_numpy(dtype=object, copy=True)
+    positions = np.flatnonzero(~pd.isna(values))
+    if len(positions):
+        values[positions] = np.frompyfunc(apply, 1, 1)(values[positions])
+    return pd.Series(values, index=series.index, name=series.name, dtype=object)
+
 @log
 def trim_whitespace(self, columns=None):
     """
@@ -20,7 +80,7 @@ def trim_whitespace(self, columns=None):
         columns = self.data.select_dtypes(include=['object']).columns
 
     for col in columns:
-        self.data[col] = self.data[col].str.strip().str.replace(r'\s+', ' ', regex=True)
+        self.data[col] = _trim_series(self.data[col])
         self.log_changes(f"Trimmed whitespace in column '{col}'")
     return self
 
@@ -42,12 +102,8 @@ def standardize_case(self, case='lower', columns=None):
         columns = self.data.select_dtypes(include=['object']).columns
 
     for col in columns:
-        if case == 'lower':
-            self.data[col] = self.data[col].str.lower()
-        elif case == 'upper':
-            self.data[col] = self.data[col].str.upper()
-        elif case == 'title':
-            self.data[col] = self.data[col].str.title()
+        if case in ('lower', 'upper', 'title'):
+            self.data[col] = _case_series(self.data[col], case)
         self.log_changes(f"Standardized case to {case} in column '{col}'")
     return self
 
@@ -99,10 +155,50 @@ def remove_special_characters(self, columns=None, chars_to_remove=None):
         chars_to_remove = r'[^\w\s]'  # Default is to remove any non-word and non-space characters
 
     for col in columns:
-        self.data[col] = self.data[col].str.replace(chars_to_remove, '', regex=True)
+        self.data[col] = _remove_characters_series(self.data[col], chars_to_remove)
         self.log_changes(f"Removed special characters in column '{col}'")
     return self
 
+@log
+def transform_strings(self, steps):
+    """
+    Apply several string formatting steps (`trim_whitespace`, `standardize_case` and
+    `remove_special_characters`) in a single pass over each column, instead of one pass per step.
+    The result equals running the steps one after the other.
+
+    Parameters:
+    - steps: list of dict
+        The steps to apply in order, each with a 'method_name' and its 'arguments', as stored in a BambooPipeline.
+
+    Returns:
+    - Bamboo: The Bamboo instance with the formatted string columns.
+    """
+    operations = []
+    for step in steps:
+        columns, series_function, functions, message = _string_operation(step['method_name'], step.get('arguments', {}))
+        if columns is None:
+            columns = self.data.select_dtypes(include=['object']).columns
+        elif isinstance(columns, str):
+            columns = [columns]
+        operations.append((list(columns), series_function, functions, message))
+
+    ordered = list(dict.fromkeys(col for columns, _, _, _ in operations for col in columns))
+    for col in ordered:
+        applied = [operation for operation in operations if col in operation[0]]
+        series = self.data[col]
+        if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) in _STRING_INFERRED_TYPES:
+            series = _apply_fused(series, [function for _, _, functions, _ in applied for function in functions])
+        else:
+            # Other dtypes keep the exact behavior, including errors, of the individual steps
+            for _, series_function, _, _ in applied:
+                series = series_function(series)
+        self.data[col] = series
+
+    for columns, _, _, message in operations:
+        for col in columns:
+            self.log_changes(message(col))
+    return self
+
 @log
 def standardize_currency_format(self, columns=None):
     """
@@ -130,4 +226,5 @@ Bamboo.trim_whitespace = trim_whitespace
 Bamboo.standardize_case = standardize_case
 Bamboo.format_dates = format_dates
 Bamboo.remove_special_characters = remove_special_characters
+Bamboo.transform_strings = transform_strings
 Bamboo.standardize_currency_format = standardize_currency_format
\ No newline at end of file
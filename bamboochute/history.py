@@ -0,0 +1,333 @@
+# bamboochute/history.py
+import os
+import shutil
+import tempfile
+import uuid
+import weakref
+import numpy as np
+import pandas as pd
+from bamboochute.fileio import read_columnar, write_columnar
+
+# A changed column is stored as a row patch against its previous version while at most this
+# fraction of its rows changed; beyond that a full copy is smaller.
+MAX_PATCH_RATIO = 0.5
+
+def _values(series):
+    """
+    Return the values of a Series as a NumPy array for NumPy dtypes, or its ExtensionArray otherwise, without copying.
+    """
+    return series.to_numpy(copy=False) if isinstance(series.dtype, np.dtype) else series.array
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+class _Block:
+    """
+    A column copy owned by the history, kept in memory or spilled to a compressed file on disk.
+    Spilled blocks are read back on demand and their file is removed once the block is released.
+    """
+    __slots__ = ('series', 'index', 'dtype', 'nbytes', 'path', '__weakref__')
+
+    def __init__(self, series):
+        self.series = series
+        self.index = series.index
+        self.dtype = series.dtype
+        self.nbytes = int(series.memory_usage(index=False, deep=True))
+        self.path = None
+
+    @property
+    def spilled(self):
+        return self.series is None
+
+    def values(self):
+        if not self.spilled:
+            return _values(self.series)
+        if self.path.endswith('.arrow'):
+            series = read_columnar(self.path)['values']
+            if series.dtype != self.dtype:
+                series = series.astype(self.dtype)
+        else:
+            series = pd.read_pickle(self.path)
+        return _values(series)
+
+    def spill(self, directory):
+        """
+        Write the block to `directory` and release its memory. Object columns are pickled so that
+        the exact Python values survive the round trip; other columns are stored as Arrow IPC.
+        """
+        name = os.path.join(directory, uuid.uuid4().hex)
+        frame = pd.DataFrame({'values': self.series.reset_index(drop=True)})
+        path = None
+        if self.dtype != object:
+            try:
+                write_columnar(frame, f"{name}.arrow", 'arrow', compression='zstd')
+                path = f"{name}.arrow"
+            except (ImportError, TypeError, ValueError, NotImplementedError):
+                _remove_file(f"{name}.arrow")
+        if path is None:
+            path = f"{name}.pkl.gz"
+            self.series.reset_index(drop=True).to_pickle(path, compression={'method': 'gzip', 'compresslevel': 1})
+        self.path = path
+        self.series = None
+        weakref.finalize(self, _remove_file, path)
+
+class _ColumnSnapshot:
+    """
+    The state of one column in a snapshot, expressed against a `base` block owned by the history.
+
+    The column equals `base`, optionally reordered/filtered to the rows at `take`, with the rows at
+    `positions` replaced by `values`. Unchanged columns share the same base across snapshots.
+    """
+    __slots__ = ('base', 'take', 'positions', 'values')
+
+    def __init__(self, base, take=None, positions=None, values=None):
+        self.base = base
+        self.take = take
+        self.positions = positions
+        self.values = values
+
+    def materialize(self):
+        values = self.base.values()
+        if self.take is not None:
+            values = values.take(self.take)
+        if self.positions is not None:
+            if self.take is None:
+                values = values.copy()
+            values[self.positions] = self.values
+        return values
+
+    def nbytes(self):
+        """
+        The memory held by this snapshot beyond the bases it shares.
+        """
+        size = 0
+        if self.positions is not None:
+            size += self.positions.nbytes + self.values.nbytes
+        return size
+
+class _FrameSnapshot:
+    __slots__ = ('index', 'columns', 'entries')
+
+    def __init__(self, index, columns, entries):
+        self.index = index
+        self.columns = columns
+        self.entries = entries
+
+    def materialize(self):
+        arrays = {i: entry.materialize() for i, entry in enumerate(self.entries)}
+        frame = pd.DataFrame(arrays, index=self.index, copy=True)
+        frame.columns = self.columns
+        return frame
+
+def _changed_positions(current, previous):
+    """
+    Return the positions where two arrays of the same dtype differ, treating missing values as equal,
+    or None if the arrays cannot be compared element-wise.
+    """
+    try:
+        equal = current == previous
+        if isinstance(equal, pd.api.extensions.ExtensionArray):
+            equal = equal.to_numpy(dtype=bool, na_value=False)
+        if not isinstance(equal, np.ndarray) or equal.shape != (len(current),):
+            return None
+        changed = ~equal.astype(bool) & ~(pd.isna(current) & pd.isna(previous))
+        if current.dtype == object:
+            # Values such as 1, 1.0 and True compare equal but must not be swapped on undo
+            same_type = np.frompyfunc(lambda a, b: type(a) is type(b), 2, 1)(current, previous)
+            changed |= ~same_type.astype(bool)
+    except (TypeError, ValueError):
+        return None
+    return np.flatnonzero(changed)
+
+class SnapshotHistory:
+    """
+    Undo history of a DataFrame stored as copy-on-write column deltas.
+
+    Each snapshot only keeps what changed since the previous one: columns that did not change share
+    the data of the previous snapshot, columns where few rows changed store a row patch, and rows that
+    were filtered or reordered store positions into the previous data instead of copies. Retrieving a
+    snapshot returns a new DataFrame equal to the data at the time it was saved.
+
+    The history can be bounded: `max_snapshots` keeps the original snapshot plus the most recent ones,
+    and once the column data held in memory exceeds `max_bytes`, the columns of older snapshots are
+    spilled to compressed files and read back lazily when those snapshots are restored.
+    """
+
+    def __init__(self, max_bytes=None, max_snapshots=None, spill_dir=None):
+        """
+        Initialize the history.
+
+        Parameters:
+        - max_bytes: int or None, default=None
+            The memory budget of the history. If None, nothing is spilled to disk.
+        - max_snapshots: int or None, default=None
+            The number of recent snapshots to keep in addition to the original one. If None, every snapshot is kept.
+        - spill_dir: str or None, default=None
+            The directory to spill snapshots to. If None, a temporary directory is created when needed.
+        """
+        self._snapshots = []
+        self._spill_dir = None
+        self.configure(max_bytes=max_bytes, max_snapshots=max_snapshots, spill_dir=spill_dir)
+
+    def configure(self, max_bytes=None, max_snapshots=None, spill_dir=None):
+        """
+        Change the limits of the history and apply them to the snapshots already saved.
+        """
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError("max_bytes must be non-negative.")
+        if max_snapshots is not None and max_snapshots < 0:
+            raise ValueError("max_snapshots must be non-negative.")
+        self.max_bytes = max_bytes
+        self.max_snapshots = max_snapshots
+        self.spill_dir = spill_dir
+        self._enforce_limits()
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    def __getitem__(self, position):
+        return self._snapshots[position].materialize()
+
+    def append(self, data):
+        """
+        Save a snapshot of `data`.
+        """
+        previous = self._snapshots[-1] if self._snapshots else None
+        self._snapshots.append(self._snapshot(data, previous))
+        self._enforce_limits()
+
+    def pop(self, steps=1):
+        """
+        Remove the last `steps` snapshots and return the data of the oldest one removed.
+        """
+        if steps < 1 or steps > len(self._snapshots):
+            raise IndexError(f"Cannot pop {steps} snapshot(s) from a history of {len(self._snapshots)}.")
+        data = self._snapshots[-steps].materialize()
+        del self._snapshots[-steps:]
+        return data
+
+    def clear(self):
+        """
+        Remove every snapshot.
+        """
+        self._snapshots = []
+
+    def nbytes(self):
+        """
+        The approximate memory held by the history, counting shared column data once.
+        """
+        size = sum(block.nbytes for block in self._blocks() if not block.spilled)
+        takes = {}
+        for snapshot in self._snapshots:
+            for entry in snapshot.entries:
+                size += entry.nbytes()
+                if entry.take is not None:
+                    takes[id(entry.take)] = entry.take.nbytes
+        return size + sum(takes.values())
+
+    def disk_bytes(self):
+        """
+        The size of the column data spilled to disk.
+        """
+        return sum(os.path.getsize(block.path) for block in self._blocks() if block.spilled)
+
+    def _blocks(self):
+        """
+        Return the distinct blocks referenced by the history, from the oldest snapshot to the newest.
+        """
+        blocks = {}
+        for snapshot in self._snapshots:
+            for entry in snapshot.entries:
+                blocks.setdefault(id(entry.base), entry.base)
+        return list(blocks.values())
+
+    def _enforce_limits(self):
+        if self.max_snapshots is not None and len(self._snapshots) > self.max_snapshots + 1:
+            # Keep the original snapshot, which reset_data() restores, and the most recent ones
+            del self._snapshots[1:len(self._snapshots) - self.max_snapshots]
+        if self.max_bytes is not None and self._snapshots:
+            self._spill(self.nbytes() - self.max_bytes)
+
+    def _spill(self, excess):
+        """
+        Spill the blocks of older snapshots, oldest first, until `excess` bytes were released.
+        Blocks of the latest snapshot stay in memory since the next snapshot is compared against them.
+        """
+        latest = {id(entry.base) for entry in self._snapshots[-1].entries}
+        for block in self._blocks():
+            if excess <= 0:
+                break
+            if not block.spilled and id(block) not in latest:
+                excess -= block.nbytes
+                block.spill(self._spill_directory())
+
+    def _spill_directory(self):
+        if self.spill_dir is not None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            return self.spill_dir
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix='bamboochute-history-')
+            weakref.finalize(self, shutil.rmtree, self._spill_dir, True)
+        return self._spill_dir
+
+    def _snapshot(self, data, previous):
+        index = data.index
+        if previous is not None and index.equals(previous.index) and index.dtype == previous.index.dtype \
+                and index.names == previous.index.names:
+            index = previous.index
+        else:
+            index = index.copy()
+
+        previous_entries = {}
+        if previous is not None and previous.columns.is_unique and data.columns.is_unique:
+            previous_entries = dict(zip(previous.columns, previous.entries))
+
+        takes = {}
+        entries = []
+        for position, column in enumerate(data.columns):
+            series = data.iloc[:, position]
+            entry = previous_entries.get(column)
+            entries.append(self._column_snapshot(series, entry, index, takes))
+        return _FrameSnapshot(index, data.columns.copy(), entries)
+
+    def _row_positions(self, base_index, index, takes):
+        """
+        Return (found, take) where take selects the rows of `index` from `base_index`
+        (None if they are identical), caching the result per base index.
+        """
+        key = id(base_index)
+        if key not in takes:
+            if base_index is index or base_index.equals(index):
+                takes[key] = (True, None)
+            elif base_index.is_unique:
+                take = base_index.get_indexer(index)
+                takes[key] = (True, take) if (take >= 0).all() else (False, None)
+            else:
+                takes[key] = (False, None)
+        return takes[key]
+
+    def _copy(self, series, index):
+        # Bases of the same snapshot share one Index object, so row positions are computed once per snapshot
+        copy = series.copy()
+        copy.index = index
+        return _Block(copy)
+
+    def _column_snapshot(self, series, entry, index, takes):
+        if entry is None or entry.base.dtype != series.dtype:
+            return _ColumnSnapshot(self._copy(series, index))
+
+        found, take = self._row_positions(entry.base.index, index, takes)
+        if not found:
+            return _ColumnSnapshot(self._copy(series, index))
+
+        current = _values(series)
+        previous = entry.base.values() if take is None else entry.base.values().take(take)
+        positions = _changed_positions(current, previous)
+        if positions is None or len(positions) > MAX_PATCH_RATIO * len(series):
+            return _ColumnSnapshot(self._copy(series, index))
+        if len(positions) == 0:
+            return _ColumnSnapshot(entry.base, take)
+        return _ColumnSnapshot(entry.base, take, positions, current[positions])
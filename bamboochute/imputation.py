@@ -68,6 +68,43 @@ class IterativeImputer:
         X.loc[missing, col] = model.predict(X.loc[missing, predictors])
         return X
     
+def _imputation_columns(data, columns):
+    """
+    Return the numeric and non-numeric columns that `impute_missing` fills.
+    """
+    if columns is None:
+        columns = data.columns
+    return data[columns].select_dtypes(include=[np.number]).columns, data[columns].select_dtypes(exclude=[np.number]).columns
+
+def _imputation_values(data, strategy, numeric_columns, non_numeric_columns):
+    """
+    Compute the values `impute_missing` fills the numeric and non-numeric columns with.
+    """
+    if strategy == 'mean':
+        numeric_values = data[numeric_columns].mean()
+    elif strategy == 'median':
+        numeric_values = data[numeric_columns].median()
+    elif strategy == 'mode':
+        numeric_values = {col: data[col].mode()[0] for col in numeric_columns}
+    else:
+        raise ValueError("Unsupported strategy! Use 'mean', 'median', or 'mode'.")
+
+    non_numeric_values = {}
+    if non_numeric_columns.any():
+        non_numeric_values = {col: data[col].mode()[0] for col in non_numeric_columns}
+    return numeric_values, non_numeric_values
+
+def _apply_imputation(self, strategy, numeric_columns, non_numeric_columns, values):
+    """
+    Fill missing values with precomputed values, see `_imputation_values`.
+    """
+    numeric_values, non_numeric_values = values
+    self.data[numeric_columns] = self.data[numeric_columns].fillna(numeric_values)
+    if non_numeric_columns.any():
+        self.data[non_numeric_columns] = self.data[non_numeric_columns].fillna(non_numeric_values)
+
+    self.log_changes(f"Imputed missing values using {strategy} strategy for numeric columns and mode for non-numeric columns.")
+
 @log
 def impute_missing(self, strategy='mean', columns=None):
     """
@@ -86,25 +123,9 @@ def impute_missing(self, strategy='mean', columns=None):
     Returns:
     - Bamboo: The Bamboo instance with imputed data.
     """
-    if columns is None:
-        columns = self.data.columns
-
-    numeric_columns = self.data[columns].select_dtypes(include=[np.number]).columns
-    non_numeric_columns = self.data[columns].select_dtypes(exclude=[np.number]).columns
-
-    if strategy == 'mean':
-        self.data[numeric_columns] = self.data[numeric_columns].fillna(self.data[numeric_columns].mean())
-    elif strategy == 'median':
-        self.data[numeric_columns] = self.data[numeric_columns].fillna(self.data[numeric_columns].median())
-    elif strategy == 'mode':
-        self.data[numeric_columns] = self.data[numeric_columns].apply(lambda col: col.fillna(col.mode()[0]))
-    else:
-        raise ValueError("Unsupported strategy! Use 'mean', 'median', or 'mode'.")
-
-    if non_numeric_columns.any():
-        self.data[non_numeric_columns] = self.data[non_numeric_columns].apply(lambda col: col.fillna(col.mode()[0]))
-
-    self.log_changes(f"Imputed missing values using {strategy} strategy for numeric columns and mode for non-numeric columns.")
+    numeric_columns, non_numeric_columns = _imputation_columns(self.data, columns)
+    values = _imputation_values(self.data, strategy, numeric_columns, non_numeric_columns)
+    _apply_imputation(self, strategy, numeric_columns, non_numeric_columns, values)
     return self
 
 @log
@@ -0,0 +1,143 @@
+# bamboochute/lazy.py
+import inspect
+from bamboochute.bamboo import Bamboo
+from bamboochute.fileio import source_columns
+from bamboochute.planning import describe_step, optimize_steps, required_columns, without_columns
+
+def _is_eager(name):
+    """
+    Return whether a Bamboo method runs the plan instead of being recorded, see `bamboochute.utils.eager`.
+    """
+    return getattr(getattr(Bamboo, name), 'eager', False)
+
+def _arguments(method, args, kwargs):
+    """
+    Return the arguments of a method call as keyword arguments, so the planner can inspect them by name.
+    """
+    signature = inspect.signature(method)
+    bound = signature.bind(None, *args, **kwargs)
+    arguments = {}
+    for name, value in list(bound.arguments.items())[1:]:
+        if signature.parameters[name].kind is inspect.Parameter.VAR_KEYWORD:
+            arguments.update(value)
+        elif signature.parameters[name].kind is inspect.Parameter.VAR_POSITIONAL:
+            raise TypeError(f"{method.__name__}() cannot be planned with variable positional arguments.")
+        else:
+            arguments[name] = value
+    return arguments
+
+class LazyBamboo:
+    """
+    A Bamboo whose cleaning methods are recorded in a plan instead of running immediately.
+
+    The plan runs when the data is needed: on `collect()` or a method marked `eager`, which returns a
+    result computed from the data, such as `missing_data_report()` or `detect_outliers_zscore()`, or
+    writes it out, such as `export_data()`. Before running, the plan is optimized like a pipeline (see `BambooPipeline.explain`):
+    row filters move ahead of row-wise transforms, steps whose outputs are dropped before being read are
+    skipped, and columns that are only dropped are not loaded from CSV, Parquet, Feather or Arrow sources.
+    """
+
+    def __init__(self, data, **options):
+        """
+        Initialize the lazy Bamboo. Nothing is loaded until the plan runs.
+
+        Parameters:
+        - data: pd.DataFrame or str or list
+            Any source accepted by the Bamboo constructor.
+        - options: dict
+            Keyword arguments passed to the Bamboo constructor, such as `columns` or `schema`.
+        """
+        self._source = data
+        self._options = options
+        self.plan = []
+        # The Bamboo run for eager methods and the steps it ran, reused until the plan changes
+        self._result = None
+        self._result_plan = None
+
+    def __getattr__(self, name):
+        method = getattr(Bamboo, name, None)
+        if (name.startswith('_') or not callable(method)
+                or isinstance(inspect.getattr_static(Bamboo, name), (classmethod, staticmethod))):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        if _is_eager(name):
+            def run(*args, **kwargs):
+                return getattr(self._collected(), name)(*args, **kwargs)
+            return run
+
+        def record(*args, **kwargs):
+            self.plan.append({'method_name': name, 'arguments': _arguments(method, args, kwargs)})
+            return self
+        return record
+
+    def _physical_plan(self):
+        """
+        Return the columns to load (None for all), the optimized steps and the rewrites applied.
+        """
+        columns = self._options.get('columns') or source_columns(self._source)
+        if columns is None or len(set(columns)) != len(columns) or self._options.get('source_column'):
+            return (self._options.get('columns'), *optimize_steps(self.plan))
+        steps, rewrites = optimize_steps(self.plan, columns=columns)
+        # At least one column is loaded, so the data keeps its rows even if the plan drops every column
+        needed = required_columns(columns, steps) or list(columns[:1])
+        if len(needed) == len(columns):
+            return self._options.get('columns'), steps, rewrites
+        rewrites.append(f"Skipped loading columns {[col for col in columns if col not in needed]}: they are only dropped.")
+        return needed, without_columns(steps, set(columns) - set(needed)), rewrites
+
+    def explain(self) -> str:
+        """
+        Describe the columns loaded and the optimized plan run by `collect`.
+
+        Returns:
+        - str: The columns loaded, the numbered steps, and the rewrites applied.
+        """
+        columns, steps, rewrites = self._physical_plan()
+        lines = [f"Load: {'all columns' if columns is None else list(columns)}"]
+        lines.extend(f"{i + 1}. {describe_step(step)}" for i, step in enumerate(steps))
+        lines.append("Rewrites:" if rewrites else "Rewrites: none")
+        lines.extend(f"- {rewrite}" for rewrite in rewrites)
+        return "\n".join(lines)
+
+    def _collected(self):
+        """
+        Return the result of the plan for eager methods, running it only if the plan changed since the last run.
+        """
+        plan = self._result_plan
+        if plan is None or len(plan) != len(self.plan) or any(step is not ran for step, ran in zip(self.plan, plan)):
+            self._result = self.collect()
+            self._result_plan = list(self.plan)
+        return self._result
+
+    def collect(self) -> Bamboo:
+        """
+        Load the data and run the optimized plan. Every call runs the plan again and returns a new
+        Bamboo instance; eager methods such as reports share one run until more steps are recorded.
+
+        Returns:
+        - Bamboo: A Bamboo instance holding the result.
+        """
+        columns, steps, _ = self._physical_plan()
+        options = dict(self._options)
+        if columns is not None:
+            options['columns'] = columns
+        bamboo = Bamboo(self._source, **options)
+        for step in steps:
+            getattr(bamboo, step['method_name'])(**step['arguments'])
+        return bamboo
+
+def lazy(cls, data, **options):
+    """
+    Start a lazy Bamboo: cleaning methods build a plan that only runs, optimized, when the result is needed.
+
+    Parameters:
+    - data: pd.DataFrame or str or list
+        Any source accepted by the Bamboo constructor.
+    - options: dict
+        Keyword arguments passed to the Bamboo constructor when the plan runs.
+
+    Returns:
+    - LazyBamboo: The lazy Bamboo, see `LazyBamboo.collect`.
+    """
+    return LazyBamboo(data, **options)
+
+Bamboo.lazy = classmethod(lazy)
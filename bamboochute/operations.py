@@ -0,0 +1,101 @@
+# bamboochute/operations.py
+import json
+import reprlib
+import time
+from collections import deque
+import pandas as pd
+
+DEFAULT_MAX_OPERATIONS = 1000
+
+_repr = reprlib.Repr()
+_repr.maxstring = 80
+_repr.maxother = 80
+
+def _describe(value):
+    """
+    Return a short, bounded description of an argument. Objects with a shape, such as DataFrames,
+    are summarized instead of formatted, since formatting them would cost more than most operations.
+    """
+    if hasattr(value, 'shape'):
+        return f"<{type(value).__name__} shape={tuple(value.shape)}>"
+    return _repr.repr(value)
+
+def _describe_call(args, kwargs):
+    parts = [_describe(arg) for arg in args]
+    parts.extend(f"{name}={_describe(value)}" for name, value in kwargs.items())
+    return ", ".join(parts)
+
+def _frame_stats(data):
+    """
+    Return the rows, columns and shallow memory size of a DataFrame, counting object columns by their
+    pointers only, so measuring does not scan the strings.
+    """
+    if not isinstance(data, pd.DataFrame):
+        return None, None, None
+    nbytes = data.memory_usage(index=True, deep=False).sum()
+    return data.shape[0], data.shape[1], int(nbytes)
+
+class OperationLog:
+    """
+    A bounded ring buffer of structured records, one per Bamboo operation.
+
+    Each record holds the method, its arguments, the wall and CPU time it took, and the rows, columns
+    and bytes of the data before and after it. Methods called from within another operation are part
+    of that operation and are not recorded separately.
+    """
+
+    def __init__(self, maxlen=DEFAULT_MAX_OPERATIONS):
+        self.records = deque(maxlen=maxlen)
+        self.depth = 0
+
+    def record(self, name, func, args, kwargs):
+        """
+        Call `func` with the Bamboo instance `args[0]` and record the operation as the method `name`.
+        """
+        bamboo = args[0]
+        rows_before, columns_before, bytes_before = _frame_stats(getattr(bamboo, 'data', None))
+        started_at = time.time()
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        status = 'error'
+        self.depth += 1
+        try:
+            result = func(*args, **kwargs)
+            status = 'ok'
+            return result
+        finally:
+            self.depth -= 1
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.thread_time() - cpu_start
+            rows_after, columns_after, bytes_after = _frame_stats(getattr(bamboo, 'data', None))
+            self.records.append({
+                'method': name,
+                'args': _describe_call(args[1:], kwargs),
+                'started_at': started_at,
+                'wall_time': wall_time,
+                'cpu_time': cpu_time,
+                'rows_before': rows_before,
+                'rows_after': rows_after,
+                'columns_before': columns_before,
+                'columns_after': columns_after,
+                'bytes_before': bytes_before,
+                'bytes_after': bytes_after,
+                'status': status,
+            })
+
+    def to_frame(self):
+        """
+        Return the records as a DataFrame, one row per operation.
+        """
+        return pd.DataFrame(list(self.records), columns=['method', 'args', 'started_at', 'wall_time', 'cpu_time',
+                                                         'rows_before', 'rows_after', 'columns_before',
+                                                         'columns_after', 'bytes_before', 'bytes_after', 'status'])
+
+    def to_json(self, filepath=None):
+        """
+        Return the records as a JSON string, or write them to `filepath` if given.
+        """
+        if filepath is None:
+            return json.dumps(list(self.records), indent=4)
+        with open(filepath, 'w') as file:
+            json.dump(list(self.records), file, indent=4)
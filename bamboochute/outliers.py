@@ -6,9 +6,44 @@ from sklearn.covariance import EllipticEnvelope
 from sklearn.neighbors import LocalOutlierFactor
 from sklearn.ensemble import IsolationForest
 
-from bamboochute.utils import log
+from bamboochute.utils import eager, log
 from bamboochute.bamboo import Bamboo
 
+def _flag_zscore_outliers(self, columns, threshold, mean, std):
+    """
+    Mark Z-Score outliers given the mean and standard deviation of each column, see `detect_outliers_zscore`.
+    """
+    z_scores = np.abs((self.data[columns] - mean) / std)
+    outliers = z_scores > threshold
+
+    # Mark rows with any outliers in specified columns
+    outlier_rows = outliers.any(axis=1)
+    self.data['outliers'] = outlier_rows
+
+    self.log_changes(f"Detected outliers using Z-Score with threshold={threshold}.")
+    return outliers
+
+def _flag_iqr_outliers(self, columns, multiplier, Q1, Q3):
+    """
+    Mark IQR outliers given the first and third quartiles of each column, see `detect_outliers_iqr`.
+    """
+    IQR = Q3 - Q1
+    lower, upper = Q1 - multiplier * IQR, Q3 + multiplier * IQR
+    # Compared column by column, so the selected columns are not copied into a new frame first
+    outliers = pd.DataFrame({col: (self.data[col] < lower[col]) | (self.data[col] > upper[col]) for col in columns},
+                            index=self.data.index, columns=columns)
+
+    self.log_changes(f"Detected outliers using IQR with multiplier={multiplier}.")
+    return outliers
+
+def _remove_flagged(self, outliers, columns, method):
+    """
+    Remove the rows marked in `outliers`, see `remove_outliers`.
+    """
+    self.data = self.data[~outliers.any(axis=1)]
+    self.log_changes(f"Removed rows with outliers in columns {columns} using {method} method.")
+
+@eager
 @log
 def detect_outliers_zscore(self, columns=None, threshold=3):
     """
@@ -26,16 +61,9 @@ def detect_outliers_zscore(self, columns=None, threshold=3):
     if columns is None:
         columns = self.data.select_dtypes(include=[np.number]).columns
 
-    z_scores = np.abs((self.data[columns] - self.data[columns].mean()) / self.data[columns].std())
-    outliers = z_scores > threshold
-
-    # Mark rows with any outliers in specified columns
-    outlier_rows = outliers.any(axis=1)
-    self.data['outliers'] = outlier_rows
-
-    self.log_changes(f"Detected outliers using Z-Score with threshold={threshold}.")
-    return outliers
+    return _flag_zscore_outliers(self, columns, threshold, self.data[columns].mean(), self.data[columns].std())
 
+@eager
 @log
 def detect_outliers_iqr(self, columns=None, multiplier=1.5):
     """
@@ -53,14 +81,11 @@ def detect_outliers_iqr(self, columns=None, multiplier=1.5):
     if columns is None:
         columns = self.data.select_dtypes(include=[np.number]).columns
 
-    Q1 = self.data[columns].quantile(0.25)
-    Q3 = self.data[columns].quantile(0.75)
-    IQR = Q3 - Q1
-    outliers = (self.data[columns] < (Q1 - multiplier * IQR)) | (self.data[columns] > (Q3 + multiplier * IQR))
-
-    self.log_changes(f"Detected outliers using IQR with multiplier={multiplier}.")
-    return outliers
+    Q1 = pd.Series({col: self.data[col].quantile(0.25) for col in columns}, dtype='float64')
+    Q3 = pd.Series({col: self.data[col].quantile(0.75) for col in columns}, dtype='float64')
+    return _flag_iqr_outliers(self, columns, multiplier, Q1, Q3)
 
+@eager
 @log
 def detect_outliers_isolation_forest(self, contamination=0.05, random_state=None, columns=None, n_estimators=100):
     """
@@ -77,7 +102,8 @@ def detect_outliers_isolation_forest(self, contamination=0.05, random_state=None
     Returns:
     - pd.DataFrame: A DataFrame marking outliers with True/False.
     """
-    self.data = self.data.copy()
+    # A shallow copy detaches the frame from any frame it was sliced from without copying the values
+    self.data = self.data.copy(deep=False)
 
     if columns is None:
         columns = self.data.select_dtypes(include=[np.number]).columns
@@ -92,6 +118,7 @@ def detect_outliers_isolation_forest(self, contamination=0.05, random_state=None
     self.log_changes(f"Detected outliers using Isolation Forest with contamination={contamination}.")
     return self.data[['outliers']]
 
+@eager
 @log
 def detect_outliers_dbscan(self, eps=0.5, min_samples=5, columns=None):
     """
@@ -108,7 +135,8 @@ def detect_outliers_dbscan(self, eps=0.5, min_samples=5, columns=None):
     Returns:
     - pd.DataFrame: A DataFrame marking outliers with True/False.
     """
-    self.data = self.data.copy()
+    # A shallow copy detaches the frame from any frame it was sliced from without copying the values
+    self.data = self.data.copy(deep=False)
 
     if columns is None:
         columns = self.data.select_dtypes(include=[np.number]).columns
@@ -122,6 +150,7 @@ def detect_outliers_dbscan(self, eps=0.5, min_samples=5, columns=None):
     self.log_changes(f"Detected outliers using DBSCAN with eps={eps} and min_samples={min_samples}.")
     return self.data[['outliers']]
 
+@eager
 @log
 def detect_outliers_modified_zscore(self, threshold=3.5, columns=None):
     """
@@ -148,6 +177,7 @@ def detect_outliers_modified_zscore(self, threshold=3.5, columns=None):
     self.log_changes(f"Detected outliers using Modified Z-Score with threshold={threshold}.")
     return self.data[['outliers']]
 
+@eager
 @log
 def detect_outliers_robust_covariance(self, contamination=0.1, columns=None):
     """
@@ -173,6 +203,7 @@ def detect_outliers_robust_covariance(self, contamination=0.1, columns=None):
     self.log_changes(f"Detected outliers using robust covariance with contamination={contamination}.")
     return self.data[['outliers']]
 
+@eager
 @log
 def detect_outliers_lof(self, n_neighbors=20, contamination=0.1, columns=None):
     """
@@ -225,8 +256,7 @@ def remove_outliers(self, method='zscore', columns=None, **kwargs):
         raise ValueError("Unsupported outlier detection method!")
 
     # Remove rows where outliers are detected
-    self.data = self.data[~outliers.any(axis=1)]
-    self.log_changes(f"Removed rows with outliers in columns {columns} using {method} method.")
+    _remove_flagged(self, outliers, columns, method)
     return self
 
 @log
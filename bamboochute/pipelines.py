@@ -1,12 +1,92 @@
 # bamboochute/pipelines.py
 import json
+import asyncio
+import contextvars
+import functools
+import hashlib
+import os
 import pandas as pd
 from bamboochute.bamboo import Bamboo
 from bamboochute.utils import log
+from bamboochute.planning import describe_step, optimize_steps
+from bamboochute.aggregates import apply_step, fit_step, is_mergeable
+from bamboochute.execution import column_stages, is_row_local, run_stage, run_partitioned, _extend_change_log
+from bamboochute.duplicates import _drop_known_duplicates, _duplicate_index
+from bamboochute.schema import concat_frames
+from bamboochute.cache import StepCache, frame_fingerprint
+from bamboochute.tracing import PipelineProfiler, to_chrome_trace, to_speedscope
+
+CHECKPOINT_MANIFEST = 'checkpoint.json'
+
+# The cache used by `execute_pipeline(cache=True)`, shared by every pipeline in the process
+_default_step_cache = None
+
+def _write_atomic(path, write):
+    """
+    Write a file through a temporary file renamed into place, so a killed run never leaves a partial file.
+    """
+    tmp_path = f"{path}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _step_cache(cache):
+    global _default_step_cache
+    if cache is True:
+        if _default_step_cache is None:
+            _default_step_cache = StepCache()
+        return _default_step_cache
+    return cache or None
+
+def _run_cached(bamboo, step, cache, input_key):
+    """
+    Run a step, or restore its result from the cache. Returns the key of the result, which is the
+    input key of the next step, or None if the step could not be cached.
+    """
+    if input_key is None:
+        input_key = cache.fingerprint(bamboo.data)
+    key = cache.step_key(input_key, step)
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            bamboo.data, messages = cached
+            _extend_change_log(bamboo, messages)
+            return key
+    before = len(getattr(bamboo, '_change_log', []))
+    getattr(bamboo, step['method_name'])(**step['arguments'])
+    if key is not None:
+        cache.put(key, bamboo.data, getattr(bamboo, '_change_log', [])[before:])
+    return key
+
+def _input_fingerprint(data):
+    """
+    Return a hash of the data a checkpointed run starts from. Data whose values cannot be hashed is
+    identified by its columns, dtypes and length only.
+    """
+    fingerprint = frame_fingerprint(data)
+    if fingerprint is None:
+        shape = json.dumps([[str(col) for col in data.columns], [repr(dtype) for dtype in data.dtypes], len(data)])
+        fingerprint = hashlib.blake2b(shape.encode(), digest_size=20).hexdigest()
+    return fingerprint
+
+def _checkpoint_after(step, checkpoint_steps):
+    """
+    Return whether a checkpoint is due after the step at index `step`.
+    """
+    if checkpoint_steps is None:
+        return True
+    if isinstance(checkpoint_steps, int):
+        return (step + 1) % checkpoint_steps == 0
+    return step in checkpoint_steps
 
 class BambooPipeline:
     def __init__(self):
         self.pipeline_steps = []
+        self.fitted_state = None
+        self.last_profile = None
 
     def add_step(self, method_name: str, **kwargs):
         """
@@ -24,22 +104,406 @@ class BambooPipeline:
             'arguments': kwargs
         })
 
-    def execute_pipeline(self, bamboo: Bamboo) -> Bamboo:
+    def execute_pipeline(self, bamboo: Bamboo, checkpoint_dir=None, checkpoint_steps=None, resume=True,
+                         optimize=False, parallel=False, executor='thread', workers=None, partitions=None,
+                         cache=None, profile=False) -> Bamboo:
         """
         Execute the pipeline of chained methods on a Bamboo instance.
 
         Parameters:
         - bamboo: Bamboo
             The Bamboo instance on which the pipeline will be executed.
+        - checkpoint_dir: str or None, default=None
+            A directory to persist the data to after selected steps. If a checkpoint of the same pipeline
+            exists there, execution resumes after the last checkpointed step instead of from the input data.
+            Resuming with input data other than that of the checkpointed run raises a ValueError.
+            Use a separate directory for every input. Checkpoints are removed once the pipeline completes.
+        - checkpoint_steps: int, list or None, default=None
+            The indices of the steps to checkpoint after, or an int to checkpoint every that many steps.
+            If None, a checkpoint is written after every step. With `optimize=True`, indices refer to the optimized plan.
+        - resume: bool, default=True
+            Whether to resume from an existing checkpoint. If False, existing checkpoints are ignored and overwritten.
+        - optimize: bool, default=False
+            Run the optimized plan shown by `explain()` instead of the steps in the order they were added.
+        - parallel: bool, default=False
+            Run consecutive steps that touch disjoint, explicitly listed columns concurrently, each on
+            a copy of its own columns, and merge the results. Steps whose columns depend on the data,
+            and steps that remove rows, run on the whole dataset as usual.
+        - executor: str, default='thread'
+            The pool used with `parallel=True` or `partitions`: 'thread' or 'process'.
+        - workers: int or None, default=None
+            The number of workers used with `parallel=True` or `partitions`. If None, the workers of the current context are used.
+        - partitions: int or None, default=None
+            Split the rows into this many partitions and run the pipeline on them in the pool. Steps that need
+            statistics over all rows, such as imputing with the mean or removing IQR outliers, merge partial
+            aggregates of every partition, so the result matches a run on the whole dataset. Other steps that
+            need all rows, such as `drop_duplicates`, gather the partitions first. Use `executor='process'`
+            for CPU-bound pipelines. Cannot be combined with `parallel` or `checkpoint_dir`.
+        - cache: bool, StepCache or None, default=None
+            Reuse the results of steps that already ran on the same input with the same arguments, e.g. after
+            editing a later step. Pass True for a cache shared in memory by the process, or a `StepCache` to
+            also keep results on disk. Steps with arguments that are not JSON-serializable always run.
+            Cannot be combined with `parallel` or `partitions`.
+        - profile: bool, default=False
+            Record the wall and CPU time, peak memory, rows, columns and dtype changes of every step in
+            `last_profile`, see `export_profile`. Memory is traced with `tracemalloc`, which slows the run down.
+            Concurrent stages of a `parallel=True` run are profiled as one entry. Cannot be combined with `partitions`.
 
         Returns:
         - Bamboo: The Bamboo instance with all pipeline steps applied.
         """
+        steps = optimize_steps(self.pipeline_steps)[0] if optimize else self.pipeline_steps
+        cache = _step_cache(cache)
+        if cache is not None and (parallel or partitions is not None):
+            raise ValueError("cache cannot be combined with parallel or partitions.")
+        if partitions is not None:
+            if parallel or checkpoint_dir is not None or profile:
+                raise ValueError("partitions cannot be combined with parallel, checkpoint_dir or profile.")
+            return run_partitioned(bamboo, steps, partitions, executor=executor, workers=workers)
+        fingerprint = self._fingerprint(steps)
+        input_fingerprint = None
+        start = 0
+        if checkpoint_dir is not None:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+            if isinstance(checkpoint_steps, int) and checkpoint_steps < 1:
+                raise ValueError("checkpoint_steps must be a positive integer.")
+            input_fingerprint = _input_fingerprint(bamboo.data)
+            if resume:
+                start = self._restore_checkpoint(bamboo, checkpoint_dir, fingerprint, input_fingerprint)
+
+        stages = column_stages(steps) if parallel else [(i, i + 1, None) for i in range(len(steps))]
+        key = None
+        profiler = PipelineProfiler() if profile else None
+
+        def run_step(step):
+            nonlocal key
+            if cache is not None:
+                key = _run_cached(bamboo, step, cache, key)
+            else:
+                method = getattr(bamboo, step['method_name'])
+                method(**step['arguments'])
+
+        try:
+            for begin, end, groups in stages:
+                if end <= start:
+                    continue
+                if groups is not None and begin >= start:
+                    run = functools.partial(run_stage, bamboo, steps[begin:end], groups, executor=executor, workers=workers)
+                    if profiler is not None:
+                        profiler.run(bamboo, begin, ", ".join(step['method_name'] for step in steps[begin:end]),
+                                     "; ".join(describe_step(step) for step in steps[begin:end]), run)
+                    else:
+                        run()
+                else:
+                    # A checkpoint written by a sequential run may resume in the middle of a stage
+                    for i in range(max(begin, start), end):
+                        if profiler is not None:
+                            profiler.run(bamboo, i, steps[i]['method_name'], describe_step(steps[i]),
+                                         functools.partial(run_step, steps[i]))
+                        else:
+                            run_step(steps[i])
+                if checkpoint_dir is not None and end < len(steps) and \
+                        any(_checkpoint_after(i, checkpoint_steps) for i in range(max(begin, start), end)):
+                    self._write_checkpoint(bamboo, checkpoint_dir, end, fingerprint, input_fingerprint)
+        finally:
+            if profiler is not None:
+                self.last_profile = profiler.stop()
+
+        if checkpoint_dir is not None:
+            self.clear_checkpoint(checkpoint_dir)
+        return bamboo
+
+    def export_profile(self, filepath: str, format='chrome'):
+        """
+        Export the profile of the last `execute_pipeline(profile=True)` run as a trace file.
+
+        Parameters:
+        - filepath: str
+            The path of the trace file.
+        - format: str, default='chrome'
+            'chrome' for the Chrome trace event format (chrome://tracing, Perfetto) or 'speedscope'.
+        """
+        if self.last_profile is None:
+            raise ValueError("No profile recorded. Run execute_pipeline(profile=True) first.")
+        if format == 'chrome':
+            to_chrome_trace(self.last_profile, filepath)
+        elif format == 'speedscope':
+            to_speedscope(self.last_profile, filepath)
+        else:
+            raise ValueError("Unsupported trace format. Use 'chrome' or 'speedscope'.")
+
+    def fit(self, bamboo: Bamboo, incremental: bool = False) -> 'BambooPipeline':
+        """
+        Run the pipeline on a Bamboo instance and keep the statistics its steps learn from the data, such as
+        imputation values, outlier bounds, categories, frequencies and label encodings, so `transform` can
+        apply them to new batches without recomputing them. The Bamboo instance is cleaned along the way.
+
+        Parameters:
+        - bamboo: Bamboo
+            The Bamboo instance to learn from.
+        - incremental: bool, default=False
+            Whether to also keep what `append` needs to update the statistics with new rows: a running
+            partial aggregate per step and the keys of the rows kept by `drop_duplicates`. The running
+            aggregates of medians and IQR bounds hold every value of their columns, so each `append` to
+            such steps copies and scans all the rows seen so far.
+
+        Returns:
+        - BambooPipeline: The pipeline itself, with `fitted_state` set.
+        """
+        states, partials, keys = [], [], []
+        for step in self.pipeline_steps:
+            state = partial = step_keys = None
+            if is_mergeable(step):
+                partial, state = fit_step(bamboo, step)
+            else:
+                getattr(bamboo, step['method_name'])(**step['arguments'])
+                if incremental and step['method_name'] == 'drop_duplicates':
+                    step_keys = _duplicate_index(bamboo.data, step['arguments'].get('subset'))
+            states.append(state)
+            partials.append(partial)
+            keys.append(step_keys)
+        self.fitted_state = {'fingerprint': self.fingerprint(), 'states': states}
+        if incremental:
+            self.fitted_state.update(partials=partials, keys=keys)
+        return self
+
+    def append(self, bamboo: Bamboo, new_data) -> Bamboo:
+        """
+        Clean only the new rows appended to a dataset cleaned by `fit(incremental=True)`, and add them to it.
+
+        The new rows go through the pipeline on their own. Steps that learn statistics from the data update
+        them with the new rows, e.g. the running sums and counts behind a mean, and apply the updated values
+        to the new rows; the rows cleaned earlier keep the values they were cleaned with. `drop_duplicates`
+        drops new rows whose keys were kept before, using an index of row hashes. The updated statistics are
+        kept in `fitted_state`, so they can be saved again with `save_fitted_state`. With an integer index, the
+        new rows are numbered on from the largest label of the cleaned rows; other indexes must not share labels.
+
+        Only pipelines whose steps are row-wise, learn mergeable statistics, or drop duplicates keeping the
+        first row can run incrementally. Label encodings are not updated: new rows with labels not seen by `fit` raise a ValueError.
+
+        Parameters:
+        - bamboo: Bamboo
+            The cleaned Bamboo instance, as cleaned by `fit`, to append the new rows to.
+        - new_data: pd.DataFrame, str or Bamboo
+            The new rows, or the path of a file holding them.
+
+        Returns:
+        - Bamboo: The Bamboo instance with the cleaned new rows appended.
+        """
+        self._check_fitted_state(self.fitted_state)
+        if 'partials' not in self.fitted_state:
+            raise ValueError("The fitted state cannot be updated. Fit the pipeline with incremental=True to append rows.")
         for step in self.pipeline_steps:
-            method = getattr(bamboo, step['method_name'])
-            method(**step['arguments'])
+            if step['method_name'] == 'drop_duplicates':
+                if step['arguments'].get('keep', 'first') != 'first':
+                    raise ValueError("Only drop_duplicates with keep='first' can run incrementally.")
+            elif not (is_mergeable(step) or is_row_local(step)):
+                raise ValueError(f"Step '{step['method_name']}' needs all rows and cannot run incrementally.")
+
+        delta = new_data if isinstance(new_data, Bamboo) else Bamboo(new_data, sys_log=bamboo._sys_log)
+        # The fitted state is only replaced once every step succeeded
+        states = list(self.fitted_state['states'])
+        partials = list(self.fitted_state['partials'])
+        keys = list(self.fitted_state['keys'])
+        for i, step in enumerate(self.pipeline_steps):
+            if step['method_name'] == 'encode_categorical':
+                # Refitting would renumber the labels of the rows cleaned earlier, so new labels are rejected
+                apply_step(delta, step, states[i])
+            elif is_mergeable(step):
+                partials[i], states[i] = fit_step(delta, step, partials[i])
+            elif step['method_name'] == 'drop_duplicates':
+                keys[i] = _drop_known_duplicates(delta, keys[i], **step['arguments'])
+            else:
+                getattr(delta, step['method_name'])(**step['arguments'])
+        if pd.api.types.is_integer_dtype(bamboo.data.index) or bamboo.data.empty:
+            # The new rows are numbered on from the existing rows, so no label is used twice
+            start = int(bamboo.data.index.max()) + 1 if len(bamboo.data) else 0
+            delta.data.index = pd.RangeIndex(start, start + len(delta.data))
+        elif delta.data.index.isin(bamboo.data.index).any():
+            raise ValueError("The new rows reuse index labels of the cleaned rows. Give them unique labels.")
+        self.fitted_state = {**self.fitted_state, 'states': states, 'partials': partials, 'keys': keys}
+
+        bamboo.data = concat_frames([bamboo.data, delta.data], ignore_index=False)
+        _extend_change_log(bamboo, getattr(delta, '_change_log', []))
+        bamboo.log_changes(f"Appended {len(delta.data)} incrementally cleaned row(s).")
         return bamboo
 
+    def transform(self, bamboo: Bamboo) -> Bamboo:
+        """
+        Run the pipeline on a Bamboo instance with the statistics learned by `fit`. Steps that learn nothing
+        from the data run as usual. Values not seen during fitting are handled as by the fitted values, e.g.
+        unknown categories become missing and label encoding rejects unknown labels.
+
+        Parameters:
+        - bamboo: Bamboo
+            The Bamboo instance to clean.
+
+        Returns:
+        - Bamboo: The Bamboo instance with all pipeline steps applied.
+        """
+        self._check_fitted_state(self.fitted_state)
+        for step, state in zip(self.pipeline_steps, self.fitted_state['states']):
+            if is_mergeable(step):
+                apply_step(bamboo, step, state)
+            else:
+                getattr(bamboo, step['method_name'])(**step['arguments'])
+        return bamboo
+
+    def save_fitted_state(self, filepath: str):
+        """
+        Save the statistics learned by `fit` to a pickle file, e.g. next to the file written by `save_pipeline`.
+
+        Parameters:
+        - filepath: str
+            The path to save the fitted state to.
+        """
+        self._check_fitted_state(self.fitted_state)
+        _write_atomic(filepath, lambda path: pd.to_pickle(self.fitted_state, path))
+
+    def load_fitted_state(self, filepath: str) -> 'BambooPipeline':
+        """
+        Load statistics saved with `save_fitted_state`. Only load files from trusted sources, as they are pickles.
+
+        Parameters:
+        - filepath: str
+            The path to load the fitted state from.
+
+        Returns:
+        - BambooPipeline: The pipeline itself, ready to `transform`.
+        """
+        fitted_state = pd.read_pickle(filepath)
+        self._check_fitted_state(fitted_state)
+        self.fitted_state = fitted_state
+        return self
+
+    def _check_fitted_state(self, fitted_state):
+        if fitted_state is None:
+            raise ValueError("The pipeline is not fitted. Call fit() or load_fitted_state() first.")
+        if fitted_state['fingerprint'] != self.fingerprint():
+            raise ValueError("The fitted state belongs to different pipeline steps. Fit the pipeline again.")
+
+    def optimize(self) -> 'BambooPipeline':
+        """
+        Return an equivalent pipeline with a cheaper plan: row filters moved ahead of row-wise transforms
+        on other columns, work on columns dropped later removed, and consecutive string steps fused.
+
+        Returns:
+        - BambooPipeline: A new pipeline with the optimized steps.
+        """
+        pipeline = BambooPipeline()
+        pipeline.pipeline_steps = optimize_steps(self.pipeline_steps)[0]
+        return pipeline
+
+    def explain(self, optimize=True) -> str:
+        """
+        Describe the plan the pipeline executes, and the rewrites the optimizer applied.
+
+        Parameters:
+        - optimize: bool, default=True
+            Whether to show the optimized plan or the steps as added.
+
+        Returns:
+        - str: The numbered steps of the plan, followed by the rewrites.
+        """
+        steps, rewrites = optimize_steps(self.pipeline_steps) if optimize else (self.pipeline_steps, [])
+        lines = [f"{i + 1}. {describe_step(step)}" for i, step in enumerate(steps)]
+        if optimize:
+            lines.append("Rewrites:" if rewrites else "Rewrites: none")
+            lines.extend(f"- {rewrite}" for rewrite in rewrites)
+        return "\n".join(lines)
+
+    def fingerprint(self) -> str:
+        """
+        Return a hash of the pipeline steps, used to match checkpoints to the pipeline that wrote them.
+        """
+        return self._fingerprint(self.pipeline_steps)
+
+    def _fingerprint(self, steps):
+        steps = json.dumps(steps, sort_keys=True, default=repr)
+        return hashlib.blake2b(steps.encode(), digest_size=16).hexdigest()
+
+    def _read_manifest(self, checkpoint_dir):
+        path = os.path.join(checkpoint_dir, CHECKPOINT_MANIFEST)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as file:
+            return json.load(file)
+
+    def _restore_checkpoint(self, bamboo, checkpoint_dir, fingerprint, input_fingerprint):
+        """
+        Load the last checkpoint of this pipeline into `bamboo` and return the index of the next step to run.
+        Checkpoints of other pipelines are ignored, while a checkpoint of the same pipeline run on other
+        input data is refused, since resuming would silently replace the input with the checkpointed data.
+        """
+        manifest = self._read_manifest(checkpoint_dir)
+        if manifest is None or manifest['fingerprint'] != fingerprint:
+            return 0
+        if manifest.get('input') != input_fingerprint:
+            raise ValueError(f"The checkpoint in '{checkpoint_dir}' was written for different input data. "
+                             "Pass resume=False or call clear_checkpoint to start over.")
+        bamboo.data = pd.read_pickle(os.path.join(checkpoint_dir, manifest['data']))
+        bamboo.log_changes(f"Resumed pipeline from checkpoint after step {manifest['completed_steps']}.")
+        return manifest['completed_steps']
+
+    def _write_checkpoint(self, bamboo, checkpoint_dir, completed_steps, fingerprint, input_fingerprint):
+        """
+        Persist the data after `completed_steps` steps. The data file is written before the manifest
+        that points to it, and the previous data file is only removed afterwards, so the directory
+        always holds a complete checkpoint.
+        """
+        previous = self._read_manifest(checkpoint_dir)
+        data_file = f"step_{completed_steps:04d}.pkl"
+        _write_atomic(os.path.join(checkpoint_dir, data_file), bamboo.data.to_pickle)
+        manifest = {'fingerprint': fingerprint, 'input': input_fingerprint, 'completed_steps': completed_steps,
+                    'data': data_file}
+
+        def write_manifest(path):
+            with open(path, 'w') as file:
+                json.dump(manifest, file, indent=4)
+
+        _write_atomic(os.path.join(checkpoint_dir, CHECKPOINT_MANIFEST), write_manifest)
+        if previous is not None and previous['data'] != data_file:
+            self._remove_checkpoint_file(checkpoint_dir, previous['data'])
+
+    def _remove_checkpoint_file(self, checkpoint_dir, name):
+        try:
+            os.remove(os.path.join(checkpoint_dir, name))
+        except FileNotFoundError:
+            pass
+
+    def clear_checkpoint(self, checkpoint_dir: str):
+        """
+        Remove the checkpoint stored in a directory, so the next execution starts from the input data.
+
+        Parameters:
+        - checkpoint_dir: str
+            The checkpoint directory.
+        """
+        manifest = self._read_manifest(checkpoint_dir)
+        if manifest is not None:
+            self._remove_checkpoint_file(checkpoint_dir, CHECKPOINT_MANIFEST)
+            self._remove_checkpoint_file(checkpoint_dir, manifest['data'])
+
+    async def aexecute_pipeline(self, bamboo: Bamboo, executor=None, **options) -> Bamboo:
+        """
+        Execute the pipeline on a thread pool, so an asyncio service can keep loading the next
+        dataset (e.g. with `Bamboo.aload`) while this one is being cleaned.
+
+        Parameters:
+        - bamboo: Bamboo
+            The Bamboo instance on which the pipeline will be executed.
+        - executor: concurrent.futures.Executor or None, default=None
+            The executor to run on. If None, the event loop's default thread pool is used.
+        - options: dict
+            Keyword arguments passed to `execute_pipeline`, such as `checkpoint_dir`.
+
+        Returns:
+        - Bamboo: The Bamboo instance with all pipeline steps applied.
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(executor, functools.partial(context.run, self.execute_pipeline, bamboo, **options))
+
     def save_pipeline(self, filepath: str):
         """
         Save the pipeline to a JSON file.
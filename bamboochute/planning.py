@@ -0,0 +1,391 @@
+# bamboochute/planning.py
+import json
+
+# Step kinds:
+# - 'row_filter': removes rows based on the values of the columns it reads, leaving the other values unchanged.
+# - 'row_wise': rewrites the columns it writes, each row depending only on the same row of the columns it reads.
+# - 'aggregate': rewrites the columns it writes from statistics over all rows, e.g. imputing with a mean.
+# - 'drop': deletes columns.
+# - 'opaque': anything else; the optimizer never moves steps across it.
+# Column sets are None when they depend on the data, e.g. "all object columns"; such steps are never reordered.
+
+# The string formatting steps that `transform_strings` can apply in one pass per column.
+STRING_STEPS = ('trim_whitespace', 'standardize_case', 'remove_special_characters')
+FUSED_STRING_STEP = 'transform_strings'
+
+def _columns(columns):
+    """
+    Return a column argument as a set, or None if the columns are chosen from the data at run time.
+    """
+    if columns is None:
+        return None
+    if isinstance(columns, str):
+        return {columns}
+    return set(columns)
+
+def _spec(kind, reads, writes, deletes=(), column_local=False):
+    return {'kind': kind, 'reads': reads, 'writes': writes, 'deletes': set(deletes), 'column_local': column_local}
+
+def _opaque(arguments):
+    return _spec('opaque', None, None)
+
+def _in_place(kind):
+    """
+    Spec of a step that transforms each column of its `columns` argument independently and in place.
+    """
+    def spec(arguments):
+        columns = _columns(arguments.get('columns'))
+        return _spec(kind, columns, columns, column_local=True)
+    return spec
+
+def _column_types(kind):
+    def spec(arguments):
+        columns = set(arguments.get('column_type_dict', {}))
+        return _spec(kind, columns, columns)
+    return spec
+
+def _drop_missing(arguments):
+    if arguments.get('axis', 0) not in (0, 'index'):
+        return _opaque(arguments)
+    return _spec('row_filter', _columns(arguments.get('subset')), set())
+
+def _drop_duplicates(arguments):
+    return _spec('row_filter', _columns(arguments.get('subset')), set())
+
+def _remove_outliers(arguments):
+    # The Z-Score detector leaves an 'outliers' column behind
+    writes = {'outliers'} if arguments.get('method', 'zscore') == 'zscore' else set()
+    return _spec('row_filter', _columns(arguments.get('columns')), writes)
+
+def _remove_outliers_model(arguments):
+    # Model-based removals add a temporary 'outliers' column and delete it afterwards
+    return _spec('row_filter', _columns(arguments.get('columns')), {'outliers'})
+
+def _handle_invalid_dates(arguments):
+    columns = _columns(arguments.get('columns'))
+    if arguments.get('fill_value') is None:
+        return _spec('row_filter', columns, set())
+    return _spec('row_wise', columns, columns, column_local=True)
+
+def _map_categories(arguments):
+    return _spec('row_wise', {arguments['column']}, {arguments['column']})
+
+def _handle_missing_categories(arguments):
+    kind = 'aggregate' if arguments.get('fill_value') is None else 'row_wise'
+    return _spec(kind, {arguments['column']}, {arguments['column']})
+
+def _replace_rare_categories(arguments):
+    return _spec('aggregate', {arguments['column']}, {arguments['column']})
+
+def _extract_date_parts(arguments):
+    parts = arguments.get('parts') or ['year', 'month', 'day', 'weekday', 'hour', 'minute', 'second']
+    column = arguments['column']
+    return _spec('row_wise', {column}, {f"{column}_{part}" for part in parts})
+
+def _calculate_date_differences(arguments):
+    return _spec('row_wise', {arguments['start_column'], arguments['end_column']},
+                 {arguments.get('new_column', 'date_diff')})
+
+def _encode_categorical(arguments):
+    columns = _columns(arguments.get('columns'))
+    if arguments.get('method', 'onehot') == 'label':
+        return _spec('aggregate', columns, columns, column_local=True)
+    return _spec('opaque', columns, None)
+
+def _detect_outliers(arguments):
+    return _spec('aggregate', _columns(arguments.get('columns')), {'outliers'})
+
+def _drop_columns(arguments):
+    return _spec('drop', set(), set(), deletes=_columns(arguments['columns']))
+
+def _transform_strings(arguments):
+    reads = set()
+    for step in arguments['steps']:
+        columns = _columns(step.get('arguments', {}).get('columns'))
+        if columns is None:
+            return _spec('row_wise', None, None)
+        reads |= columns
+    return _spec('row_wise', reads, reads)
+
+STEP_SPECS = {
+    'drop_missing': _drop_missing,
+    'drop_duplicates': _drop_duplicates,
+    'remove_outliers': _remove_outliers,
+    'remove_outliers_isolation_forest': _remove_outliers_model,
+    'remove_outliers_dbscan': _remove_outliers_model,
+    'remove_outliers_modified_zscore': _remove_outliers_model,
+    'remove_outliers_robust_covariance': _remove_outliers_model,
+    'remove_outliers_lof': _remove_outliers_model,
+    'handle_invalid_dates': _handle_invalid_dates,
+    'trim_whitespace': _in_place('row_wise'),
+    'standardize_case': _in_place('row_wise'),
+    'remove_special_characters': _in_place('row_wise'),
+    # Parsing dates and numbers infers the format or dtype from all the values of a column, so these
+    # steps depend on the other rows and row filters must not move ahead of them
+    'format_dates': _in_place('aggregate'),
+    'standardize_currency_format': _in_place('row_wise'),
+    'convert_to_datetime': _in_place('aggregate'),
+    'shift_dates': _in_place('row_wise'),
+    'round_dates': _in_place('row_wise'),
+    'convert_column_types': _column_types('aggregate'),
+    'enforce_column_types': _column_types('aggregate'),
+    'coerce_data_types': _column_types('aggregate'),
+    'map_categories': _map_categories,
+    'handle_missing_categories': _handle_missing_categories,
+    'extract_date_parts': _extract_date_parts,
+    'calculate_date_differences': _calculate_date_differences,
+    'impute_missing': _in_place('aggregate'),
+    'convert_to_categorical': _in_place('aggregate'),
+    'encode_frequency': _in_place('aggregate'),
+    'encode_categorical': _encode_categorical,
+    'replace_rare_categories': _replace_rare_categories,
+    'detect_outliers_zscore': _detect_outliers,
+    'drop_columns': _drop_columns,
+    FUSED_STRING_STEP: _transform_strings,
+}
+
+def step_spec(step):
+    """
+    Return the kind and the columns read, written and deleted by a pipeline step.
+
+    Parameters:
+    - step: dict
+        A pipeline step with a 'method_name' and its 'arguments'.
+
+    Returns:
+    - dict: The step's 'kind', 'reads', 'writes' and 'deletes', where None means the columns depend on the data.
+    """
+    spec = STEP_SPECS.get(step['method_name'], _opaque)
+    try:
+        return spec(step.get('arguments', {}))
+    except (KeyError, TypeError):
+        # Malformed arguments fail when the step runs; until then, treat the step as opaque
+        return _opaque(step.get('arguments', {}))
+
+def _overlaps(first, second):
+    if first is None or second is None:
+        return True
+    return bool(first & second)
+
+def _commutes(transform, row_filter):
+    """
+    Return whether a row filter can run before a row-wise transform without changing the result:
+    the filter must not read what the transform writes, and neither may touch what the other writes.
+    """
+    if transform['kind'] != 'row_wise' or row_filter['kind'] != 'row_filter':
+        return False
+    return not (_overlaps(transform['writes'], row_filter['reads']) or _overlaps(transform['writes'], row_filter['writes'])
+                or _overlaps(row_filter['writes'], transform['reads']))
+
+def describe_step(step):
+    """
+    Return a one-line description of a pipeline step, e.g. "trim_whitespace(columns=['name'])".
+    """
+    arguments = ", ".join(f"{name}={json.dumps(value, default=repr)}" for name, value in step.get('arguments', {}).items())
+    return f"{step['method_name']}({arguments})"
+
+def _reorder_filters(steps, rewrites):
+    """
+    Move row filters ahead of the row-wise transforms they commute with, so the transforms process fewer rows.
+    Filters keep their order relative to each other and never cross aggregates or opaque steps.
+    """
+    steps = list(steps)
+    specs = [step_spec(step) for step in steps]
+    for i in range(1, len(steps)):
+        j = i
+        while j > 0 and _commutes(specs[j - 1], specs[j]):
+            steps[j - 1], steps[j] = steps[j], steps[j - 1]
+            specs[j - 1], specs[j] = specs[j], specs[j - 1]
+            j -= 1
+        if j < i:
+            rewrites.append(f"Moved {describe_step(steps[j])} ahead of {i - j} row-wise step(s).")
+    return steps
+
+def _possible_columns(steps, columns):
+    """
+    Return, for each step, the columns the data may have before it: the starting columns and those
+    written by earlier steps, or None once a step writes columns that depend on the data.
+    """
+    possible = None if columns is None else set(columns)
+    result = []
+    for step in steps:
+        result.append(possible)
+        writes = step_spec(step)['writes']
+        possible = None if possible is None or writes is None else possible | writes
+    return result
+
+def _forget_columns(optimized, later_specs, columns):
+    """
+    Remove columns that are no longer created from the first later step that drops them.
+    `optimized` holds the later steps from last to first, and `later_specs` their specs from first to last.
+    """
+    forward = optimized[::-1]
+    for column in columns:
+        i = next(i for i, spec in enumerate(later_specs) if column in spec['deletes'])
+        forward[i:i + 1] = without_columns([forward[i]], {column})
+        later_specs[i:i + 1] = [step_spec(step) for step in forward[i:i + 1]]
+    optimized[:] = forward[::-1]
+
+def _eliminate_dead_columns(steps, rewrites, columns=None):
+    """
+    Remove columns from column-local steps when a later step deletes them before anything reads them.
+    Steps are visited from last to first, so work that only fed other removed work is removed as well.
+    When the starting columns are known, steps that only create columns dropped later are removed too.
+    """
+    optimized = []
+    later_specs = []
+    possible = _possible_columns(steps, columns)
+    for step, before in zip(reversed(steps), reversed(possible)):
+        spec = step_spec(step)
+        columns = step.get('arguments', {}).get('columns')
+        if spec['column_local'] and columns is not None and not isinstance(columns, str):
+            dead = {column for column in columns if _is_dead(column, later_specs)}
+            if dead and len(dead) == len(set(columns)):
+                rewrites.append(f"Removed {describe_step(step)}: all its columns are dropped later.")
+                continue
+            if dead:
+                rewrites.append(f"Removed columns {sorted(dead)} from {step['method_name']}: they are dropped later.")
+                step = {'method_name': step['method_name'],
+                        'arguments': {**step['arguments'], 'columns': [column for column in columns if column not in dead]}}
+                spec = step_spec(step)
+        elif (spec['kind'] == 'row_wise' and spec['writes'] and before is not None and not spec['writes'] & before
+              and all(_is_dead(column, later_specs) for column in spec['writes'])):
+            # e.g. date parts extracted into new columns that are dropped before anything reads them
+            rewrites.append(f"Removed {describe_step(step)}: all its outputs are dropped later.")
+            _forget_columns(optimized, later_specs, spec['writes'])
+            continue
+        optimized.append(step)
+        later_specs.insert(0, spec)
+    optimized.reverse()
+    return optimized
+
+def _is_dead(column, later_specs):
+    for spec in later_specs:
+        if spec['deletes'] and column in spec['deletes']:
+            return True
+        if spec['reads'] is None or column in spec['reads'] or spec['writes'] is None or column in spec['writes']:
+            return False
+    return False
+
+def _fuse_string_steps(steps, rewrites):
+    """
+    Replace runs of consecutive string formatting steps with one `transform_strings` step.
+    """
+    optimized = []
+    run = []
+
+    def flush():
+        if len(run) > 1:
+            rewrites.append(f"Fused {', '.join(step['method_name'] for step in run)} into one pass per column.")
+            optimized.append({'method_name': FUSED_STRING_STEP, 'arguments': {'steps': list(run)}})
+        else:
+            optimized.extend(run)
+        run.clear()
+
+    for step in steps:
+        if step['method_name'] in STRING_STEPS:
+            run.append(step)
+        elif step['method_name'] == FUSED_STRING_STEP:
+            run.extend(step['arguments']['steps'])
+        else:
+            flush()
+            optimized.append(step)
+    flush()
+    return optimized
+
+def optimize_steps(steps, columns=None):
+    """
+    Rewrite a list of pipeline steps into an equivalent, cheaper plan.
+
+    Row filters such as `drop_missing` or `drop_duplicates` are moved ahead of row-wise transforms on
+    other columns, work on columns that a later `drop_columns` deletes is removed, and consecutive string
+    formatting steps are fused into a single `transform_strings` step.
+
+    Parameters:
+    - steps: list of dict
+        The pipeline steps, each with a 'method_name' and its 'arguments'.
+    - columns: list or None, default=None
+        The columns of the data before the first step, if known. Steps that only create columns
+        dropped later are then removed as well.
+
+    Returns:
+    - tuple: The optimized steps and a list of descriptions of the rewrites applied.
+    """
+    rewrites = []
+    steps = _reorder_filters(steps, rewrites)
+    steps = _eliminate_dead_columns(steps, rewrites, columns)
+    steps = _fuse_string_steps(steps, rewrites)
+    return steps, rewrites
+
+def required_columns(columns, steps):
+    """
+    Return the columns, of those the data starts with, that the steps need: every column except those
+    deleted before any step reads or writes them, or runs with columns chosen from the data.
+
+    Parameters:
+    - columns: list
+        The columns of the data before the first step.
+    - steps: list of dict
+        The pipeline steps.
+
+    Returns:
+    - list: The needed columns, in their original order.
+    """
+    specs = [step_spec(step) for step in steps]
+    return [column for column in columns if not _is_dead(column, specs)]
+
+def without_columns(steps, columns):
+    """
+    Remove columns from the `drop_columns` steps of a plan, and the steps left with nothing to drop,
+    for data loaded without those columns.
+    """
+    pruned = []
+    for step in steps:
+        if step['method_name'] == 'drop_columns':
+            dropped = step.get('arguments', {}).get('columns')
+            dropped = [dropped] if isinstance(dropped, str) else dropped
+            if dropped is not None:
+                kept = [column for column in dropped if column not in columns]
+                if not kept:
+                    continue
+                step = {'method_name': step['method_name'], 'arguments': {**step['arguments'], 'columns': kept}}
+        pruned.append(step)
+    return pruned
+
+def is_column_local(spec):
+    """
+    Return whether a step only touches a known set of columns and keeps every row, so it can run on a
+    DataFrame holding just those columns.
+    """
+    return spec['kind'] in ('row_wise', 'aggregate') and spec['reads'] is not None and spec['writes'] is not None
+
+def independent_groups(steps):
+    """
+    Split column-local steps into groups that touch disjoint columns. Two steps share a group when one
+    writes a column the other reads or writes; steps of different groups can run concurrently.
+
+    Parameters:
+    - steps: list of dict
+        Column-local pipeline steps, see `is_column_local`.
+
+    Returns:
+    - list of list: The indices of the steps of each group, in pipeline order.
+    """
+    specs = [step_spec(step) for step in steps]
+    parents = list(range(len(steps)))
+
+    def find(i):
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    for j in range(len(steps)):
+        for i in range(j):
+            if (specs[i]['writes'] & (specs[j]['reads'] | specs[j]['writes'])) or (specs[j]['writes'] & specs[i]['reads']):
+                parents[find(j)] = find(i)
+
+    groups = {}
+    for i in range(len(steps)):
+        groups.setdefault(find(i), []).append(i)
+    return sorted(groups.values())
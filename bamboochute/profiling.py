@@ -3,9 +3,10 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from bamboochute.utils import log
+from bamboochute.utils import eager, log
 from bamboochute.bamboo import Bamboo
 
+@eager
 @log
 def basic_summary(self, include='all'):
     """
@@ -18,6 +19,7 @@ def basic_summary(self, include='all'):
     self.log_changes("Generated basic summary report.")
     return summary
 
+@eager
 @log
 def missing_data_report(self):
     """
@@ -36,6 +38,7 @@ def missing_data_report(self):
     self.log_changes("Generated missing data report.")
     return missing_report
 
+@eager
 @log
 def outliers_report(self, columns=None, method='zscore', threshold=3):
     """
@@ -71,6 +74,7 @@ def outliers_report(self, columns=None, method='zscore', threshold=3):
     print(outliers_report)
     return outliers_report
 
+@eager
 @log
 def distribution_report(self, columns=None):
     """
@@ -98,6 +102,7 @@ def distribution_report(self, columns=None):
     self.log_changes(f"Generated distribution report for columns: {columns}.")
     return None
 
+@eager
 @log
 def correlation_report(self):
     """
@@ -118,6 +123,7 @@ def correlation_report(self):
     self.log_changes("Generated correlation report.")
     return corr_matrix
 
+@eager
 @log
 def data_types_overview(self):
     """
@@ -137,6 +143,7 @@ def data_types_overview(self):
     print(data_type_report)
     return data_type_report
 
+@eager
 @log
 def duplicate_report(self):
     """
@@ -0,0 +1,159 @@
+# bamboochute/schema.py
+import json
+import numpy as np
+import pandas as pd
+
+DEFAULT_SAMPLE_ROWS = 10_000
+
+def _narrowest_integer(series):
+    """
+    Return the narrowest signed integer dtype whose range holds the minimum and maximum of a column.
+    """
+    if series.empty:
+        return 'int8'
+    low, high = series.min(), series.max()
+    for dtype in ('int8', 'int16', 'int32', 'int64'):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return str(series.dtype)
+
+def _narrowest_float(series):
+    """
+    Return float32 if every value of a float64 column converts to it and back unchanged, else the column's dtype.
+    """
+    if series.dtype != np.float64:
+        return str(series.dtype)
+    values = series.to_numpy()
+    with np.errstate(over='ignore'):
+        exact = np.array_equal(values.astype(np.float32).astype(np.float64), values, equal_nan=True)
+    return 'float32' if exact else 'float64'
+
+def _compact_dtype(series, max_unique_ratio):
+    """
+    Return the narrowest dtype that can hold the values of a single column.
+    """
+    if pd.api.types.is_bool_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+        return str(series.dtype)
+    if pd.api.types.is_integer_dtype(series) and not pd.api.types.is_extension_array_dtype(series):
+        return _narrowest_integer(series)
+    if pd.api.types.is_float_dtype(series) and not pd.api.types.is_extension_array_dtype(series):
+        return _narrowest_float(series)
+    if series.dtype == object:
+        inferred = pd.api.types.infer_dtype(series, skipna=True)
+        if inferred == 'boolean':
+            return 'boolean'
+        if inferred == 'string':
+            non_null = series.count()
+            if non_null and series.nunique() / non_null <= max_unique_ratio:
+                return 'category'
+    return str(series.dtype)
+
+def infer_schema(data, max_unique_ratio=0.5):
+    """
+    Infer the narrowest dtype for every column of a DataFrame or sample.
+
+    Integers and floats are downcast to the smallest type that holds their values exactly, string columns
+    with few distinct values become categories, and object columns holding only booleans become
+    nullable booleans.
+
+    Parameters:
+    - data: pd.DataFrame
+        The data (or a sample of it) to inspect.
+    - max_unique_ratio: float, default=0.5
+        String columns whose ratio of distinct to non-null values is at most this are stored as categories.
+
+    Returns:
+    - dict: A mapping of column names to dtype names.
+    """
+    return {col: _compact_dtype(data[col], max_unique_ratio) for col in data.columns}
+
+def apply_schema(data, schema):
+    """
+    Cast the columns of a DataFrame to the dtypes in a schema. Columns missing from the schema are left unchanged.
+
+    Parameters:
+    - data: pd.DataFrame
+        The data to cast.
+    - schema: dict
+        A mapping of column names to dtype names.
+
+    Returns:
+    - pd.DataFrame: The data with the schema applied.
+    """
+    dtypes = {col: dtype for col, dtype in schema.items() if col in data.columns and str(data[col].dtype) != dtype}
+    return data.astype(dtypes) if dtypes else data
+
+def compact_dtypes(data, max_unique_ratio=0.5):
+    """
+    Downcast every column of a DataFrame to the narrowest dtype that holds its values. Floats are
+    downcast to float32 only when every value converts to float32 and back unchanged, so no value is rounded.
+
+    Returns:
+    - pd.DataFrame: The compacted data.
+    """
+    return apply_schema(data, infer_schema(data, max_unique_ratio=max_unique_ratio))
+
+def parse_dtypes(schema):
+    """
+    Return the part of a schema that Pandas readers can apply while parsing. Datetime columns are
+    left out since readers only parse them through `parse_dates`; `apply_schema` casts them afterwards.
+    """
+    return {col: dtype for col, dtype in schema.items() if not str(dtype).startswith('datetime')}
+
+def infer_parse_dtypes(sample, max_unique_ratio=0.5):
+    """
+    Infer, from a sample of rows, the dtypes that are safe to apply while parsing the whole source.
+    Only categories are returned, since a sample cannot prove that numeric values of the remaining
+    rows fit a narrower type.
+
+    Returns:
+    - dict: A mapping of column names to 'category' for low-cardinality string columns.
+    """
+    schema = infer_schema(sample, max_unique_ratio=max_unique_ratio)
+    return {col: dtype for col, dtype in schema.items() if dtype == 'category'}
+
+def infer_csv_dtypes(filepath, usecols=None, sample_rows=DEFAULT_SAMPLE_ROWS, max_unique_ratio=0.5):
+    """
+    Run a fast inference pass over the first rows of a CSV file, see `infer_parse_dtypes`.
+    """
+    sample = pd.read_csv(filepath, nrows=sample_rows, usecols=usecols)
+    return infer_parse_dtypes(sample, max_unique_ratio=max_unique_ratio)
+
+def concat_frames(frames, ignore_index=True):
+    """
+    Concatenate DataFrames while keeping columns that are categorical in every frame categorical,
+    by unifying their categories first instead of letting Pandas fall back to object dtype.
+    The categorical columns of the input frames are updated in place.
+
+    Parameters:
+    - frames: list of pd.DataFrame
+        The frames to concatenate.
+    - ignore_index: bool, default=True
+        Whether to give the result a fresh index instead of keeping the index of the frames.
+
+    Returns:
+    - pd.DataFrame: The concatenated data.
+    """
+    if len(frames) > 1:
+        shared = [col for col in frames[0].columns
+                  if all(col in frame.columns and isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames)]
+        for col in shared:
+            categories = frames[0][col].cat.categories.append([frame[col].cat.categories for frame in frames[1:]]).unique()
+            for frame in frames:
+                frame[col] = frame[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=ignore_index)
+
+def save_schema(schema, filepath):
+    """
+    Save a schema to a JSON file so it can be reused on later loads.
+    """
+    with open(filepath, 'w') as file:
+        json.dump(schema, file, indent=4)
+
+def load_schema(filepath):
+    """
+    Load a schema from a JSON file.
+    """
+    with open(filepath, 'r') as file:
+        return json.load(file)
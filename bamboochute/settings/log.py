@@ -1,10 +1,48 @@
 # bamboo/settings/log.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 class LoggerConfig:
     LOGGING_ENABLED = True
+    TIMING_ENABLED = False
+
+# Overrides the global default within a context: a thread, an asyncio task, or a `logging_context` block
+_logging_enabled = ContextVar('bamboochute_logging_enabled', default=None)
 
 # Getter and setter functions
 def is_logging_enabled():
-    return LoggerConfig.LOGGING_ENABLED
+    """
+    Return whether logging is enabled in the current context, falling back to the global default.
+    """
+    enabled = _logging_enabled.get()
+    return LoggerConfig.LOGGING_ENABLED if enabled is None else enabled
 
 def set_logging(enabled):
-    LoggerConfig.LOGGING_ENABLED = enabled
\ No newline at end of file
+    """
+    Set the global default for logging, used by Bamboo instances and contexts that do not set their own.
+    """
+    LoggerConfig.LOGGING_ENABLED = enabled
+
+@contextmanager
+def logging_context(enabled):
+    """
+    Enable or disable logging for the current thread or asyncio task only, until the block exits.
+
+    Parameters:
+    - enabled: bool
+        Whether logging is enabled within the block.
+    """
+    token = _logging_enabled.set(enabled)
+    try:
+        yield
+    finally:
+        _logging_enabled.reset(token)
+
+def is_timing_enabled():
+    return LoggerConfig.TIMING_ENABLED
+
+def set_timing(enabled):
+    """
+    Enable or disable recording a histogram of the duration of every Bamboo method call, see `bamboochute.utils.get_timings`.
+    """
+    LoggerConfig.TIMING_ENABLED = enabled
@@ -0,0 +1,41 @@
+# bamboo/settings/parallel.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+class ParallelConfig:
+    WORKERS = None
+
+# Overrides the global default within a context: a thread, an asyncio task, or a `parallel_context` block
+_workers = ContextVar('bamboochute_workers', default=None)
+
+def get_workers():
+    """
+    Return the number of workers used by parallel operations in the current context, or None for one per CPU.
+    """
+    workers = _workers.get()
+    return ParallelConfig.WORKERS if workers is None else workers
+
+def set_workers(workers):
+    """
+    Set the global default number of workers used by parallel operations. None means one per CPU.
+    """
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be a positive integer or None.")
+    ParallelConfig.WORKERS = workers
+
+@contextmanager
+def parallel_context(workers):
+    """
+    Set the number of workers used by parallel operations for the current thread or asyncio task only.
+
+    Parameters:
+    - workers: int
+        The number of workers within the block.
+    """
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be a positive integer or None.")
+    token = _workers.set(workers)
+    try:
+        yield
+    finally:
+        _workers.reset(token)
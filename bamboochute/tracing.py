@@ -0,0 +1,159 @@
+# bamboochute/tracing.py
+import json
+import os
+import threading
+import time
+import tracemalloc
+import pandas as pd
+
+PROFILE_COLUMNS = ['step', 'method', 'arguments', 'started_at', 'wall_time', 'cpu_time', 'peak_memory',
+                   'rows_in', 'rows_out', 'columns_in', 'columns_out', 'dtype_changes', 'status']
+
+def dtype_changes(before, after):
+    """
+    Describe how the dtypes of a DataFrame changed, e.g. "age: float64 -> Int64; +age_group: category; -notes".
+
+    Parameters:
+    - before: pd.Series
+        The dtypes before, as returned by `DataFrame.dtypes`.
+    - after: pd.Series
+        The dtypes after.
+
+    Returns:
+    - str: The changed, added and removed columns, or an empty string if nothing changed.
+    """
+    if not (before.index.is_unique and after.index.is_unique):
+        return '' if before.equals(after) else 'columns changed'
+    changes = [f"{col}: {before[col]} -> {after[col]}" for col in before.index
+               if col in after.index and before[col] != after[col]]
+    changes.extend(f"+{col}: {after[col]}" for col in after.index if col not in before.index)
+    changes.extend(f"-{col}" for col in before.index if col not in after.index)
+    return "; ".join(changes)
+
+def _reset_peak():
+    if hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+    else:
+        # Python < 3.9: clearing the traces also resets the peak, and the memory traced so far
+        tracemalloc.clear_traces()
+
+class PipelineProfiler:
+    """
+    Measures the steps of a pipeline run: wall and CPU time, the peak memory allocated while the step
+    ran (traced with `tracemalloc`, which slows allocations down), and the shape and dtypes of the data
+    before and after. Timestamps are relative to the start of the run.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._origin = time.perf_counter()
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+
+    def run(self, bamboo, step, method, arguments, func):
+        """
+        Call `func` and record its profile under the given step index, method name and arguments.
+        """
+        data = bamboo.data
+        rows_in, columns_in, dtypes_in = len(data), data.shape[1], data.dtypes
+        _reset_peak()
+        memory_start = tracemalloc.get_traced_memory()[0]
+        started_at = time.perf_counter()
+        cpu_start = time.thread_time()
+        status = 'error'
+        try:
+            result = func()
+            status = 'ok'
+            return result
+        finally:
+            wall_time = time.perf_counter() - started_at
+            cpu_time = time.thread_time() - cpu_start
+            peak_memory = max(tracemalloc.get_traced_memory()[1] - memory_start, 0)
+            data = bamboo.data
+            self.records.append({
+                'step': step,
+                'method': method,
+                'arguments': arguments,
+                'started_at': started_at - self._origin,
+                'wall_time': wall_time,
+                'cpu_time': cpu_time,
+                'peak_memory': peak_memory,
+                'rows_in': rows_in,
+                'rows_out': len(data),
+                'columns_in': columns_in,
+                'columns_out': data.shape[1],
+                'dtype_changes': dtype_changes(dtypes_in, data.dtypes),
+                'status': status,
+            })
+
+    def stop(self):
+        """
+        Stop tracing memory, if this profiler started it, and return the profile as a DataFrame.
+        """
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return pd.DataFrame(self.records, columns=PROFILE_COLUMNS)
+
+def _write_json(document, filepath):
+    if filepath is None:
+        return json.dumps(document, indent=4)
+    with open(filepath, 'w') as file:
+        json.dump(document, file, indent=4)
+
+def _label(record):
+    return f"{record['step']}. {record['method']}"
+
+def to_chrome_trace(profile, filepath=None):
+    """
+    Convert a pipeline profile to the Chrome trace event format, viewable in chrome://tracing or Perfetto.
+
+    Parameters:
+    - profile: pd.DataFrame
+        A profile as returned by `execute_pipeline(profile=True)`.
+    - filepath: str or None, default=None
+        The file to write the trace to. If None, the trace is returned as a JSON string.
+
+    Returns:
+    - str or None: The JSON trace if no filepath is given.
+    """
+    pid, tid = os.getpid(), threading.get_ident()
+    events = []
+    for record in profile.to_dict('records'):
+        args = {key: record[key] for key in ('arguments', 'cpu_time', 'peak_memory', 'rows_in', 'rows_out',
+                                             'columns_in', 'columns_out', 'dtype_changes', 'status')}
+        events.append({'name': _label(record), 'cat': 'step', 'ph': 'X', 'pid': pid, 'tid': tid,
+                       'ts': record['started_at'] * 1e6, 'dur': record['wall_time'] * 1e6,
+                       'args': json.loads(json.dumps(args, default=str))})
+    return _write_json({'traceEvents': events, 'displayTimeUnit': 'ms'}, filepath)
+
+def to_speedscope(profile, filepath=None, name='pipeline'):
+    """
+    Convert a pipeline profile to the speedscope file format, viewable at https://www.speedscope.app.
+
+    Parameters:
+    - profile: pd.DataFrame
+        A profile as returned by `execute_pipeline(profile=True)`.
+    - filepath: str or None, default=None
+        The file to write the profile to. If None, the profile is returned as a JSON string.
+    - name: str, default='pipeline'
+        The name shown for the profile.
+
+    Returns:
+    - str or None: The JSON profile if no filepath is given.
+    """
+    records = profile.to_dict('records')
+    frames = [{'name': _label(record)} for record in records]
+    events = []
+    for frame, record in enumerate(records):
+        events.append({'type': 'O', 'frame': frame, 'at': record['started_at']})
+        events.append({'type': 'C', 'frame': frame, 'at': record['started_at'] + record['wall_time']})
+    end = max((event['at'] for event in events), default=0)
+    document = {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': name,
+        'shared': {'frames': frames},
+        'profiles': [{'type': 'evented', 'name': name, 'unit': 'seconds', 'startValue': 0, 'endValue': end,
+                      'events': events}],
+    }
+    return _write_json(document, filepath)
@@ -1,24 +1,107 @@
 # bamboochute/utils.py
 import logging
+import threading
+import time
 from functools import wraps
-from bamboochute.settings.log import is_logging_enabled
+import pandas as pd
+from bamboochute.settings.log import LoggerConfig, is_logging_enabled
 
-# Configure logging here, if not already done globally
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Library logger: records go wherever the host application configures them, and nowhere otherwise
+logger = logging.getLogger('bamboochute')
+logger.addHandler(logging.NullHandler())
+
+# Durations are counted in power-of-two buckets of microseconds: bucket i holds durations below 2**i µs
+TIMING_BUCKETS = 40
+
+class TimingHistograms:
+    """
+    Per-method histograms of call durations, filled by the `log` decorator while timing is enabled.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def add(self, name, seconds):
+        bucket = min(int(seconds * 1e6).bit_length(), TIMING_BUCKETS - 1)
+        with self._lock:
+            counts = self._counts.get(name)
+            if counts is None:
+                counts = self._counts[name] = [0] * TIMING_BUCKETS
+            counts[bucket] += 1
+
+    def to_frame(self):
+        with self._lock:
+            rows = [(name, 2 ** bucket / 1e6, count) for name, counts in sorted(self._counts.items())
+                    for bucket, count in enumerate(counts) if count]
+        return pd.DataFrame(rows, columns=['method', 'upper_bound_seconds', 'count'])
+
+    def reset(self):
+        with self._lock:
+            self._counts = {}
+
+_timings = TimingHistograms()
+
+def get_timings():
+    """
+    Return the histograms of Bamboo method durations recorded since timing was enabled with
+    `bamboochute.settings.log.set_timing(True)`.
+
+    Returns:
+    - pd.DataFrame: One row per method and duration bucket, with the bucket's upper bound in seconds and the number of calls.
+    """
+    return _timings.to_frame()
+
+def reset_timings():
+    """
+    Clear the recorded duration histograms.
+    """
+    _timings.reset()
+
+def _instrumented(func, module, name, enabled, args, kwargs):
+    emit = enabled and logger.isEnabledFor(logging.INFO)
+    if emit:
+        logger.info("LOG: (%s, %s) entered.", module, name)
+    start = time.perf_counter() if LoggerConfig.TIMING_ENABLED else None
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        if enabled:
+            logger.error("LOG: (%s, %s) failed with %s.", module, name, e)
+        raise
+    finally:
+        if start is not None:
+            _timings.add(name, time.perf_counter() - start)
+    if emit:
+        logger.info("LOG: (%s, %s) executed successfully.", module, name)
+    return result
+
+def eager(func):
+    """
+    Mark a Bamboo method that needs the data itself: it returns a result computed from the data, such as
+    a report or the rows flagged by a detector, or writes the data out. A lazy Bamboo runs its plan and
+    calls these methods on the result instead of recording them, see `LazyBamboo`.
+    """
+    func.eager = True
+    return func
 
 # Logging decorator
 def log(func):
+    module, name = func.__module__, func.__name__
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        if is_logging_enabled():
-            logging.info(f"LOG: ({func.__module__}, {func.__name__}) entered.")
-            try:
-                result = func(*args, **kwargs)
-                logging.info(f"LOG: ({func.__module__}, {func.__name__}) executed successfully.")
-                return result
-            except Exception as e:
-                logging.error(f"LOG: ({func.__module__}, {func.__name__}) failed with {e}.")
-                raise
-        else:
-            return func(*args, **kwargs)
+        instance = args[0] if args else None
+        # A Bamboo instance created with an explicit `sys_log` overrides the context and global settings
+        enabled = getattr(instance, '_sys_log', None)
+        if enabled is None:
+            enabled = is_logging_enabled()
+        target = func
+        if enabled or LoggerConfig.TIMING_ENABLED:
+            def target(*args, **kwargs):
+                return _instrumented(func, module, name, enabled, args, kwargs)
+        operations = getattr(instance, '_operations', None)
+        if operations is not None and operations.depth == 0:
+            return operations.record(name, target, args, kwargs)
+        return target(*args, **kwargs)
     return wrapper
@@ -1,8 +1,9 @@
 # bamboochute/validation.py
 import pandas as pd
-from bamboochute.utils import log
+from bamboochute.utils import eager, log
 from bamboochute.bamboo import Bamboo
 
+@eager
 @log
 def validate_missing_data(self, columns=None):
     """
@@ -26,6 +27,7 @@ def validate_missing_data(self, columns=None):
     self.log_changes("Validation passed: no missing data.")
     return True
 
+@eager
 @log
 def validate_data_types(self, expected_types):
     """
@@ -49,6 +51,7 @@ def validate_data_types(self, expected_types):
     self.log_changes("Validation passed: all columns match expected data types.")
     return True
 
+@eager
 @log
 def validate_value_ranges(self, column, min_value=None, max_value=None):
     """
@@ -76,6 +79,7 @@ def validate_value_ranges(self, column, min_value=None, max_value=None):
     self.log_changes(f"Validation passed: values in column '{column}' are within range.")
     return True
 
+@eager
 @log
 def validate_unique_values(self, column):
     """
@@ -96,6 +100,7 @@ def validate_unique_values(self, column):
     self.log_changes(f"Validation passed: column '{column}' contains unique values.")
     return True
 
+@eager
 @log
 def validate_categories(self, column, valid_categories):
     """
@@ -119,6 +124,7 @@ def validate_categories(self, column, valid_categories):
     self.log_changes(f"Validation passed: all values in column '{column}' are valid categories.")
     return True
 
+@eager
 @log
 def validate_date_range(self, column, start_date=None, end_date=None):
     """
@@ -146,6 +152,7 @@ def validate_date_range(self, column, start_date=None, end_date=None):
     self.log_changes(f"Validation passed: dates in column '{column}' are within range.")
     return True
 
+@eager
 @log
 def custom_validation(self, column, validation_function):
     """
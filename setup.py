@@ -17,6 +17,13 @@ setup(
         'scikit-learn>=0.24.0', 
         'fancyimpute>=0.7.0'   
     ],
+    entry_points={
+        'console_scripts': ['bamboochute=bamboochute.cli:main'],
+    },
+    extras_require={
+        'arrow': ['pyarrow>=10.0.0'],
+        'zstd': ['zstandard>=0.15.0'],
+    },
     classifiers=[
         'Development Status :: 4 - Beta',
         'Intended Audience :: Developers',
@@ -0,0 +1,141 @@
+# tests/test_aggregates.py
+
+import pandas as pd
+import numpy as np
+import pytest
+from bamboochute.bamboo import Bamboo
+from bamboochute.pipelines import BambooPipeline
+from bamboochute.aggregates import AGGREGATES, QUANTILE_FETCH_LIMIT, Refinement, is_mergeable
+from bamboochute.execution import is_row_local
+
+@pytest.fixture
+def sample_data():
+    """Fixture to provide numeric and categorical data with missing values and outliers."""
+    rng = np.random.default_rng(0)
+    n = 400
+    data = pd.DataFrame({
+        'value': rng.normal(size=n),
+        'count': rng.integers(0, 100, n).astype(float),
+        'city': rng.choice(['Paris', 'Rome', 'Oslo', ' Bern ', None], n, p=[0.5, 0.3, 0.15, 0.04, 0.01]),
+        'group': rng.choice(['a', 'b', 'c'], n),
+    })
+    data.loc[rng.choice(n, 20), 'value'] = np.nan
+    data.loc[rng.choice(n, 20), 'count'] = np.nan
+    data.loc[7, 'value'] = 40.0
+    return data
+
+def run(steps, data, **options):
+    pipeline = BambooPipeline()
+    for method_name, arguments in steps:
+        pipeline.add_step(method_name, **arguments)
+    return pipeline.execute_pipeline(Bamboo(data.copy()), **options)
+
+STEPS = [
+    [('trim_whitespace', {'columns': ['city']}), ('impute_missing', {'strategy': 'mean'}),
+     ('remove_outliers', {'method': 'zscore'})],
+    [('impute_missing', {'strategy': 'median'}), ('remove_outliers', {'method': 'iqr', 'multiplier': 1.0}),
+     ('drop_duplicates', {'subset': ['group']})],
+    [('impute_missing', {'strategy': 'mode'}), ('convert_to_categorical', {}),
+     ('replace_rare_categories', {'column': 'city', 'threshold': 0.05}), ('encode_frequency', {'columns': ['group']})],
+    [('convert_to_categorical', {'columns': ['city', 'group']}), ('encode_categorical', {'method': 'label'}),
+     ('detect_outliers_zscore', {'columns': ['value', 'count']})],
+]
+
+@pytest.mark.parametrize('steps', STEPS)
+@pytest.mark.parametrize('partitions', [1, 3, 7])
+def test_partitioned_matches_sequential(sample_data, steps, partitions):
+    """Test that running on row partitions gives the same data and change log as a sequential run."""
+    expected = run(steps, sample_data)
+    result = run(steps, sample_data, partitions=partitions, workers=2)
+
+    pd.testing.assert_frame_equal(result.get_data(), expected.get_data(), rtol=1e-9)
+    assert result._change_log == expected._change_log
+
+def test_partitioned_processes(sample_data):
+    """Test running partitions in worker processes."""
+    expected = run(STEPS[0], sample_data)
+    result = run(STEPS[0], sample_data, partitions=4, executor='process', workers=2)
+    pd.testing.assert_frame_equal(result.get_data(), expected.get_data(), rtol=1e-9)
+
+def test_more_partitions_than_rows():
+    """Test that empty partitions do not affect the merged statistics."""
+    data = pd.DataFrame({'value': [1.0, None, 3.0]})
+    result = run([('impute_missing', {'strategy': 'mean'})], data, partitions=5)
+    assert result.get_data()['value'].tolist() == [1.0, 2.0, 3.0]
+
+    steps = [('convert_to_categorical', {'columns': ['city']}), ('encode_categorical', {'method': 'label', 'columns': ['city']})]
+    data = pd.DataFrame({'city': ['Oslo', 'Rome', 'Oslo']})
+    result = run(steps, data, partitions=5)
+    pd.testing.assert_frame_equal(result.get_data(), run(steps, data).get_data())
+
+def test_zscore_merge_matches_pandas(sample_data):
+    """Test merging partial means and variances into the mean and standard deviation of the whole column."""
+    entry = AGGREGATES['detect_outliers_zscore']
+    partials = [entry['partial'](part, columns=['value']) for part in (sample_data.iloc[i::5] for i in range(5))]
+    mean, std = entry['merge'](partials, columns=['value'])
+
+    assert mean['value'] == pytest.approx(sample_data['value'].mean())
+    assert std['value'] == pytest.approx(sample_data['value'].std())
+
+@pytest.mark.parametrize('q', ['median', 0.25, 0.75])
+def test_quantile_refinement_is_exact(q):
+    """Test that order statistics refined over partitions equal pandas, past the fetch limit and with ties."""
+    rng = np.random.default_rng(1)
+    n = 5 * QUANTILE_FETCH_LIMIT
+    data = pd.DataFrame({
+        'value': np.concatenate([rng.lognormal(size=n - 1000), np.full(1000, 3.0)]),
+        'ties': rng.integers(0, 5, n).astype(float),
+        'empty': np.nan,
+    })
+    parts = [data.iloc[i::3] for i in range(3)]
+    if q == 'median':
+        entry, arguments = AGGREGATES['impute_missing'], {'strategy': 'median'}
+    else:
+        entry, arguments = AGGREGATES['detect_outliers_iqr'], {}
+
+    state = entry['merge']([entry['partial'](part, **arguments) for part in parts], **arguments)
+    rounds = 0
+    while isinstance(state, Refinement):
+        answers = [entry['refine'](part, state.request, **arguments) for part in parts]
+        # Only histograms and the few values left in the last interval are sent, never whole columns
+        assert all(len(answer) <= QUANTILE_FETCH_LIMIT for part in answers for answer in part.values())
+        state = state.resume(answers)
+        rounds += 1
+
+    assert rounds > 1
+    expected = data.median() if q == 'median' else data.quantile(q)
+    result = state[0] if q != 0.75 else state[1]
+    pd.testing.assert_series_equal(result, expected, check_names=False)
+
+@pytest.mark.parametrize('method_name, arguments', [('impute_missing', {'strategy': 'median'}),
+                                                     ('remove_outliers', {'method': 'iqr'})])
+def test_in_memory_quantiles_match_refinement(sample_data, method_name, arguments):
+    """Test that statistics computed in one pass over values in memory equal those refined over partitions."""
+    entry = AGGREGATES[method_name]
+    values = entry['values'](sample_data, **arguments)
+    state = entry['merge']([entry['partial'](values, **arguments)], **arguments)
+    while isinstance(state, Refinement):
+        state = state.resume([entry['refine'](values, state.request, **arguments)])
+
+    direct = entry['direct'](values, **arguments)
+    pd.testing.assert_series_equal(direct[0], state[0], check_names=False)
+    if method_name == 'impute_missing':
+        assert direct[1] == state[1]
+    else:
+        pd.testing.assert_series_equal(direct[1], state[1], check_names=False)
+
+def test_step_classification():
+    """Test which steps run per partition, as partial aggregates, or on the whole dataset."""
+    assert is_row_local({'method_name': 'drop_missing', 'arguments': {}})
+    assert not is_row_local({'method_name': 'drop_duplicates', 'arguments': {}})
+    assert is_mergeable({'method_name': 'remove_outliers', 'arguments': {'method': 'iqr'}})
+    assert not is_mergeable({'method_name': 'encode_categorical', 'arguments': {'method': 'onehot'}})
+
+def test_invalid_arguments(sample_data):
+    """Test that invalid arguments fail like the sequential run and partitions reject other modes."""
+    with pytest.raises(ValueError):
+        run([('impute_missing', {'strategy': 'max'})], sample_data, partitions=2)
+    with pytest.raises(ValueError):
+        run([('impute_missing', {})], sample_data, partitions=2, parallel=True)
+    with pytest.raises(ValueError):
+        run([('impute_missing', {})], sample_data, partitions=0)
@@ -0,0 +1,269 @@
+# tests/test_bamboo.py
+
+import asyncio
+import warnings
+import pandas as pd
+import numpy as np
+import pytest
+from bamboochute.bamboo import Bamboo
+
+@pytest.fixture
+def sample_data():
+    """Fixture to provide sample data for loading and exporting tests."""
+    return pd.DataFrame({
+        'id': list(range(10)),
+        'name': [' Alice ', 'Bob', None, 'Derek', 'Eve', 'Frank', ' Gina', 'Hal', 'Ivy', 'Jon'],
+        'score': [1.5, None, 3.0, 4.5, 5.0, None, 7.5, 8.0, 9.5, 10.0]
+    })
+
+@pytest.fixture
+def csv_path(sample_data, tmp_path):
+    """Fixture to write the sample data to a CSV file."""
+    path = str(tmp_path / 'sample.csv')
+    sample_data.to_csv(path, index=False)
+    return path
+
+def test_stream_csv(csv_path):
+    """Test streaming a CSV file in chunks of Bamboo instances."""
+    chunks = list(Bamboo.stream(csv_path, chunksize=4))
+
+    assert [len(chunk.get_data()) for chunk in chunks] == [4, 4, 2]
+    assert all(isinstance(chunk, Bamboo) for chunk in chunks)
+
+    combined = pd.concat([chunk.get_data() for chunk in chunks], ignore_index=True)
+    pd.testing.assert_frame_equal(combined, pd.read_csv(csv_path))
+
+def test_stream_cleaning_per_chunk(csv_path):
+    """Test applying cleaning methods to each streamed chunk."""
+    cleaned = []
+    for chunk in Bamboo.stream(csv_path, chunksize=3):
+        chunk.trim_whitespace(columns=['name']).drop_missing(subset=['score'])
+        cleaned.append(chunk.get_data())
+
+    combined = pd.concat(cleaned)
+    assert len(combined) == 8
+    assert combined['name'].iloc[0] == 'Alice'
+
+def test_stream_dataframe(sample_data):
+    """Test streaming an in-memory DataFrame in chunks."""
+    chunks = list(Bamboo.stream(sample_data, chunksize=5))
+    assert len(chunks) == 2
+    assert chunks[1].get_data()['id'].tolist() == [5, 6, 7, 8, 9]
+
+def test_stream_invalid_chunksize(csv_path):
+    """Test that a non-positive chunksize is rejected."""
+    with pytest.raises(ValueError):
+        next(Bamboo.stream(csv_path, chunksize=0))
+
+@pytest.mark.parametrize('format, extension', [('parquet', 'parquet'), ('feather', 'feather'), ('arrow', 'arrow')])
+def test_columnar_round_trip(sample_data, tmp_path, format, extension):
+    """Test exporting to and loading from columnar formats."""
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / f'sample.{extension}')
+    Bamboo(sample_data).export_data(path, format=format)
+
+    loaded = Bamboo(path).get_data()
+    pd.testing.assert_frame_equal(loaded, sample_data)
+
+def test_columnar_projection_and_filters(sample_data, tmp_path):
+    """Test loading only selected columns and rows from a Parquet file."""
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'sample.parquet')
+    Bamboo(sample_data).export_data(path, format='parquet')
+
+    bamboo = Bamboo(path, columns=['id', 'score'], filters=[('score', '>', 5)])
+    assert bamboo.get_data().columns.tolist() == ['id', 'score']
+    assert bamboo.get_data()['id'].tolist() == [6, 7, 8, 9]
+
+def test_csv_projection(csv_path):
+    """Test loading only selected columns from a CSV file."""
+    bamboo = Bamboo(csv_path, columns=['name'])
+    assert bamboo.get_data().columns.tolist() == ['name']
+
+def test_filters_require_columnar_format(csv_path):
+    """Test that row filters are rejected for non-columnar inputs."""
+    with pytest.raises(ValueError):
+        Bamboo(csv_path, filters=[('score', '>', 5)])
+
+def test_stream_parquet(sample_data, tmp_path):
+    """Test streaming a Parquet file in bounded chunks."""
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'sample.parquet')
+    Bamboo(sample_data).export_data(path, format='parquet')
+
+    chunks = list(Bamboo.stream(path, chunksize=4, columns=['id']))
+    assert sum(len(chunk.get_data()) for chunk in chunks) == 10
+    assert all(len(chunk.get_data()) <= 4 for chunk in chunks)
+
+def test_memory_map_npy(tmp_path):
+    """Test memory-mapping a .npy array and running read-only reports on it."""
+    path = str(tmp_path / 'matrix.npy')
+    array = np.array([[1.0, 2.0], [np.nan, 4.0], [3.0, 100.0], [2.0, 3.0]])
+    np.save(path, array)
+
+    bamboo = Bamboo(path, memory_map=True, columns=['a', 'b'])
+    assert not bamboo.get_data()['a'].to_numpy().flags.writeable
+    assert bamboo.missing_data_report().loc['a', 'missing_count'] == 1
+    assert bamboo.validate_value_ranges('b', min_value=0, max_value=1000)
+    assert bamboo.detect_outliers_iqr(columns=['b'])['b'].tolist() == [False, False, True, False]
+
+def test_memory_map_arrow(sample_data, tmp_path):
+    """Test memory-mapping an Arrow IPC file with column selection."""
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'sample.arrow')
+    Bamboo(sample_data).export_data(path, format='arrow')
+
+    bamboo = Bamboo(path, memory_map=True, columns=['id', 'score'])
+    assert bamboo.get_data().columns.tolist() == ['id', 'score']
+    assert not bamboo.get_data()['id'].to_numpy().flags.writeable
+    assert bamboo.missing_data_report().loc['score', 'missing_count'] == 2
+
+def test_memory_map_arrow_batches(tmp_path):
+    """Test that Arrow files exported in several batches warn that they are copied, and single-batch ones are mapped."""
+    pytest.importorskip('pyarrow')
+    data = pd.DataFrame({'id': np.arange(150_000), 'score': np.linspace(0, 1, 150_000)})
+    batched, single = str(tmp_path / 'batched.arrow'), str(tmp_path / 'single.arrow')
+    Bamboo(data).export_data(batched, format='arrow')
+    Bamboo(data).export_data(single, format='arrow', chunksize=len(data))
+
+    with pytest.warns(UserWarning, match='record batches'):
+        Bamboo(batched, memory_map=True)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        bamboo = Bamboo(single, memory_map=True)
+    assert not bamboo.get_data()['id'].to_numpy().flags.writeable
+    assert not bamboo.get_data()['score'].to_numpy().flags.writeable
+    pd.testing.assert_frame_equal(bamboo.get_data(), data)
+
+def test_memory_map_unsupported_format(csv_path):
+    """Test that memory mapping is rejected for text formats."""
+    with pytest.raises(ValueError):
+        Bamboo(csv_path, memory_map=True)
+
+@pytest.fixture
+def csv_shards(sample_data, tmp_path):
+    """Fixture to split the sample data into several CSV shards."""
+    paths = []
+    for i, start in enumerate(range(0, len(sample_data), 4)):
+        path = str(tmp_path / f'shard_{i}.csv')
+        sample_data.iloc[start:start + 4].to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+def test_load_glob_in_parallel(csv_shards, tmp_path):
+    """Test loading CSV shards matched by a glob pattern in a process pool."""
+    bamboo = Bamboo(str(tmp_path / 'shard_*.csv'), workers=2)
+
+    assert len(bamboo.get_data()) == 10
+    assert bamboo.get_data()['id'].tolist() == list(range(10))
+
+def test_load_list_with_source_column(csv_shards):
+    """Test loading a list of files and recording the source file of each row."""
+    bamboo = Bamboo(csv_shards, workers=1, source_column='source_file')
+    data = bamboo.get_data()
+
+    assert isinstance(data['source_file'].dtype, pd.CategoricalDtype)
+    assert (data['source_file'] == csv_shards[0]).sum() == 4
+    assert data['source_file'].iloc[-1] == csv_shards[-1]
+
+def test_load_shards_keeps_categories(csv_shards):
+    """Test that categorical columns inferred per shard stay categorical after concatenation."""
+    bamboo = Bamboo(csv_shards, schema={'name': 'category'})
+    data = bamboo.get_data()
+
+    assert isinstance(data['name'].dtype, pd.CategoricalDtype)
+    assert data['name'].iloc[-1] == 'Jon'
+    assert data['name'].isnull().sum() == 1
+
+def test_load_glob_without_matches(tmp_path):
+    """Test that a glob pattern matching no files is rejected."""
+    with pytest.raises(ValueError):
+        Bamboo(str(tmp_path / 'missing_*.csv'))
+
+def test_load_file_with_glob_characters(tmp_path):
+    """Test that an existing file whose name contains glob characters is loaded as a single file."""
+    filepath = tmp_path / 'data[2024].csv'
+    pd.DataFrame({'id': [1, 2]}).to_csv(filepath, index=False)
+    assert Bamboo(str(filepath)).get_data()['id'].tolist() == [1, 2]
+
+@pytest.mark.parametrize('extension', ['csv', 'csv.gz', 'csv.bz2', 'csv.xz'])
+def test_export_csv_compressed_in_batches(sample_data, csv_path, tmp_path, extension):
+    """Test exporting CSV files in small batches with compression inferred from the extension."""
+    path = str(tmp_path / f'out.{extension}')
+    Bamboo(sample_data).export_data(path, format='csv', chunksize=3)
+
+    pd.testing.assert_frame_equal(pd.read_csv(path), pd.read_csv(csv_path))
+
+def test_export_json_in_batches(sample_data, tmp_path):
+    """Test that batched JSON exports match a single-shot export."""
+    path = str(tmp_path / 'out.json')
+    Bamboo(sample_data).export_data(path, format='json', chunksize=4)
+
+    with open(path) as file:
+        assert file.read() == sample_data.to_json(orient='records')
+
+def test_export_jsonl_append(sample_data, tmp_path):
+    """Test appending streamed chunks to a compressed JSON Lines file."""
+    path = str(tmp_path / 'out.jsonl.gz')
+    for chunk in Bamboo.stream(sample_data, chunksize=4):
+        chunk.export_data(path, format='jsonl', mode='a')
+
+    loaded = pd.read_json(path, lines=True)
+    assert loaded['id'].tolist() == list(range(10))
+
+def test_export_csv_append_writes_single_header(sample_data, tmp_path):
+    """Test that appending CSV chunks writes the header only once."""
+    path = str(tmp_path / 'out.csv')
+    for chunk in Bamboo.stream(sample_data, chunksize=3):
+        chunk.export_data(path, format='csv', mode='a')
+
+    assert len(pd.read_csv(path)) == 10
+
+def test_export_invalid_compression(sample_data, tmp_path):
+    """Test that unknown compression codecs are rejected."""
+    with pytest.raises(ValueError):
+        Bamboo(sample_data).export_data(str(tmp_path / 'out.csv'), compression='rar')
+
+@pytest.fixture
+def jsonl_path(sample_data, tmp_path):
+    """Fixture to write the sample data to a JSON Lines file."""
+    path = str(tmp_path / 'events.jsonl')
+    sample_data.to_json(path, orient='records', lines=True)
+    return path
+
+def test_load_json_lines(jsonl_path, sample_data):
+    """Test loading a JSON Lines file parsed in batches."""
+    bamboo = Bamboo(jsonl_path)
+    assert bamboo.get_data()['id'].tolist() == sample_data['id'].tolist()
+    assert bamboo.get_data()['score'].isnull().sum() == 2
+
+def test_load_json_lines_with_declared_dtypes(jsonl_path):
+    """Test declaring dtypes up front when loading JSON Lines."""
+    bamboo = Bamboo(jsonl_path, schema={'id': 'int16', 'score': 'float32'}, columns=['id', 'score'])
+    assert bamboo.get_data().dtypes.tolist() == [np.int16, np.float32]
+
+def test_stream_json_lines(jsonl_path):
+    """Test streaming a JSON Lines file into the chunked cleaning path."""
+    chunks = [chunk.drop_missing().get_data() for chunk in Bamboo.stream(jsonl_path, chunksize=4)]
+    assert [len(chunk) for chunk in chunks] == [2, 3, 2]
+
+def test_load_compressed_json_lines(sample_data, tmp_path):
+    """Test loading a gzip-compressed JSON Lines file with schema inference."""
+    path = str(tmp_path / 'events.ndjson.gz')
+    Bamboo(sample_data).export_data(path, format='jsonl')
+
+    bamboo = Bamboo(path, infer_schema=True)
+    assert bamboo.get_data()['id'].dtype == np.int8
+    assert len(bamboo.get_data()) == 10
+
+def test_aload(csv_path):
+    """Test loading a dataset from a coroutine."""
+    bamboo = asyncio.run(Bamboo.aload(csv_path, columns=['id']))
+    assert bamboo.get_data().columns.tolist() == ['id']
+
+def test_aload_many(csv_shards):
+    """Test loading several datasets concurrently, preserving their order."""
+    bamboos = asyncio.run(Bamboo.aload_many(csv_shards, max_workers=2))
+
+    assert [len(bamboo.get_data()) for bamboo in bamboos] == [4, 4, 2]
+    assert bamboos[1].get_data()['id'].iloc[0] == 4
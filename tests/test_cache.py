@@ -0,0 +1,142 @@
+# tests/test_cache.py
+
+import os
+import pandas as pd
+import pytest
+from bamboochute.bamboo import Bamboo
+from bamboochute.cache import SourceCache, StepCache
+from bamboochute.pipelines import BambooPipeline
+
+@pytest.fixture
+def sample_data():
+    """Fixture to provide sample data for caching tests."""
+    return pd.DataFrame({
+        'id': [1, 2, 3, 4],
+        'city': ['NY', 'LA', None, 'NY'],
+        'score': [1.5, None, 3.0, 4.5]
+    })
+
+@pytest.fixture
+def csv_path(sample_data, tmp_path):
+    """Fixture to write the sample data to a CSV file."""
+    path = str(tmp_path / 'source.csv')
+    sample_data.to_csv(path, index=False)
+    return path
+
+@pytest.fixture
+def cache(tmp_path):
+    """Fixture to provide a cache in a temporary directory."""
+    return SourceCache(directory=str(tmp_path / 'cache'))
+
+def test_cache_hit_returns_same_data(csv_path, cache):
+    """Test that reopening an unchanged file is served from the cache."""
+    first = Bamboo(csv_path, cache=cache).get_data()
+    assert len(os.listdir(cache.directory)) == 1
+
+    key = cache.key(csv_path, {'columns': None, 'infer_schema': False, 'schema': None})
+    assert cache.get(key) is not None
+
+    second = Bamboo(csv_path, cache=cache).get_data()
+    pd.testing.assert_frame_equal(first, second)
+
+def test_cache_invalidated_on_change(csv_path, cache, sample_data):
+    """Test that a modified file is parsed again instead of being served from the cache."""
+    Bamboo(csv_path, cache=cache)
+    sample_data.assign(id=[10, 20, 30, 40]).to_csv(csv_path, index=False)
+
+    assert Bamboo(csv_path, cache=cache).get_data()['id'].tolist() == [10, 20, 30, 40]
+
+def test_cache_keys_include_options(csv_path, cache):
+    """Test that different loading options are cached separately."""
+    Bamboo(csv_path, cache=cache)
+    projected = Bamboo(csv_path, cache=cache, columns=['id'])
+
+    assert projected.get_data().columns.tolist() == ['id']
+    assert len(os.listdir(cache.directory)) == 2
+
+def test_cache_keeps_option_errors(csv_path, cache):
+    """Test that options unsupported by the source fail the same way with or without the cache."""
+    with pytest.raises(ValueError):
+        Bamboo(csv_path, cache=cache, filters=[('id', '>', 2)])
+    with pytest.raises(ValueError):
+        Bamboo(csv_path, cache=cache, memory_map=True)
+    assert not os.path.exists(cache.directory) or os.listdir(cache.directory) == []
+
+def test_cache_falls_back_to_pickle(tmp_path, cache):
+    """Test caching data that Arrow cannot represent."""
+    path = str(tmp_path / 'mixed.csv')
+    pd.DataFrame({'value': [1, 'two', 3]}).to_csv(path, index=False)
+    key = cache.key(path)
+    cache.put(key, pd.DataFrame({'value': [1, 'two', 3]}))
+
+    assert cache.get(key)['value'].tolist() == [1, 'two', 3]
+
+def test_cache_lru_eviction(csv_path, tmp_path):
+    """Test that the least recently used entries are evicted once the cache is full."""
+    cache = SourceCache(directory=str(tmp_path / 'cache'), max_bytes=1)
+    Bamboo(csv_path, cache=cache)
+    assert os.listdir(cache.directory) == []
+
+def test_step_cache_reuses_unchanged_prefix(sample_data):
+    """Test that editing a later step reuses the cached results of the steps before it."""
+    cache = StepCache()
+    pipeline = BambooPipeline()
+    pipeline.add_step('impute_missing', strategy='mean', columns=['score'])
+    pipeline.add_step('trim_whitespace', columns=['city'])
+    pipeline.add_step('drop_missing')
+    expected = pipeline.execute_pipeline(Bamboo(sample_data.copy()))
+    first = pipeline.execute_pipeline(Bamboo(sample_data.copy()), cache=cache)
+    assert (cache.hits, cache.misses) == (0, 3)
+    pd.testing.assert_frame_equal(first.get_data(), expected.get_data())
+
+    pipeline.pipeline_steps[2]['arguments'] = {'subset': ['score']}
+    second = pipeline.execute_pipeline(Bamboo(sample_data.copy()), cache=cache)
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert len(second.get_data()) == 4
+    assert second._change_log[0] == first._change_log[0]
+
+    # Mutating a result must not corrupt the cached copy
+    second.get_data().loc[0, 'score'] = -1.0
+    third = pipeline.execute_pipeline(Bamboo(sample_data.copy()), cache=cache)
+    assert third.get_data().loc[0, 'score'] == 1.5
+
+def test_step_cache_on_disk(sample_data, tmp_path):
+    """Test that results stored on disk are reused by a new cache and bounded in size."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('impute_missing', strategy='median', columns=['score'])
+    pipeline.execute_pipeline(Bamboo(sample_data.copy()), cache=StepCache(directory=str(tmp_path / 'steps')))
+
+    cache = StepCache(directory=str(tmp_path / 'steps'))
+    result = pipeline.execute_pipeline(Bamboo(sample_data.copy()), cache=cache)
+    assert cache.hits == 1
+    assert result.get_data()['score'].isnull().sum() == 0
+
+    StepCache(directory=str(tmp_path / 'steps'), max_disk_bytes=0).put('key', sample_data, [])
+    assert os.listdir(str(tmp_path / 'steps')) == []
+
+def test_step_cache_recomputes_corrupt_entries(sample_data, tmp_path):
+    """Test that a corrupt entry on disk is treated as a miss, removed and replaced."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('impute_missing', strategy='median', columns=['score'])
+    pipeline.execute_pipeline(Bamboo(sample_data.copy()), cache=StepCache(directory=str(tmp_path / 'steps')))
+    for name in os.listdir(str(tmp_path / 'steps')):
+        (tmp_path / 'steps' / name).write_bytes(b'not a pickle')
+
+    cache = StepCache(directory=str(tmp_path / 'steps'))
+    result = pipeline.execute_pipeline(Bamboo(sample_data.copy()), cache=cache)
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert result.get_data()['score'].isnull().sum() == 0
+    assert StepCache(directory=str(tmp_path / 'steps')).get(os.listdir(str(tmp_path / 'steps'))[0][:-4]) is not None
+
+def test_step_cache_skips_uncacheable_steps(sample_data):
+    """Test that steps with non-JSON arguments or unhashable data always run."""
+    cache = StepCache()
+    pipeline = BambooPipeline()
+    pipeline.add_step('fill_with_custom', custom_function=lambda value: 0.0, columns=['score'])
+    pipeline.add_step('drop_missing')
+    for _ in range(2):
+        pipeline.execute_pipeline(Bamboo(sample_data.copy()), cache=cache)
+    assert cache.hits == 1
+
+    assert cache.fingerprint(pd.DataFrame({'a': [[1], [2]]})) is None
+    assert cache.fingerprint(sample_data) != cache.fingerprint(sample_data.rename(columns={'id': 'key'}))
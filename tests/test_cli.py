@@ -0,0 +1,65 @@
+# tests/test_cli.py
+
+import io
+import os
+import pandas as pd
+import pytest
+from bamboochute.pipelines import BambooPipeline
+from bamboochute.cli import export_format, main, output_paths, run
+
+@pytest.fixture
+def inputs(tmp_path):
+    """Fixture to provide a saved pipeline and a directory of input files."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('drop_missing', subset=['age'])
+    pipeline.add_step('trim_whitespace', columns=['name'])
+    pipeline.save_pipeline(str(tmp_path / 'pipeline.json'))
+
+    source = tmp_path / 'in'
+    source.mkdir()
+    for i in range(3):
+        pd.DataFrame({'name': [f' user{i} ', 'bob'], 'age': [20 + i, None]}).to_csv(source / f"part{i}.csv", index=False)
+    return tmp_path
+
+def test_run_cleans_every_file(inputs):
+    """Test that every input is cleaned into the output directory and throughput is reported."""
+    stream = io.StringIO()
+    results, failures = run(str(inputs / 'pipeline.json'), [str(inputs / 'in' / '*.csv')], str(inputs / 'out'),
+                            workers=2, stream=stream)
+
+    assert failures == {}
+    assert sorted(result['rows_out'] for result in results) == [1, 1, 1]
+    cleaned = pd.read_csv(inputs / 'out' / 'part1.csv')
+    assert cleaned['name'].tolist() == ['user1']
+    assert 'rows/s' in stream.getvalue() and 'Cleaned 3 of 3 file(s)' in stream.getvalue()
+
+def test_main_converts_format_and_reports_failures(inputs, capsys):
+    """Test the command line, converting outputs to Parquet and exiting with 1 when a file fails."""
+    (inputs / 'in' / 'broken.csv').write_text('name\nalice\n')
+    status = main(['run', str(inputs / 'pipeline.json'), str(inputs / 'in' / '*.csv'), '--out', str(inputs / 'out'),
+                   '--workers', '1', '--format', 'parquet'])
+
+    assert status == 1
+    assert 'broken.csv: failed' in capsys.readouterr().err
+    assert pd.read_parquet(inputs / 'out' / 'part0.parquet')['name'].tolist() == ['user0']
+    assert not (inputs / 'out' / 'broken.parquet').exists()
+
+def test_main_rejects_overwriting_inputs(inputs, capsys):
+    """Test that writing the outputs over the inputs is refused before any file is cleaned."""
+    status = main(['run', str(inputs / 'pipeline.json'), str(inputs / 'in' / 'part0.csv'), '--out', str(inputs / 'in')])
+    assert status == 2
+    assert 'overwrite' in capsys.readouterr().err
+
+def test_export_format():
+    """Test that output formats are inferred from extensions, including compressed ones."""
+    assert export_format('out/a.csv.gz') == 'csv'
+    assert export_format('out/a.jsonl') == 'jsonl'
+    assert export_format('out/a.arrow') == 'arrow'
+    assert export_format('out/a.parquet') == 'parquet'
+    with pytest.raises(ValueError):
+        export_format('out/a.txt')
+
+def test_output_paths_keep_dotted_names():
+    """Test that converting outputs only replaces the data and compression extensions of dotted names."""
+    outputs = output_paths(['in/sales.2023.csv', 'in/sales.2024.csv.gz', 'in/notes.v2'], 'out', 'parquet')
+    assert outputs == [os.path.join('out', name) for name in ('sales.2023.parquet', 'sales.2024.parquet', 'notes.v2.parquet')]
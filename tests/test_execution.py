@@ -0,0 +1,62 @@
+# tests/test_execution.py
+
+import pandas as pd
+import numpy as np
+import pytest
+from bamboochute.bamboo import Bamboo
+from bamboochute.pipelines import BambooPipeline
+from bamboochute.execution import column_stages
+
+@pytest.fixture
+def sample_data():
+    """Fixture to provide data with text, date and numeric columns."""
+    return pd.DataFrame({
+        'name': ['  Alice ', 'BOB', None, ' derek', 'eve '],
+        'city': ['Paris ', ' Rome', 'Oslo', None, 'Bern'],
+        'joined': ['2020-01-05', '2021-03-01', None, '2019-12-31', 'not a date'],
+        'age': [25, None, 35, 40, None],
+        'salary': [50000.0, 62000.0, None, 71000.0, 58000.0],
+    })
+
+@pytest.fixture
+def pipeline():
+    """Fixture to provide a pipeline of steps on disjoint columns around a row filter."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('trim_whitespace', columns=['name', 'city'])
+    pipeline.add_step('convert_to_datetime', columns=['joined'])
+    pipeline.add_step('impute_missing', strategy='mean', columns=['age'])
+    pipeline.add_step('extract_date_parts', column='joined', parts=['year', 'month'])
+    pipeline.add_step('standardize_case', case='upper', columns=['name'])
+    pipeline.add_step('drop_missing', subset=['name'])
+    pipeline.add_step('impute_missing', strategy='median', columns=['salary'])
+    pipeline.add_step('standardize_case', case='lower', columns=['city'])
+    return pipeline
+
+def test_column_stages(pipeline):
+    """Test grouping steps into independent column groups around steps that remove rows."""
+    stages = column_stages(pipeline.pipeline_steps)
+    assert stages[0] == (0, 5, [[0, 4], [1, 3], [2]])
+    assert stages[1] == (5, 6, None)
+    assert stages[2] == (6, 8, [[0], [1]])
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_parallel_matches_sequential(sample_data, pipeline, executor):
+    """Test that running independent steps concurrently gives the same data and change log."""
+    expected = pipeline.execute_pipeline(Bamboo(sample_data.copy()))
+    result = Bamboo(sample_data.copy()).configure_operation_log()
+    pipeline.execute_pipeline(result, parallel=True, executor=executor, workers=2)
+
+    pd.testing.assert_frame_equal(result.get_data(), expected.get_data())
+    assert result.show_change_log() == expected.show_change_log()
+    assert 'impute_missing' in result.get_operation_log()['method'].tolist()
+
+def test_parallel_with_data_dependent_columns(sample_data):
+    """Test that steps whose columns depend on the data run on the whole dataset."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('trim_whitespace')
+    pipeline.add_step('impute_missing', strategy='mean', columns=['age'])
+    assert [groups for _, _, groups in column_stages(pipeline.pipeline_steps)] == [None, None]
+
+    result = pipeline.execute_pipeline(Bamboo(sample_data.copy()), parallel=True)
+    assert result.get_data()['name'].tolist()[:2] == ['Alice', 'BOB']
+    assert not result.get_data()['age'].isnull().any()
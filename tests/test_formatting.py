@@ -109,4 +109,26 @@ def test_standardize_currency_format(special_char_data):
     assert bamboo.get_data()['salary'][3] == '$100,000.00'
     assert bamboo.get_data()['salary'][4] == '$70,000.00'
 
-    print(bamboo.get_data())
\ No newline at end of file
+    print(bamboo.get_data())
+
+def test_transform_strings_matches_individual_steps(sample_data, special_char_data):
+    """Test that fused string steps give the same data and change log as running them one by one."""
+    data = special_char_data.assign(mixed=['  A b ', 5, None, np.nan, 'X  y'])
+    steps = [
+        {'method_name': 'trim_whitespace', 'arguments': {}},
+        {'method_name': 'standardize_case', 'arguments': {'case': 'upper', 'columns': ['name', 'mixed']}},
+        {'method_name': 'remove_special_characters', 'arguments': {'columns': ['name']}},
+    ]
+    expected = Bamboo(data.copy())
+    for step in steps:
+        getattr(expected, step['method_name'])(**step['arguments'])
+
+    fused = Bamboo(data.copy()).transform_strings(steps)
+    pd.testing.assert_frame_equal(fused.get_data(), expected.get_data())
+    assert fused.show_change_log() == expected.show_change_log()
+
+def test_transform_strings_non_string_column(sample_data):
+    """Test that fused steps keep the errors of the individual steps on non-string columns."""
+    data = pd.DataFrame({'number': [1, 2, 3]})
+    with pytest.raises(AttributeError):
+        Bamboo(data).transform_strings([{'method_name': 'trim_whitespace', 'arguments': {'columns': ['number']}}])
@@ -0,0 +1,148 @@
+# tests/test_history.py
+
+import pandas as pd
+import numpy as np
+import pytest
+from bamboochute.bamboo import Bamboo
+from bamboochute.history import SnapshotHistory
+
+@pytest.fixture
+def sample_data():
+    """Fixture to provide a mixed-dtype dataset for history tests."""
+    n = 1000
+    return pd.DataFrame({
+        'id': np.arange(n),
+        'value': np.linspace(0, 1, n),
+        'group': pd.Categorical(np.where(np.arange(n) % 2, 'odd', 'even')),
+        'mixed': [1, 1.0, True, 'x', None] * (n // 5),
+        'count': pd.array(np.arange(n), dtype='Int64'),
+    })
+
+def test_unchanged_columns_are_shared(sample_data):
+    """Test that saving an unchanged frame does not copy its columns again."""
+    history = SnapshotHistory()
+    history.append(sample_data)
+    size = history.nbytes()
+    history.append(sample_data)
+
+    assert history.nbytes() == size
+    pd.testing.assert_frame_equal(history[1], sample_data)
+
+def test_few_changed_rows_store_a_patch(sample_data):
+    """Test that a column with a few changed rows is stored as a patch."""
+    history = SnapshotHistory()
+    history.append(sample_data)
+    size = history.nbytes()
+
+    changed = sample_data.copy()
+    changed.loc[3, 'value'] = -1.0
+    history.append(changed)
+
+    assert history.nbytes() - size < sample_data['value'].nbytes
+    pd.testing.assert_frame_equal(history[0], sample_data)
+    pd.testing.assert_frame_equal(history[1], changed)
+
+def test_filtered_rows_store_positions(sample_data):
+    """Test that filtering rows restores exactly, including categoricals and nullable integers."""
+    history = SnapshotHistory()
+    history.append(sample_data)
+    filtered = sample_data[sample_data['id'] % 3 == 0].iloc[::-1]
+    history.append(filtered)
+
+    pd.testing.assert_frame_equal(history[1], filtered)
+    assert history.pop().equals(filtered)
+    pd.testing.assert_frame_equal(history[0], sample_data)
+
+def test_object_values_keep_their_type(sample_data):
+    """Test that values comparing equal but of different types are not mixed up."""
+    history = SnapshotHistory()
+    history.append(sample_data)
+    changed = sample_data.copy()
+    changed['mixed'] = changed['mixed'].replace({True: 'yes'})
+    changed.loc[0, 'mixed'] = 1.0
+    history.append(changed)
+
+    restored = history[1]['mixed'].tolist()
+    assert [type(value) for value in restored] == [type(value) for value in changed['mixed']]
+    assert [type(value) for value in history[0]['mixed']] == [type(value) for value in sample_data['mixed']]
+
+def test_restored_frame_is_independent(sample_data):
+    """Test that mutating a restored frame does not corrupt the history."""
+    history = SnapshotHistory()
+    history.append(sample_data)
+    restored = history[0]
+    restored.loc[0, 'value'] = 99.0
+
+    assert history[0].loc[0, 'value'] == 0.0
+
+def test_dtype_change_copies_column(sample_data):
+    """Test that a column whose dtype changed is stored in full and restored exactly."""
+    history = SnapshotHistory()
+    history.append(sample_data)
+    changed = sample_data.assign(id=sample_data['id'].astype('float32'), extra=1)
+    history.append(changed)
+
+    pd.testing.assert_frame_equal(history.pop(), changed)
+    pd.testing.assert_frame_equal(history.pop(), sample_data)
+    assert len(history) == 0
+
+def test_pop_too_many_steps(sample_data):
+    """Test that popping more snapshots than saved is rejected."""
+    history = SnapshotHistory()
+    history.append(sample_data)
+    with pytest.raises(IndexError):
+        history.pop(2)
+
+def test_bamboo_undo_and_reset(sample_data):
+    """Test undo and reset through Bamboo with the delta history."""
+    bamboo = Bamboo(sample_data.copy())
+    bamboo.save_state()
+    bamboo.data.loc[5, 'value'] = np.nan
+    bamboo.save_state()
+    bamboo.data = bamboo.data.iloc[:10]
+    bamboo.save_state()
+    bamboo.data = bamboo.data.drop(columns=['mixed'])
+
+    bamboo.undo(2)
+    assert len(bamboo.get_data()) == 1000
+    assert np.isnan(bamboo.get_data().loc[5, 'value'])
+
+    bamboo.reset_data()
+    pd.testing.assert_frame_equal(bamboo.get_data(), sample_data)
+    with pytest.raises(ValueError):
+        bamboo.undo()
+
+def test_spill_over_budget(sample_data, tmp_path):
+    """Test that older snapshots spill to disk over budget and restore exactly."""
+    history = SnapshotHistory(max_bytes=0, spill_dir=str(tmp_path))
+    history.append(sample_data)
+    changed = sample_data.assign(value=-sample_data['value'], mixed='y', count=sample_data['count'] + 1)
+    history.append(changed)
+
+    assert history.disk_bytes() > 0
+    assert len(list(tmp_path.iterdir())) == 3
+    pd.testing.assert_frame_equal(history[0], sample_data)
+    pd.testing.assert_frame_equal(history.pop(), changed)
+    pd.testing.assert_frame_equal(history.pop(), sample_data)
+    assert list(tmp_path.iterdir()) == []
+
+def test_keep_original_and_last_snapshots(sample_data):
+    """Test evicting intermediate snapshots while keeping the original one."""
+    history = SnapshotHistory(max_snapshots=2)
+    for i in range(5):
+        history.append(sample_data.assign(id=sample_data['id'] + i))
+
+    assert len(history) == 3
+    assert [history[i]['id'].iloc[0] for i in range(3)] == [0, 3, 4]
+
+def test_bamboo_configure_history(sample_data, tmp_path):
+    """Test bounding the history of a Bamboo instance."""
+    bamboo = Bamboo(sample_data.copy()).configure_history(max_bytes=0, max_snapshots=1, spill_dir=str(tmp_path))
+    for i in range(3):
+        bamboo.save_state()
+        bamboo.data = bamboo.data.assign(value=bamboo.data['value'] + 1)
+
+    with pytest.raises(ValueError):
+        bamboo.undo(3)
+    bamboo.reset_data()
+    pd.testing.assert_frame_equal(bamboo.get_data(), sample_data)
@@ -0,0 +1,118 @@
+# tests/test_lazy.py
+
+import ast
+import inspect
+import textwrap
+import pandas as pd
+import pytest
+from bamboochute.bamboo import Bamboo
+from bamboochute.lazy import LazyBamboo
+
+@pytest.fixture
+def sample_data():
+    """Fixture to provide sample data for lazy Bamboo tests."""
+    return pd.DataFrame({
+        'name': ['  Alice ', 'Bob', None, ' derek', 'eve '],
+        'age': [25.0, None, 35.0, 40.0, None],
+        'joined': ['2021-01-05', '2022-03-10', '2020-07-15', '2023-11-30', '2021-06-01'],
+        'notes': ['a', 'b', 'c', 'd', 'e'],
+        'comments': ['x', 'y', 'z', 'w', 'v'],
+    })
+
+def _clean(bamboo):
+    return (bamboo.trim_whitespace(columns=['name'])
+                  .impute_missing(strategy='mean', columns=['age'])
+                  .convert_to_datetime(columns=['joined'])
+                  .extract_date_parts('joined', parts=['year'])
+                  .drop_columns(['notes', 'joined_year', 'comments']))
+
+def test_lazy_matches_eager(sample_data):
+    """Test that the lazy Bamboo records calls and produces the same data as running them eagerly."""
+    lazy = _clean(Bamboo.lazy(sample_data.copy()))
+    assert isinstance(lazy, LazyBamboo)
+    assert len(lazy.plan) == 5
+
+    eager = _clean(Bamboo(sample_data.copy())).get_data()
+    pd.testing.assert_frame_equal(lazy.collect().get_data(), eager)
+
+def test_lazy_skips_dead_steps_and_columns(tmp_path, sample_data):
+    """Test that columns only dropped are not loaded and steps writing only dropped columns are skipped."""
+    filepath = tmp_path / 'people.csv'
+    sample_data.to_csv(filepath, index=False)
+    lazy = _clean(Bamboo.lazy(str(filepath)))
+
+    explanation = lazy.explain()
+    assert "Load: ['name', 'age', 'joined']" in explanation
+    assert 'extract_date_parts' not in explanation.split('Rewrites')[0]
+
+    result = lazy.collect().get_data()
+    assert list(result.columns) == ['name', 'age', 'joined']
+    assert result['age'].isna().sum() == 0
+    assert [step['method_name'] for step in lazy.plan][-1] == 'drop_columns'
+
+def test_lazy_prunes_parquet_columns(tmp_path, sample_data):
+    """Test that a Parquet source is read with only the needed columns."""
+    filepath = tmp_path / 'people.parquet'
+    sample_data.to_parquet(filepath)
+    lazy = Bamboo.lazy(str(filepath)).drop_columns(['notes', 'comments']).drop_missing(subset=['age'])
+
+    assert lazy.explain().startswith("Load: ['name', 'age', 'joined']")
+    assert list(lazy.collect().get_data().columns) == ['name', 'age', 'joined']
+
+def test_lazy_report_runs_plan(sample_data):
+    """Test that report methods run the plan and return their result, binding positional arguments."""
+    lazy = Bamboo.lazy(sample_data).drop_missing(0, 'any', None, ['age'])
+    assert lazy.plan[0]['arguments'] == {'axis': 0, 'how': 'any', 'thresh': None, 'subset': ['age']}
+
+    report = lazy.missing_data_report()
+    assert report['missing_count'].sum() == 1
+
+def test_lazy_detectors_return_results(sample_data):
+    """Test that detectors and other methods returning results run the plan instead of being recorded."""
+    data = sample_data.assign(score=[1.0, 2.0, 1.5, 2.5, 40.0])
+    lazy = Bamboo.lazy(data.copy()).drop_missing(subset=['name'])
+
+    flagged = lazy.detect_outliers_iqr(columns=['score'])
+    expected = Bamboo(data.copy()).drop_missing(subset=['name']).detect_outliers_iqr(columns=['score'])
+    pd.testing.assert_frame_equal(flagged, expected)
+    assert lazy.custom_validation('age', lambda age: (age.dropna() > 0).all()) is True
+    assert len(lazy.plan) == 1
+
+def test_lazy_reuses_result_until_plan_changes(sample_data, monkeypatch):
+    """Test that eager methods share one run of the plan until another step is recorded."""
+    runs = []
+    collect = LazyBamboo.collect
+    monkeypatch.setattr(LazyBamboo, 'collect', lambda self: runs.append(1) or collect(self))
+    lazy = Bamboo.lazy(sample_data.copy()).drop_missing(subset=['age'])
+
+    lazy.missing_data_report()
+    lazy.basic_summary()
+    assert len(runs) == 1
+    assert len(lazy.trim_whitespace(columns=['name']).get_data()) == 3
+    assert len(runs) == 2
+
+def test_eager_methods_are_marked():
+    """Test that every Bamboo method returning something other than the instance, or writing it out, is marked eager."""
+    def returns_self(function):
+        returns, nodes = [], list(ast.iter_child_nodes(ast.parse(textwrap.dedent(inspect.getsource(function))).body[0]))
+        while nodes:
+            node = nodes.pop()
+            if isinstance(node, ast.Return):
+                returns.append(node)
+            elif not isinstance(node, (ast.FunctionDef, ast.Lambda)):
+                nodes.extend(ast.iter_child_nodes(node))
+        return bool(returns) and all(isinstance(node.value, ast.Name) and node.value.id == 'self' for node in returns)
+
+    for name, method in vars(Bamboo).items():
+        if name.startswith('_') or name == 'log_changes' or not inspect.isfunction(method):
+            continue
+        expected = name in ('export_data', 'export_operation_log') or not returns_self(inspect.unwrap(method))
+        assert getattr(method, 'eager', False) == expected, name
+
+def test_lazy_rejects_unknown_methods(sample_data):
+    """Test that unknown methods raise an AttributeError."""
+    lazy = Bamboo.lazy(sample_data)
+    with pytest.raises(AttributeError):
+        lazy.not_a_method()
+    with pytest.raises(TypeError):
+        lazy.drop_missing(unknown=True)
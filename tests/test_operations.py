@@ -0,0 +1,107 @@
+# tests/test_operations.py
+
+import json
+import logging
+import pandas as pd
+import pytest
+from bamboochute.bamboo import Bamboo
+from bamboochute.settings.log import set_timing
+from bamboochute.utils import get_timings, reset_timings
+
+@pytest.fixture
+def sample_data():
+    """Fixture to provide sample data for operation log tests."""
+    return pd.DataFrame({
+        'age': [25, None, 35, 40],
+        'name': [' Alice ', 'Bob', None, 'Derek']
+    })
+
+def test_operation_records(sample_data):
+    """Test that each operation is recorded with its arguments, timings and data deltas."""
+    bamboo = Bamboo(sample_data).configure_operation_log()
+    bamboo.drop_missing(subset=['age']).trim_whitespace(columns=['name'])
+
+    log = bamboo.get_operation_log()
+    assert log['method'].tolist() == ['drop_missing', 'trim_whitespace']
+    assert log.loc[0, 'args'] == "subset=['age']"
+    assert (log.loc[0, 'rows_before'], log.loc[0, 'rows_after']) == (4, 3)
+    assert log.loc[0, 'bytes_after'] < log.loc[0, 'bytes_before']
+    assert (log['wall_time'] >= 0).all() and (log['cpu_time'] >= 0).all()
+    assert (log['status'] == 'ok').all()
+
+def test_nested_calls_are_not_recorded(sample_data):
+    """Test that methods called inside an operation, like log_changes, are part of that operation."""
+    bamboo = Bamboo(sample_data).configure_operation_log()
+    bamboo.save_state()
+    bamboo.impute_missing(strategy='mean', columns=['age'])
+    bamboo.undo()
+
+    assert bamboo.get_operation_log()['method'].tolist() == ['save_state', 'impute_missing', 'undo']
+
+def test_failed_operation_is_recorded(sample_data):
+    """Test that failing operations are recorded with an error status."""
+    bamboo = Bamboo(sample_data).configure_operation_log()
+    with pytest.raises(ValueError):
+        bamboo.undo()
+    assert bamboo.get_operation_log(format='records')[-1]['status'] == 'error'
+
+def test_operation_log_is_bounded(sample_data, tmp_path):
+    """Test the ring buffer size and exporting the records to JSON."""
+    bamboo = Bamboo(sample_data).configure_operation_log(maxlen=2)
+    for _ in range(5):
+        bamboo.get_data()
+    assert len(bamboo.get_operation_log()) == 2
+
+    path = str(tmp_path / 'operations.json')
+    bamboo.export_operation_log(path)
+    with open(path) as file:
+        assert [record['method'] for record in json.load(file)] == ['get_data', 'get_data']
+
+    bamboo.configure_operation_log(maxlen=0).get_data()
+    assert bamboo.get_operation_log().empty
+
+def test_operation_log_is_off_by_default(sample_data):
+    """Test that operations are only recorded once the operation log is configured."""
+    bamboo = Bamboo(sample_data)
+    bamboo.drop_missing(subset=['age'])
+    assert bamboo.get_operation_log().empty
+
+def test_disabled_instrumentation_is_skipped(sample_data, monkeypatch):
+    """Test that with logging, timing and the operation log off, a method runs without looking up settings or recording."""
+    def fail(*args, **kwargs):
+        raise AssertionError("instrumentation should be skipped")
+
+    bamboo = Bamboo(sample_data, sys_log=False)
+    monkeypatch.setattr('bamboochute.utils.is_logging_enabled', fail)
+    monkeypatch.setattr('bamboochute.utils._instrumented', fail)
+    bamboo.drop_missing(subset=['age']).get_data()
+
+    assert bamboo._operations is None
+    assert bamboo.get_operation_log().empty
+
+def test_logging_uses_library_logger(sample_data, caplog):
+    """Test that log records go to the 'bamboochute' logger at the host's configured level."""
+    with caplog.at_level(logging.INFO, logger='bamboochute'):
+        Bamboo(sample_data).get_data()
+    assert any(record.name == 'bamboochute' and 'get_data' in record.getMessage() for record in caplog.records)
+
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger='bamboochute'):
+        Bamboo(sample_data).get_data()
+    assert not caplog.records
+
+def test_timing_histograms(sample_data):
+    """Test recording per-method duration histograms."""
+    reset_timings()
+    set_timing(True)
+    try:
+        bamboo = Bamboo(sample_data, sys_log=False)
+        for _ in range(3):
+            bamboo.get_data()
+    finally:
+        set_timing(False)
+
+    timings = get_timings()
+    assert timings.loc[timings['method'] == 'get_data', 'count'].sum() == 3
+    bamboo.get_data()
+    assert get_timings().loc[get_timings()['method'] == 'get_data', 'count'].sum() == 3
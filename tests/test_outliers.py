@@ -33,6 +33,12 @@ def test_detect_outliers_iqr(sample_data):
     assert outliers['salary'].sum() > 0
     print(outliers)
 
+def test_detect_outliers_iqr_without_numeric_columns():
+    """Test that IQR outlier detection on data without numeric columns flags nothing."""
+    outliers = Bamboo(pd.DataFrame({'name': ['a', 'b']})).detect_outliers_iqr()
+    assert outliers.empty
+    assert outliers.index.tolist() == [0, 1]
+
 def test_detect_outliers_isolation_forest(sample_data):
     """Test Isolation Forest outlier detection."""
     bamboo = Bamboo(sample_data)
@@ -1,4 +1,5 @@
 # tests/test_pipelines.py
+import asyncio
 import pytest
 from bamboochute.pipelines import BambooPipeline
 from bamboochute.bamboo import Bamboo
@@ -75,4 +76,214 @@ def test_complex_cleaning_pipeline(complex_sample_data):
     # One-hot encoding: 'gender' should be replaced with one-hot encoded columns
     # Ensure that both 'gender_f' and 'gender_m' are present after encoding
     assert 'gender_m' in bamboo.get_data().columns
-    assert 'gender_f' in bamboo.get_data().columns
\ No newline at end of file
+    assert 'gender_f' in bamboo.get_data().columns
+
+def test_aexecute_pipeline(sample_data):
+    """Test executing a pipeline from a coroutine while another dataset loads."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('impute_missing', strategy='mean')
+    pipeline.add_step('trim_whitespace')
+
+    async def run():
+        prefetch = asyncio.ensure_future(Bamboo.aload(sample_data.copy()))
+        cleaned = await pipeline.aexecute_pipeline(Bamboo(sample_data))
+        return cleaned, await prefetch
+
+    cleaned, prefetched = asyncio.run(run())
+    assert not cleaned.get_data()['age'].isnull().any()
+    assert prefetched.get_data()['age'].isnull().any()
+
+def test_resume_from_checkpoint(sample_data, tmp_path, monkeypatch):
+    """Test that a failed run resumes from its last checkpoint instead of the input data."""
+    checkpoint_dir = str(tmp_path / 'checkpoints')
+    pipeline = BambooPipeline()
+    pipeline.add_step('impute_missing', strategy='mean')
+    pipeline.add_step('trim_whitespace')
+    pipeline.add_step('standardize_case', case='upper')
+
+    def fail(self, *args, **kwargs):
+        raise RuntimeError("killed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Bamboo, 'standardize_case', fail)
+        with pytest.raises(RuntimeError):
+            pipeline.execute_pipeline(Bamboo(sample_data.copy()), checkpoint_dir=checkpoint_dir, checkpoint_steps=[1])
+
+    # A run on other input data must not be replaced by the checkpointed data
+    with pytest.raises(ValueError):
+        pipeline.execute_pipeline(Bamboo(sample_data.iloc[:0]), checkpoint_dir=checkpoint_dir)
+
+    # The input is untouched raw data; the completed steps are restored from the checkpoint
+    bamboo = pipeline.execute_pipeline(Bamboo(sample_data.copy()), checkpoint_dir=checkpoint_dir)
+    assert bamboo.get_data()['name'].tolist() == ['ALICE', 'BOB', 'CHARLIE', 'DEREK']
+    assert not bamboo.get_data()['age'].isnull().any()
+    assert list((tmp_path / 'checkpoints').iterdir()) == []
+
+def test_checkpoint_of_other_pipeline_is_ignored(sample_data, tmp_path):
+    """Test that checkpoints written by a different pipeline are not resumed."""
+    checkpoint_dir = str(tmp_path)
+    first = BambooPipeline()
+    first.add_step('trim_whitespace')
+    first.add_step('standardize_case', case='upper')
+    first._write_checkpoint(Bamboo(sample_data.iloc[:1]), checkpoint_dir, 1, first.fingerprint(), None)
+
+    second = BambooPipeline()
+    second.add_step('trim_whitespace')
+    second.add_step('standardize_case', case='lower')
+    bamboo = second.execute_pipeline(Bamboo(sample_data), checkpoint_dir=checkpoint_dir)
+    assert len(bamboo.get_data()) == 4
+
+    bamboo = first.execute_pipeline(Bamboo(sample_data), checkpoint_dir=checkpoint_dir, resume=False)
+    assert len(bamboo.get_data()) == 4
+
+@pytest.fixture
+def batches():
+    """Fixture to provide a training batch and a new batch with different statistics."""
+    train = pd.DataFrame({
+        'value': [1.0, 2.0, None, 3.0, 100.0, 2.5, 1.5, 2.0],
+        'city': ['Paris', 'Rome', 'Paris', None, 'Oslo', 'Paris', 'Rome', 'Paris'],
+    })
+    new = pd.DataFrame({
+        'value': [50.0, None, 60.0],
+        'city': ['Rome', None, 'Paris'],
+    })
+    return train, new
+
+@pytest.fixture
+def fit_pipeline():
+    """Fixture to provide a pipeline whose steps learn statistics from the data."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('impute_missing', strategy='median')
+    pipeline.add_step('convert_to_categorical', columns=['city'])
+    pipeline.add_step('encode_categorical', columns=['city'], method='label')
+    pipeline.add_step('remove_outliers', method='iqr', columns=['value'])
+    return pipeline
+
+def test_fit_transform(batches, fit_pipeline):
+    """Test that transform applies the statistics learned by fit instead of recomputing them."""
+    train, new = batches
+    fitted = Bamboo(train.copy())
+    fit_pipeline.fit(fitted)
+    pd.testing.assert_frame_equal(fitted.get_data(), fit_pipeline.execute_pipeline(Bamboo(train.copy())).get_data())
+
+    result = fit_pipeline.transform(Bamboo(new.copy())).get_data()
+    # The median, the label of each city and the IQR bounds all come from the training batch
+    assert result['value'].tolist() == [2.0]
+    assert result['city'].tolist() == [1]
+
+def test_save_and_load_fitted_state(batches, fit_pipeline, tmp_path):
+    """Test persisting the fitted state and rejecting it for other pipeline steps."""
+    train, new = batches
+    path = str(tmp_path / 'state.pkl')
+    fit_pipeline.fit(Bamboo(train.copy())).save_fitted_state(path)
+
+    loaded = BambooPipeline()
+    loaded.pipeline_steps = list(fit_pipeline.pipeline_steps)
+    result = loaded.load_fitted_state(path).transform(Bamboo(new.copy()))
+    pd.testing.assert_frame_equal(result.get_data(), fit_pipeline.transform(Bamboo(new.copy())).get_data())
+
+    loaded.add_step('drop_duplicates')
+    with pytest.raises(ValueError):
+        loaded.load_fitted_state(path)
+    with pytest.raises(ValueError):
+        BambooPipeline().transform(Bamboo(new.copy()))
+
+def test_append_incrementally():
+    """Test cleaning only appended rows with running statistics and a key index for duplicates."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('trim_whitespace', columns=['city'])
+    pipeline.add_step('drop_duplicates', subset=['id'])
+    pipeline.add_step('impute_missing', strategy='mean', columns=['value'])
+
+    cleaned = Bamboo(pd.DataFrame({'id': [1, 2, 2], 'city': [' Paris', 'Rome ', 'Rome'], 'value': [1.0, 3.0, 5.0]}))
+    pipeline.fit(cleaned, incremental=True)
+    new_rows = pd.DataFrame({'id': [2, 3, 4, 4], 'city': ['Oslo', ' Bern', 'Nice', 'Nice'], 'value': [7.0, None, 8.0, 9.0]},
+                            index=[3, 4, 5, 6])
+    pipeline.append(cleaned, new_rows)
+
+    data = cleaned.get_data()
+    assert data['id'].tolist() == [1, 2, 3, 4]
+    assert data['city'].tolist() == ['Paris', 'Rome', 'Bern', 'Nice']
+    # The mean covers the rows kept before (1, 3) and the new rows (8)
+    assert data.index.tolist() == [0, 1, 2, 3]
+    assert data.loc[2, 'value'] == 4.0
+    assert "Appended 2 incrementally cleaned row(s)." in cleaned._change_log
+
+    pipeline.append(cleaned, pd.DataFrame({'id': [3, 5], 'city': ['Bern', 'Lyon'], 'value': [float('nan')] * 2}, index=[7, 8]))
+    assert cleaned.get_data()['id'].tolist() == [1, 2, 3, 4, 5]
+    assert cleaned.get_data().index.is_unique
+    assert cleaned.get_data().loc[4, 'value'] == 4.0
+
+def test_append_matches_duplicates_across_dtypes():
+    """Test that appended keys are hashed with the fitted dtypes, so 2 matches 2.0, and keys are only kept incrementally."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('drop_duplicates', subset=['id'])
+    pipeline.fit(Bamboo(pd.DataFrame({'id': [1.0, 2.0]})))
+    assert 'keys' not in pipeline.fitted_state
+
+    cleaned = Bamboo(pd.DataFrame({'id': [1.0, 2.0, None]}))
+    pipeline.fit(cleaned, incremental=True)
+    pipeline.append(cleaned, pd.DataFrame({'id': [2, 3]}))
+    assert cleaned.get_data()['id'].tolist()[3:] == [3.0]
+    pipeline.append(cleaned, pd.DataFrame({'id': [3.5, None]}))
+    assert cleaned.get_data()['id'].tolist()[4:] == [3.5]
+
+def test_append_rejects_reused_labels():
+    """Test that appending to data with a non-integer index refuses new rows reusing its labels."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('impute_missing', strategy='mean')
+    cleaned = Bamboo(pd.DataFrame({'value': [1.0, None]}, index=['a', 'b']))
+    pipeline.fit(cleaned, incremental=True)
+    state = pipeline.fitted_state
+
+    with pytest.raises(ValueError):
+        pipeline.append(cleaned, pd.DataFrame({'value': [2.0]}, index=['b']))
+    assert pipeline.fitted_state is state
+    pipeline.append(cleaned, pd.DataFrame({'value': [float('nan')]}, index=['c']))
+    assert cleaned.get_data()['value'].tolist() == [1.0, 1.0, 1.0]
+
+def test_append_keeps_one_running_aggregate():
+    """Test that only incremental fits keep running aggregates, folded into one per step across appends."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('impute_missing', strategy='mean', columns=['value'])
+    pipeline.add_step('remove_outliers', method='zscore', columns=['value'])
+    data = pd.DataFrame({'value': [1.0, 2.0, None, 3.0]})
+
+    pipeline.fit(Bamboo(data.copy()))
+    assert set(pipeline.fitted_state) == {'fingerprint', 'states'}
+    with pytest.raises(ValueError):
+        pipeline.append(Bamboo(data.copy()), data.copy())
+
+    cleaned = Bamboo(data.copy())
+    pipeline.fit(cleaned, incremental=True)
+    for i in range(3):
+        pipeline.append(cleaned, pd.DataFrame({'value': [float(i), None]}, index=[4 + 2 * i, 5 + 2 * i]))
+    count, mean, _ = pipeline.fitted_state['partials'][1]
+    assert count['value'] == 10
+    assert pipeline.fitted_state['partials'][0][0][0]['value'] == pytest.approx(9.0)
+    assert mean['value'] == pytest.approx(cleaned.get_data()['value'].mean())
+
+def test_append_keeps_label_codes():
+    """Test that appending keeps the fitted label encoding and rejects labels it has not seen."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('convert_to_categorical', columns=['city'])
+    pipeline.add_step('encode_categorical', method='label', columns=['city'])
+    cleaned = Bamboo(pd.DataFrame({'city': ['b', 'c', 'b']}))
+    pipeline.fit(cleaned, incremental=True)
+
+    pipeline.append(cleaned, pd.DataFrame({'city': ['c', 'b']}, index=[3, 4]))
+    assert cleaned.get_data()['city'].tolist() == [0, 1, 0, 1, 0]
+    state = pipeline.fitted_state
+    with pytest.raises(ValueError):
+        pipeline.append(cleaned, pd.DataFrame({'city': ['a', 'b']}, index=[5, 6]))
+    assert pipeline.fitted_state is state
+    assert len(cleaned.get_data()) == 5
+
+def test_append_rejects_steps_needing_all_rows():
+    """Test that steps which need all rows cannot run incrementally."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('drop_duplicates', keep='last')
+    data = pd.DataFrame({'id': [1, 2]})
+    pipeline.fit(Bamboo(data.copy()), incremental=True)
+    with pytest.raises(ValueError):
+        pipeline.append(Bamboo(data.copy()), data.copy())
@@ -0,0 +1,123 @@
+# tests/test_planning.py
+
+import pandas as pd
+import numpy as np
+import pytest
+from bamboochute.bamboo import Bamboo
+from bamboochute.pipelines import BambooPipeline
+from bamboochute.planning import optimize_steps, step_spec
+
+@pytest.fixture
+def sample_data():
+    """Fixture to provide sample data for pipeline planning tests."""
+    return pd.DataFrame({
+        'name': ['  Alice ', 'BOB!', None, ' derek', 'BOB!', 'eve '],
+        'city': ['Paris ', ' Rome', 'Oslo', None, ' Rome', 'Bern'],
+        'age': [25, None, 35, 40, None, 29],
+        'notes': ['a', 'b', 'c', 'd', 'b', 'f'],
+    })
+
+def _names(steps):
+    return [step['method_name'] for step in steps]
+
+def test_filters_move_ahead_of_row_wise_steps():
+    """Test that row filters move ahead of transforms on other columns, but not past readers of their columns."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('trim_whitespace', columns=['name'])
+    pipeline.add_step('standardize_currency_format', columns=['age'])
+    pipeline.add_step('drop_missing', subset=['city'])
+    pipeline.add_step('drop_duplicates', subset=['name'])
+
+    steps, rewrites = optimize_steps(pipeline.pipeline_steps)
+    assert _names(steps) == ['drop_missing', 'trim_whitespace', 'drop_duplicates', 'standardize_currency_format']
+    assert len(rewrites) == 2
+
+def test_filters_do_not_cross_aggregates_or_unknown_columns():
+    """Test that filters stay behind aggregates and steps whose columns depend on the data."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('impute_missing', strategy='mean', columns=['age'])
+    pipeline.add_step('drop_missing', subset=['name'])
+    pipeline.add_step('trim_whitespace')
+    pipeline.add_step('drop_missing', subset=['city'])
+
+    steps, rewrites = optimize_steps(pipeline.pipeline_steps)
+    assert steps == pipeline.pipeline_steps
+    assert rewrites == []
+
+def test_dead_columns_are_removed():
+    """Test that work on columns dropped later is removed."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('standardize_case', case='lower', columns=['name', 'notes'])
+    pipeline.add_step('convert_to_datetime', columns=['notes'])
+    pipeline.add_step('drop_columns', columns=['notes'])
+
+    steps, _ = optimize_steps(pipeline.pipeline_steps)
+    assert steps == [{'method_name': 'standardize_case', 'arguments': {'case': 'lower', 'columns': ['name']}},
+                     {'method_name': 'drop_columns', 'arguments': {'columns': ['notes']}}]
+
+def test_string_steps_are_fused():
+    """Test that consecutive string steps become one transform_strings step."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('trim_whitespace', columns=['name'])
+    pipeline.add_step('standardize_case', case='upper', columns=['name', 'city'])
+    pipeline.add_step('impute_missing', strategy='mean', columns=['age'])
+
+    steps, _ = optimize_steps(pipeline.pipeline_steps)
+    assert _names(steps) == ['transform_strings', 'impute_missing']
+    assert step_spec(steps[0])['writes'] == {'name', 'city'}
+
+def test_optimized_pipeline_gives_same_result(sample_data):
+    """Test that the optimized plan produces the same data as the original order."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('trim_whitespace', columns=['name', 'city', 'notes'])
+    pipeline.add_step('standardize_case', case='title', columns=['name', 'city', 'notes'])
+    pipeline.add_step('remove_special_characters', columns=['name'])
+    pipeline.add_step('drop_missing', subset=['age'])
+    pipeline.add_step('drop_duplicates', subset=['age', 'notes'])
+    pipeline.add_step('drop_columns', columns=['notes'])
+
+    expected = pipeline.execute_pipeline(Bamboo(sample_data.copy())).get_data()
+    optimized = pipeline.execute_pipeline(Bamboo(sample_data.copy()), optimize=True).get_data()
+    pd.testing.assert_frame_equal(optimized, expected)
+
+    plan = pipeline.explain()
+    assert plan.splitlines()[0].startswith('1. drop_missing(')
+    assert 'Fused' in plan
+    assert pipeline.optimize().pipeline_steps[0]['method_name'] == 'drop_missing'
+
+@pytest.mark.parametrize('method, arguments, data', [
+    ('convert_column_types', {'column_type_dict': {'c': 'numeric'}},
+     {'k': [1.0, 2.0, None], 'c': ['1', '2', '2.5']}),
+    ('convert_to_datetime', {'columns': ['d']},
+     {'k': [None, 1.0, 2.0], 'd': ['13/01/2020', '01/02/2020', '03/04/2020']}),
+])
+@pytest.mark.filterwarnings('ignore:Parsing dates')
+def test_filters_do_not_cross_type_inference(method, arguments, data):
+    """Test that row filters stay behind steps whose dtype or format is inferred from all rows."""
+    pipeline = BambooPipeline()
+    pipeline.add_step(method, **arguments)
+    pipeline.add_step('drop_missing', subset=['k'])
+
+    steps, rewrites = optimize_steps(pipeline.pipeline_steps)
+    assert _names(steps) == [method, 'drop_missing'] and rewrites == []
+
+    expected = pipeline.execute_pipeline(Bamboo(pd.DataFrame(data))).get_data()
+    optimized = pipeline.execute_pipeline(Bamboo(pd.DataFrame(data)), optimize=True).get_data()
+    pd.testing.assert_frame_equal(optimized, expected)
+
+def test_steps_creating_dropped_columns_removed_when_columns_known():
+    """Test that a step creating only dropped columns is removed, with its columns, when the starting columns are known."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('extract_date_parts', column='joined', parts=['year'])
+    pipeline.add_step('drop_columns', columns=['joined_year', 'notes'])
+
+    steps, _ = optimize_steps(pipeline.pipeline_steps)
+    assert _names(steps) == ['extract_date_parts', 'drop_columns']
+
+    steps, rewrites = optimize_steps(pipeline.pipeline_steps, columns=['joined', 'notes'])
+    assert steps == [{'method_name': 'drop_columns', 'arguments': {'columns': ['notes']}}]
+    assert len(rewrites) == 1
+
+    # An existing column is overwritten, so the step is kept
+    steps, _ = optimize_steps(pipeline.pipeline_steps, columns=['joined', 'joined_year', 'notes'])
+    assert _names(steps) == ['extract_date_parts', 'drop_columns']
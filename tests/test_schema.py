@@ -0,0 +1,77 @@
+# tests/test_schema.py
+
+import pandas as pd
+import numpy as np
+import pytest
+from bamboochute.bamboo import Bamboo
+from bamboochute.schema import infer_schema, compact_dtypes, load_schema
+
+@pytest.fixture
+def sample_data():
+    """Fixture to provide wide-typed sample data for schema inference tests."""
+    return pd.DataFrame({
+        'small_int': [1, 2, 3, 4, 5, 6],
+        'big_int': [1, 2, 3, 4, 5, 10_000_000_000],
+        'ratio': [0.5, 0.25, 1.5, 2.0, None, 3.0],
+        'city': ['NY', 'LA', 'NY', 'LA', 'NY', 'SF'],
+        'name': ['Alice', 'Bob', 'Cara', 'Dan', 'Eve', 'Fay'],
+        'active': [True, False, None, True, True, False]
+    })
+
+def test_infer_schema(sample_data):
+    """Test inferring the narrowest dtype for each column."""
+    schema = infer_schema(sample_data)
+
+    assert schema['small_int'] == 'int8'
+    assert schema['big_int'] == 'int64'
+    assert schema['ratio'] == 'float32'
+    assert schema['city'] == 'category'
+    assert schema['name'] == 'object'
+    assert schema['active'] == 'boolean'
+
+def test_compact_dtypes_reduces_memory(sample_data):
+    """Test that compacting dtypes keeps values and reduces memory."""
+    compacted = compact_dtypes(sample_data)
+
+    assert compacted.memory_usage(deep=True).sum() < sample_data.memory_usage(deep=True).sum()
+    assert compacted['small_int'].tolist() == sample_data['small_int'].tolist()
+    assert compacted['active'].isna().sum() == 1
+
+def test_compact_dtypes_keeps_float_precision():
+    """Test that floats are only downcast to float32 when no value is rounded."""
+    data = pd.DataFrame({'exact': [0.5, 1.25, None], 'precise': [0.1, 1.25, None], 'huge': [1e300, 1.0, 2.0]})
+    schema = infer_schema(data)
+    assert schema == {'exact': 'float32', 'precise': 'float64', 'huge': 'float64'}
+    pd.testing.assert_series_equal(compact_dtypes(data)['precise'], data['precise'])
+
+def test_infer_schema_on_csv_load(sample_data, tmp_path):
+    """Test loading a CSV file with schema inference."""
+    path = str(tmp_path / 'sample.csv')
+    sample_data.to_csv(path, index=False)
+
+    bamboo = Bamboo(path, infer_schema=True)
+    dtypes = bamboo.get_data().dtypes
+
+    assert dtypes['small_int'] == np.int8
+    assert isinstance(dtypes['city'], pd.CategoricalDtype)
+    assert str(dtypes['active']) == 'boolean'
+    assert bamboo.get_data()['big_int'].max() == 10_000_000_000
+
+def test_saved_schema_is_reused(sample_data, tmp_path):
+    """Test saving an inferred schema and applying it on a later load."""
+    path = str(tmp_path / 'sample.csv')
+    schema_path = str(tmp_path / 'schema.json')
+    sample_data.to_csv(path, index=False)
+
+    Bamboo(path, infer_schema=True).save_schema(schema_path)
+    assert load_schema(schema_path)['small_int'] == 'int8'
+
+    bamboo = Bamboo(path, schema=schema_path)
+    assert bamboo.get_data()['small_int'].dtype == np.int8
+    assert isinstance(bamboo.get_data()['city'].dtype, pd.CategoricalDtype)
+
+def test_imputation_on_compacted_data(sample_data):
+    """Test that cleaning methods work on compacted dtypes."""
+    bamboo = Bamboo(sample_data, infer_schema=True)
+    bamboo.impute_missing(strategy='mean', columns=['ratio'])
+    assert bamboo.get_data()['ratio'].isnull().sum() == 0
@@ -0,0 +1,75 @@
+# tests/test_settings.py
+
+import asyncio
+import logging
+import threading
+import pandas as pd
+import pytest
+from bamboochute.bamboo import Bamboo
+from bamboochute.settings.log import is_logging_enabled, logging_context
+from bamboochute.settings.parallel import get_workers, parallel_context, set_workers
+
+@pytest.fixture
+def sample_data():
+    """Fixture to provide sample data for settings tests."""
+    return pd.DataFrame({'age': [25, None, 35], 'name': ['Alice', 'Bob', None]})
+
+def _messages(caplog):
+    return [record.getMessage() for record in caplog.records if record.name == 'bamboochute']
+
+def test_instance_logging_does_not_change_globals(sample_data, caplog):
+    """Test that sys_log only applies to its own instance."""
+    with caplog.at_level(logging.INFO, logger='bamboochute'):
+        quiet = Bamboo(sample_data, sys_log=False)
+        loud = Bamboo(sample_data)
+        assert is_logging_enabled()
+
+        caplog.clear()
+        quiet.drop_missing()
+        assert not _messages(caplog)
+        loud.drop_missing()
+        assert _messages(caplog)
+
+def test_logging_context_is_per_thread(sample_data, caplog):
+    """Test that a logging context in one thread does not affect another."""
+    inside = threading.Event()
+    release = threading.Event()
+    seen = {}
+
+    def quiet_worker():
+        with logging_context(False):
+            seen['quiet'] = is_logging_enabled()
+            inside.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=quiet_worker)
+    thread.start()
+    inside.wait(5)
+    seen['main'] = is_logging_enabled()
+    release.set()
+    thread.join()
+
+    assert seen == {'quiet': False, 'main': True}
+
+def test_logging_context_carries_into_aload(sample_data, caplog):
+    """Test that the caller's context applies to work run on a thread pool."""
+    async def load():
+        with logging_context(False):
+            return await Bamboo.aload(sample_data)
+
+    with caplog.at_level(logging.INFO, logger='bamboochute'):
+        asyncio.run(load())
+    assert not _messages(caplog)
+
+def test_parallel_context():
+    """Test scoping the number of workers to a block."""
+    set_workers(4)
+    try:
+        with parallel_context(2):
+            assert get_workers() == 2
+        assert get_workers() == 4
+    finally:
+        set_workers(None)
+
+    with pytest.raises(ValueError):
+        set_workers(0)
@@ -0,0 +1,63 @@
+# tests/test_sqlite.py
+
+import sqlite3
+import pandas as pd
+import numpy as np
+import pytest
+from bamboochute.bamboo import Bamboo
+
+@pytest.fixture
+def sample_data():
+    """Fixture to provide sample data for SQLite tests."""
+    return pd.DataFrame({
+        'id': [1, 2, 3, 4, 5],
+        'name': ['Alice', None, 'Cara', 'Dan', 'Eve'],
+        'score': [1.5, np.nan, 3.0, 4.5, 5.0],
+        'active': [True, False, True, True, False],
+        'joined': pd.to_datetime(['2020-01-01', None, '2021-06-15', '2022-03-01', '2023-12-31'])
+    })
+
+@pytest.fixture
+def database(sample_data, tmp_path):
+    """Fixture to export the sample data to a SQLite database."""
+    path = str(tmp_path / 'warehouse.db')
+    Bamboo(sample_data).export_data(path, format='sqlite', table='people', chunksize=2)
+    return path
+
+def test_export_sqlite(database):
+    """Test exporting data to a SQLite table with batched inserts."""
+    with sqlite3.connect(database) as connection:
+        rows = connection.execute('SELECT id, name, score, active, joined FROM people ORDER BY id').fetchall()
+
+    assert len(rows) == 5
+    assert rows[1] == (2, None, None, 0, None)
+    assert rows[0][4].startswith('2020-01-01 00:00:00')
+
+def test_export_sqlite_if_exists(sample_data, database):
+    """Test appending to, replacing and refusing to overwrite an existing table."""
+    Bamboo(sample_data).export_data(database, format='sqlite', table='people', if_exists='append')
+    assert len(Bamboo.from_sqlite(database, 'SELECT * FROM people').get_data()) == 10
+
+    Bamboo(sample_data).export_data(database, format='sqlite', table='people', if_exists='replace')
+    assert len(Bamboo.from_sqlite(database, 'SELECT * FROM people').get_data()) == 5
+
+    with pytest.raises(ValueError):
+        Bamboo(sample_data).export_data(database, format='sqlite', table='people', if_exists='fail')
+
+def test_from_sqlite_with_params(database):
+    """Test loading a parameterized query in chunks."""
+    bamboo = Bamboo.from_sqlite(database, 'SELECT id, score FROM people WHERE id > ?', params=(2,), chunksize=2)
+
+    assert bamboo.get_data()['id'].tolist() == [3, 4, 5]
+    assert bamboo.get_data().columns.tolist() == ['id', 'score']
+
+def test_from_sqlite_empty_result(database):
+    """Test that an empty result keeps the selected columns."""
+    bamboo = Bamboo.from_sqlite(database, 'SELECT id, name FROM people WHERE id > 100')
+    assert bamboo.get_data().columns.tolist() == ['id', 'name']
+    assert bamboo.get_data().empty
+
+def test_stream_sqlite(database):
+    """Test streaming query results as Bamboo chunks."""
+    chunks = list(Bamboo.stream(database, chunksize=2, query='SELECT * FROM people'))
+    assert [len(chunk.get_data()) for chunk in chunks] == [2, 2, 1]
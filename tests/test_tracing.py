@@ -0,0 +1,84 @@
+# tests/test_tracing.py
+
+import json
+import pandas as pd
+import numpy as np
+import pytest
+from bamboochute.bamboo import Bamboo
+from bamboochute.pipelines import BambooPipeline
+from bamboochute.tracing import dtype_changes
+
+@pytest.fixture
+def sample_data():
+    """Fixture to provide sample data for profiling tests."""
+    return pd.DataFrame({
+        'name': [' Alice ', 'Bob', None, 'Derek'],
+        'joined': ['2020-01-05', '2021-03-01', None, '2019-12-31'],
+        'score': [1.5, None, 3.0, 4.5],
+    })
+
+@pytest.fixture
+def pipeline():
+    """Fixture to provide a pipeline that changes rows, columns and dtypes."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('trim_whitespace', columns=['name'])
+    pipeline.add_step('convert_to_datetime', columns=['joined'])
+    pipeline.add_step('drop_missing', subset=['name'])
+    pipeline.add_step('drop_columns', columns=['score'])
+    return pipeline
+
+def test_profile_steps(sample_data, pipeline):
+    """Test recording the time, memory, shape and dtype changes of every step."""
+    pipeline.execute_pipeline(Bamboo(sample_data), profile=True)
+    profile = pipeline.last_profile
+
+    assert profile['method'].tolist() == ['trim_whitespace', 'convert_to_datetime', 'drop_missing', 'drop_columns']
+    assert (profile['wall_time'] >= 0).all() and (profile['peak_memory'] >= 0).all()
+    assert profile['rows_out'].tolist() == [4, 4, 3, 3]
+    assert profile['columns_out'].tolist() == [3, 3, 3, 2]
+    assert profile.loc[1, 'dtype_changes'] == 'joined: object -> datetime64[ns]'
+    assert profile.loc[3, 'dtype_changes'] == '-score'
+    assert profile['started_at'].is_monotonic_increasing
+
+def test_profile_without_reset_peak(sample_data, pipeline, monkeypatch):
+    """Test profiling on Pythons before 3.9, where tracemalloc has no reset_peak."""
+    monkeypatch.delattr('tracemalloc.reset_peak')
+    pipeline.execute_pipeline(Bamboo(sample_data), profile=True)
+    assert len(pipeline.last_profile) == 4
+    assert (pipeline.last_profile['peak_memory'] >= 0).all()
+
+def test_profile_failed_step(sample_data):
+    """Test that the profile is kept when a step fails."""
+    pipeline = BambooPipeline()
+    pipeline.add_step('drop_missing', subset=['name'])
+    pipeline.add_step('drop_columns', columns=['missing'])
+    with pytest.raises(KeyError):
+        pipeline.execute_pipeline(Bamboo(sample_data), profile=True)
+    assert pipeline.last_profile['status'].tolist() == ['ok', 'error']
+
+@pytest.mark.parametrize('format', ['chrome', 'speedscope'])
+def test_export_profile(sample_data, pipeline, tmp_path, format):
+    """Test exporting the profile as a Chrome trace or a speedscope file."""
+    pipeline.execute_pipeline(Bamboo(sample_data), profile=True)
+    path = str(tmp_path / 'trace.json')
+    pipeline.export_profile(path, format=format)
+
+    with open(path) as file:
+        trace = json.load(file)
+    if format == 'chrome':
+        assert [event['name'] for event in trace['traceEvents']][0] == '0. trim_whitespace'
+        assert trace['traceEvents'][2]['args']['rows_out'] == 3
+    else:
+        assert len(trace['shared']['frames']) == 4
+        assert [event['type'] for event in trace['profiles'][0]['events']][:2] == ['O', 'C']
+
+def test_export_without_profile(pipeline, tmp_path):
+    """Test that exporting before profiling is rejected."""
+    with pytest.raises(ValueError):
+        pipeline.export_profile(str(tmp_path / 'trace.json'))
+
+def test_dtype_changes():
+    """Test describing changed, added and removed columns."""
+    before = pd.DataFrame({'a': [1], 'b': ['x']}).dtypes
+    after = pd.DataFrame({'a': [1.0], 'c': [True]}).dtypes
+    assert dtype_changes(before, after) == 'a: int64 -> float64; +c: bool; -b'